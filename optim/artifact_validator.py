@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Cross-Artifact Consistency Validator
+
+Checks that the exported artifacts the web player loads together agree
+with each other:
+
+- every href in bwv1006_json_notes.json (including every tie group member)
+  points to a notehead in the SVG
+- data-bar covers bars 1..totalBars from the config
+- the `files:` entries of the config exist
+
+The SVG is scanned once (svg_validator.StructureScan) into hash indexes of
+hrefs and bar ids, so all checks are O(notes + elements) and cheap enough to
+gate every optimizer trial.
+
+Usage: python3 artifact_validator.py [config.yaml] [--svg other.svg]
+Example: python3 artifact_validator.py exports/bwv1006.config.yaml
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+from svg_validator import scan_svg
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "exports" / "bwv1006.config.yaml"
+
+# Files the consistency checks themselves depend on
+REQUIRED_FILES = ("svgPath", "notesPath")
+
+def normalize_href(href):
+    """Strip LilyPond editor prefixes, as the alignment step does for notes"""
+    return href.replace("textedit://", "").replace("/work/", "")
+
+class ArtifactContext:
+    """Notes and config loaded once, checked against any number of SVGs"""
+
+    def __init__(self, notes, total_bars):
+        self.notes = notes
+        self.total_bars = total_bars
+
+    @classmethod
+    def from_config(cls, config_file):
+        """
+        Load the config and the notes file it references.
+
+        Returns:
+            tuple: (context, config, file_problems) where file_problems is
+                   [(level, message), ...] for missing `files:` entries
+        """
+        config_file = Path(config_file)
+        config = yaml.safe_load(config_file.read_text(encoding='utf-8')) or {}
+        files = config.get('files') or {}
+
+        file_problems = []
+        for key, name in files.items():
+            if not (config_file.parent / name).exists():
+                level = 'error' if key in REQUIRED_FILES else 'warning'
+                file_problems.append((level, f"files.{key}: {name} not found next to {config_file.name}"))
+
+        notes_file = config_file.parent / files.get('notesPath', '')
+        notes = json.loads(notes_file.read_text(encoding='utf-8')) if notes_file.is_file() else []
+        total_bars = (config.get('musicalStructure') or {}).get('totalBars')
+        return cls(notes, total_bars), config, file_problems
+
+    def identity(self):
+        """Hash of everything the check depends on (for caching verdicts)"""
+        digest = hashlib.sha256(json.dumps([self.notes, self.total_bars], sort_keys=True).encode('utf-8'))
+        digest.update(Path(__file__).read_bytes())
+        return digest.hexdigest()
+
+    def check_svg(self, svg_data):
+        """
+        Check SVG content against the notes and bar count.
+
+        Returns:
+            dict: {'valid', 'errors', 'warnings', 'note_count', 'href_count',
+                   'orphaned_hrefs', 'bar_count'}
+        """
+        scan = scan_svg(svg_data)
+        errors = []
+        warnings = []
+
+        # Indexes built once per SVG
+        svg_hrefs = {normalize_href(head['href']) for head in scan.note_heads}
+        svg_bars = {}
+        for highlight in scan.bar_highlights:
+            svg_bars.setdefault(highlight['data_bar'], 0)
+            svg_bars[highlight['data_bar']] += 1
+
+        # Notes and tie groups
+        missing = []
+        claimed = {}
+        for index, note in enumerate(self.notes):
+            hrefs = note.get('hrefs') or []
+            if not hrefs:
+                errors.append(f"Note {index} (tick {note.get('on_tick')}) has no hrefs")
+            for href in hrefs:
+                if href not in svg_hrefs:
+                    missing.append(href)
+                if href in claimed:
+                    warnings.append(f"href {href} belongs to notes {claimed[href]} and {index}")
+                else:
+                    claimed[href] = index
+
+        if missing:
+            errors.append(f"{len(missing)} note href(s) missing from the SVG: {', '.join(missing[:10])}"
+                          f"{' ...' if len(missing) > 10 else ''}")
+
+        orphaned_hrefs = len(svg_hrefs) - len(svg_hrefs & claimed.keys())
+
+        # Bars
+        bar_numbers = set()
+        for bar in svg_bars:
+            try:
+                bar_numbers.add(int(bar))
+            except ValueError:
+                errors.append(f"data-bar value is not a bar number: {bar!r}")
+
+        if self.total_bars:
+            expected = set(range(1, int(self.total_bars) + 1))
+            missing_bars = sorted(expected - bar_numbers)
+            extra_bars = sorted(bar_numbers - expected)
+            if missing_bars:
+                errors.append(f"{len(missing_bars)} bar(s) without data-bar highlight: "
+                              f"{', '.join(map(str, missing_bars[:20]))}")
+            if extra_bars:
+                warnings.append(f"data-bar outside 1..{self.total_bars}: {', '.join(map(str, extra_bars[:20]))}")
+
+        return {
+            'valid': not errors,
+            'errors': errors,
+            'warnings': warnings,
+            'note_count': len(self.notes),
+            'href_count': len(claimed),
+            'orphaned_hrefs': orphaned_hrefs,
+            'bar_count': len(bar_numbers)
+        }
+
+def print_result(result, log=print):
+    """Print an artifact check result"""
+    log(f"   Notes: {result['note_count']} ({result['href_count']} hrefs, "
+        f"{result['orphaned_hrefs']} SVG noteheads not referenced by any note)")
+    log(f"   Bars with data-bar: {result['bar_count']}")
+    for warning in result['warnings']:
+        log(f"⚠️  {warning}")
+    for error in result['errors']:
+        log(f"❌ ERROR: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Check exported SVG, notes JSON and config against each other')
+    parser.add_argument('config', nargs='?', default=str(DEFAULT_CONFIG),
+                        help='Player config YAML (default: exports/bwv1006.config.yaml)')
+    parser.add_argument('--svg', help='Check this SVG instead of files.svgPath')
+    args = parser.parse_args()
+
+    config_file = Path(args.config)
+    if not config_file.exists():
+        print(f"❌ Config not found: {config_file}")
+        sys.exit(1)
+
+    context, config, file_problems = ArtifactContext.from_config(config_file)
+    svg_file = Path(args.svg) if args.svg else config_file.parent / (config.get('files') or {}).get('svgPath', '')
+
+    print(f"🔗 Artifact Consistency: {config_file}")
+    valid = True
+    for level, message in file_problems:
+        if args.svg and message.startswith("files.svgPath"):
+            continue
+        print(f"{'❌ ERROR:' if level == 'error' else '⚠️ '} {message}")
+        valid = valid and level != 'error'
+
+    if svg_file.is_file():
+        print(f"   SVG: {svg_file}")
+        result = context.check_svg(svg_file.read_bytes())
+        print_result(result)
+        valid = valid and result['valid']
+    else:
+        valid = False
+
+    if valid:
+        print("✅ SVG, notes and config are consistent")
+    else:
+        print("❌ Artifacts are inconsistent - playback highlighting will break")
+
+    sys.exit(0 if valid else 1)
+
+if __name__ == "__main__":
+    main()
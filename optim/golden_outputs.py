@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Golden-Output Equivalence Harness
+
+Freezes the outputs of the data and SVG stages and checks later runs
+against them, so a faster rewrite of a stage can be accepted only when it
+produces the same results:
+
+- bwv1006_csv_midi_note_events.csv            (midi_map.py)
+- bwv1006_csv_svg_note_heads.csv              (svg_extract_note_heads.py)
+- exports/bwv1006_json_notes.json             (alignment)
+- bwv1006_svg_no_hrefs_in_tabs.svg            (svg_remove_hrefs_in_tabs.py)
+- bwv1006_svg_no_hrefs_in_tabs_swellable.svg  (svg_prepare_for_swell.py)
+
+Outputs are compared semantically, not byte-wise:
+
+- CSV: same columns and rows, numeric cells within tolerance
+- notes JSON: note by note, field by field, numbers within tolerance
+- SVG: canonicalized element trees (attribute order, whitespace, number
+  formatting and xlink:href vs. href ignored), numbers inside attribute
+  values - path data, transforms - within tolerance
+
+The manifest records the hashes of the stage inputs at freeze time; a
+check against goldens frozen from other inputs fails instead of reporting
+meaningless differences. Identical bytes are accepted without parsing, and
+an SVG is parsed once into a flat list, so a check takes well under a
+second - cheap enough to gate every trial of svgo_test_framework.py
+(--golden).
+
+Usage: python3 golden_outputs.py freeze [--run]        # Snapshot current outputs (or regenerate first)
+       python3 golden_outputs.py check [--run]         # Compare current outputs (or regenerate them)
+       python3 golden_outputs.py compare old new       # Compare two files
+Run from the build directory (the repository root).
+"""
+
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import math
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from atomic_output import AtomicOutput
+
+DEFAULT_GOLDEN_DIR = ".golden_outputs"
+MANIFEST = "manifest.json"
+
+DEFAULT_ABS_TOL = 1e-6
+DEFAULT_REL_TOL = 1e-9
+MAX_REPORTED = 10  # Differences listed per file
+
+# Stage outputs under test -> comparison kind
+GOLDEN_OUTPUTS = {
+    "bwv1006_csv_midi_note_events.csv": "csv",
+    "bwv1006_csv_svg_note_heads.csv": "csv",
+    "exports/bwv1006_json_notes.json": "notes",
+    "bwv1006_svg_no_hrefs_in_tabs.svg": "svg",
+    "bwv1006_svg_no_hrefs_in_tabs_swellable.svg": "svg",
+}
+
+# Inputs the stages read (the .ly includes are covered by the one-line engravings)
+STAGE_INPUTS = [
+    "bwv1006_ly_one_line.midi",
+    "bwv1006_ly_one_line.svg",
+    "bwv1006.ly",
+    "bwv1006_ties.csv",
+    "bwv1006.svg",
+]
+
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+SEPARATORS = re.compile(r"[\s,]+")
+
+def file_hash(path):
+    """SHA-256 of a file, or None if it does not exist"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+
+def numbers_close(a, b, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    return math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol)
+
+def tokenize(value):
+    """Split an attribute value into numbers (as floats) and the text between them"""
+    tokens = []
+    position = 0
+    for match in NUMBER.finditer(value):
+        text = SEPARATORS.sub(" ", value[position:match.start()]).strip()
+        if text:
+            tokens.append(text)
+        tokens.append(float(match.group()))
+        position = match.end()
+    text = SEPARATORS.sub(" ", value[position:]).strip()
+    if text:
+        tokens.append(text)
+    return tokens
+
+def values_match(old, new, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """Compare two strings token by token, numbers within tolerance"""
+    if old == new:
+        return True
+    old_tokens, new_tokens = tokenize(old), tokenize(new)
+    if len(old_tokens) != len(new_tokens):
+        return False
+    for a, b in zip(old_tokens, new_tokens):
+        if isinstance(a, float) and isinstance(b, float):
+            if not numbers_close(a, b, abs_tol, rel_tol):
+                return False
+        elif a != b:
+            return False
+    return True
+
+def compare_csv(old_data, new_data, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """
+    Compare two CSV files row by row.
+
+    Returns:
+        list: Difference messages (empty if equivalent)
+    """
+    old_rows = list(csv.reader(io.StringIO(old_data.decode("utf-8"))))
+    new_rows = list(csv.reader(io.StringIO(new_data.decode("utf-8"))))
+    if not old_rows or not new_rows or old_rows[0] != new_rows[0]:
+        return [f"columns differ: {old_rows[0] if old_rows else []} vs {new_rows[0] if new_rows else []}"]
+
+    header = old_rows[0]
+    diffs = []
+    if len(old_rows) != len(new_rows):
+        diffs.append(f"{len(old_rows) - 1} rows vs {len(new_rows) - 1}")
+    for row_number, (old_row, new_row) in enumerate(zip(old_rows[1:], new_rows[1:]), 1):
+        for column, old_value, new_value in zip(header, old_row, new_row):
+            if not values_match(old_value, new_value, abs_tol, rel_tol):
+                diffs.append(f"row {row_number} {column}: {old_value!r} vs {new_value!r}")
+    return diffs
+
+def compare_values(old, new, where, diffs, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """Recursively compare JSON values, numbers within tolerance"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(old.keys() | new.keys()):
+            if key not in new or key not in old:
+                diffs.append(f"{where}: field {key!r} only in {'golden' if key in old else 'new'} output")
+            else:
+                compare_values(old[key], new[key], f"{where}.{key}", diffs, abs_tol, rel_tol)
+    elif isinstance(old, list) and isinstance(new, list):
+        if len(old) != len(new):
+            diffs.append(f"{where}: {len(old)} items vs {len(new)}: {old!r} vs {new!r}")
+        else:
+            for index, (a, b) in enumerate(zip(old, new)):
+                compare_values(a, b, f"{where}[{index}]", diffs, abs_tol, rel_tol)
+    elif (isinstance(old, (int, float)) and isinstance(new, (int, float))
+          and not isinstance(old, bool) and not isinstance(new, bool)):
+        if not numbers_close(old, new, abs_tol, rel_tol):
+            diffs.append(f"{where}: {old!r} vs {new!r}")
+    elif old != new:
+        diffs.append(f"{where}: {old!r} vs {new!r}")
+
+def compare_notes(old_data, new_data, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """
+    Compare two aligned notes JSON files note by note.
+
+    Returns:
+        list: Difference messages (empty if equivalent)
+    """
+    old_notes, new_notes = json.loads(old_data), json.loads(new_data)
+    diffs = []
+    if len(old_notes) != len(new_notes):
+        diffs.append(f"{len(old_notes)} notes vs {len(new_notes)}")
+    for index, (old, new) in enumerate(zip(old_notes, new_notes)):
+        hrefs = old.get('hrefs') or [None]
+        compare_values(old, new, f"note {index} ({old.get('on')}s, {hrefs[0]})", diffs, abs_tol, rel_tol)
+    return diffs
+
+def canonical_svg(svg_data):
+    """
+    Flatten an SVG into [(depth, tag, attributes, text, tail), ...] in document order.
+
+    Attributes are sorted with xlink:href renamed to href; text and tails are
+    whitespace-collapsed. Comments and the XML declaration are dropped by
+    the parser.
+    """
+    nodes = []
+    stack = [(ET.fromstring(svg_data), 0)]
+    while stack:
+        element, depth = stack.pop()
+        attributes = tuple(sorted(("href" if name == XLINK_HREF else name, value)
+                                  for name, value in element.attrib.items()))
+        text = " ".join((element.text or "").split())
+        tail = " ".join((element.tail or "").split()) if depth else ""
+        nodes.append((depth, element.tag, attributes, text, tail))
+        stack.extend((child, depth + 1) for child in reversed(element))
+    return nodes
+
+def describe(node, index):
+    """Short label of a canonical node for difference messages"""
+    depth, tag, attributes, _, _ = node
+    label = f"element {index} <{tag.split('}')[-1]}>"
+    for name in ("id", "href", "data-bar"):
+        for key, value in attributes:
+            if key == name:
+                return f"{label} {name}={value!r}"
+    return label
+
+def compare_canonical_svg(old_nodes, new_nodes, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """
+    Compare two canonical SVG trees.
+
+    Returns:
+        list: Difference messages (empty if equivalent)
+    """
+    diffs = []
+    if len(old_nodes) != len(new_nodes):
+        diffs.append(f"{len(old_nodes)} elements vs {len(new_nodes)}")
+    for index, (old, new) in enumerate(zip(old_nodes, new_nodes)):
+        if old == new:
+            continue
+        if old[:2] != new[:2]:
+            # The trees diverge structurally; everything after this point would differ too
+            diffs.append(f"{describe(old, index)} at depth {old[0]} vs <{new[1].split('}')[-1]}> at depth {new[0]}")
+            break
+        old_attributes, new_attributes = dict(old[2]), dict(new[2])
+        for name in sorted(old_attributes.keys() | new_attributes.keys()):
+            a, b = old_attributes.get(name), new_attributes.get(name)
+            if a is None or b is None:
+                diffs.append(f"{describe(old, index)}: attribute {name} only in {'golden' if b is None else 'new'} output")
+            elif not values_match(a, b, abs_tol, rel_tol):
+                diffs.append(f"{describe(old, index)}: {name}={a[:60]!r} vs {b[:60]!r}")
+        for part, a, b in (("text", old[3], new[3]), ("tail", old[4], new[4])):
+            if not values_match(a, b, abs_tol, rel_tol):
+                diffs.append(f"{describe(old, index)}: {part} {a[:60]!r} vs {b[:60]!r}")
+    return diffs
+
+def compare_svg(old_data, new_data, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    return compare_canonical_svg(canonical_svg(old_data), canonical_svg(new_data), abs_tol, rel_tol)
+
+COMPARATORS = {"csv": compare_csv, "notes": compare_notes, "svg": compare_svg}
+
+def kind_of(path):
+    """Comparison kind of an output file, by name or extension"""
+    path = Path(path)
+    for name, kind in GOLDEN_OUTPUTS.items():
+        if Path(name).name == path.name:
+            return kind
+    return {".csv": "csv", ".json": "notes", ".svg": "svg"}.get(path.suffix.lower())
+
+def compare_files(old_path, new_path, kind=None, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """
+    Compare two output files.
+
+    Returns:
+        list: Difference messages (empty if equivalent)
+    """
+    old_data, new_data = Path(old_path).read_bytes(), Path(new_path).read_bytes()
+    if old_data == new_data:
+        return []
+    try:
+        return COMPARATORS[kind or kind_of(old_path)](old_data, new_data, abs_tol, rel_tol)
+    except (ET.ParseError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        return [f"cannot parse: {e}"]
+
+class GoldenSVG:
+    """Reference SVG canonicalized once, compared with any number of candidates"""
+
+    def __init__(self, svg_data, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+        self.svg_data = svg_data
+        self.nodes = canonical_svg(svg_data)
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+
+    def identity(self):
+        """Hash of everything the check depends on (for caching verdicts)"""
+        digest = hashlib.sha256(self.svg_data)
+        digest.update(f"{self.abs_tol}|{self.rel_tol}".encode("utf-8"))
+        digest.update(Path(__file__).read_bytes())
+        return digest.hexdigest()
+
+    def check_svg(self, svg_data):
+        """Difference messages between the reference and `svg_data` (empty if equivalent)"""
+        if svg_data == self.svg_data:
+            return []
+        try:
+            return compare_canonical_svg(self.nodes, canonical_svg(svg_data), self.abs_tol, self.rel_tol)
+        except ET.ParseError as e:
+            return [f"cannot parse: {e}"]
+
+# =============================================================================
+# REGENERATION
+# =============================================================================
+
+def regenerate_outputs(output_dir):
+    """
+    Run the stages in process from the inputs in the current directory.
+
+    Outputs go to output_dir under their build names, so the build's own
+    files are untouched.
+
+    Returns:
+        list: Error messages of stages that failed
+    """
+    import align_pitch_by_geometry_simplified as align
+    import midi_map
+    import svg_extract_note_heads as note_heads
+    import svg_prepare_for_swell as swell
+    import svg_remove_hrefs_in_tabs as href_removal
+
+    output_dir = Path(output_dir)
+    (output_dir / "exports").mkdir(parents=True, exist_ok=True)
+    errors = []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            midi_notes = midi_map.extract_note_intervals(midi_map.MIDI_FILE)
+            midi_map.write_note_events_csv(midi_notes, output_dir / midi_map.OUTPUT_CSV)
+            noteheads = note_heads.extract_note_heads(note_heads.SVG_FILE, note_heads.LY_FILE)
+            note_heads.write_note_heads_csv(noteheads, output_dir / note_heads.OUTPUT_CSV)
+            aligned = align.align_notes(midi_notes, noteheads, align.read_csv_rows(align.TIES_CSV))
+            align.write_aligned_json(aligned, output_dir / align.OUTPUT_JSON)
+        except (Exception, SystemExit) as e:  # The alignment exits on the first mismatch
+            errors.append(f"data stages failed: {e!r}")
+
+        no_hrefs = output_dir / "bwv1006_svg_no_hrefs_in_tabs.svg"
+        href_removal.remove_href_from_tab_links(Path("bwv1006.svg"), no_hrefs)
+        if not no_hrefs.exists() or not swell.process_svg_file(no_hrefs):
+            errors.append("SVG stages failed")
+    return errors
+
+# =============================================================================
+# FREEZE AND CHECK
+# =============================================================================
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+def freeze(source_dir, golden_dir):
+    """
+    Copy the stage outputs from source_dir into golden_dir and write the manifest.
+
+    Returns:
+        int: Number of outputs frozen
+    """
+    golden_dir = Path(golden_dir)
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "frozen": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "inputs": {name: file_hash(name) for name in STAGE_INPUTS},
+        "outputs": {},
+    }
+    for name, kind in GOLDEN_OUTPUTS.items():
+        source = Path(source_dir) / name
+        if not source.exists():
+            print(f"   ⚠️  Not built, skipped: {name}")
+            continue
+        golden = golden_dir / Path(name).name
+        shutil.copyfile(source, golden)
+        manifest["outputs"][name] = {"kind": kind, "golden": golden.name, "sha256": file_hash(golden)}
+        print(f"   🧊 {name}")
+
+    with AtomicOutput(golden_dir / MANIFEST) as f:
+        json.dump(manifest, f, indent=2)
+    return len(manifest["outputs"])
+
+def check(source_dir, golden_dir, abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+    """
+    Compare the stage outputs in source_dir with the goldens.
+
+    Returns:
+        bool: True if every frozen output is present and equivalent
+    """
+    golden_dir = Path(golden_dir)
+    manifest_file = golden_dir / MANIFEST
+    if not manifest_file.exists():
+        print(f"❌ No goldens in {golden_dir} - run: python3 optim/golden_outputs.py freeze")
+        return False
+    manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+
+    changed_inputs = [name for name, digest in manifest["inputs"].items() if file_hash(name) != digest]
+    if changed_inputs:
+        print(f"❌ Inputs changed since the goldens were frozen ({manifest['revision'] or 'unknown revision'}, "
+              f"{manifest['frozen']}): {', '.join(changed_inputs)}")
+        print("   Freeze again from a trusted revision before comparing")
+        return False
+
+    passed = True
+    for name, entry in manifest["outputs"].items():
+        current = Path(source_dir) / name
+        if not current.exists():
+            print(f"   ❌ {name}: missing")
+            passed = False
+            continue
+        if file_hash(current) == entry["sha256"]:
+            print(f"   ✅ {name}: identical")
+            continue
+        diffs = compare_files(golden_dir / entry["golden"], current, entry["kind"], abs_tol, rel_tol)
+        if not diffs:
+            print(f"   ✅ {name}: equivalent")
+            continue
+        passed = False
+        print(f"   ❌ {name}: {len(diffs)} difference(s)")
+        for diff in diffs[:MAX_REPORTED]:
+            print(f"      • {diff}")
+        if len(diffs) > MAX_REPORTED:
+            print(f"      ... and {len(diffs) - MAX_REPORTED} more")
+    return passed
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Freeze stage outputs and check later runs for equivalence')
+    parser.add_argument('command', choices=['freeze', 'check', 'compare'])
+    parser.add_argument('files', nargs='*', help='compare: golden file and new file')
+    parser.add_argument('--golden-dir', default=DEFAULT_GOLDEN_DIR,
+                        help=f'Golden output directory (default: {DEFAULT_GOLDEN_DIR})')
+    parser.add_argument('--run', action='store_true',
+                        help='Regenerate the outputs in process from the current inputs first '
+                             '(instead of using the files of the last build)')
+    parser.add_argument('--abs-tol', type=float, default=DEFAULT_ABS_TOL,
+                        help=f'Absolute tolerance for numbers (default: {DEFAULT_ABS_TOL})')
+    parser.add_argument('--rel-tol', type=float, default=DEFAULT_REL_TOL,
+                        help=f'Relative tolerance for numbers (default: {DEFAULT_REL_TOL})')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        if len(args.files) != 2:
+            parser.error("compare takes two files")
+        diffs = compare_files(*args.files, abs_tol=args.abs_tol, rel_tol=args.rel_tol)
+        for diff in diffs[:MAX_REPORTED]:
+            print(f"   • {diff}")
+        print(f"{'❌' if diffs else '✅'} {len(diffs)} difference(s)")
+        sys.exit(1 if diffs else 0)
+
+    with tempfile.TemporaryDirectory(prefix="golden_run_") as run_dir:
+        source_dir = Path.cwd()
+        errors = []
+        if args.run:
+            print("🔄 Regenerating stage outputs...")
+            errors = regenerate_outputs(run_dir)
+            for error in errors:
+                print(f"   ❌ {error}")
+            source_dir = Path(run_dir)
+
+        if args.command == 'freeze':
+            print(f"🧊 Freezing golden outputs into {args.golden_dir}")
+            count = freeze(source_dir, args.golden_dir)
+            print(f"✅ Froze {count} output(s)")
+            sys.exit(0 if count else 1)
+
+        print(f"🔍 Checking outputs against {args.golden_dir}")
+        if check(source_dir, args.golden_dir, args.abs_tol, args.rel_tol) and not errors:
+            print("✅ All outputs equivalent to the goldens")
+            sys.exit(0)
+        print("❌ Outputs differ from the goldens")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+SVG Size and Client-Cost Metrics
+
+The optimized SVG is served compressed, so raw byte counts can be
+misleading: a plugin that removes raw bytes may barely change - or even
+grow - the transferred size. This module measures an SVG the way it is
+served:
+
+- raw:    uncompressed bytes
+- gzip:   gzip -9
+- brotli: brotli quality 11 (only when the `brotli` or `brotlicffi`
+          package is installed)
+
+and what it costs the player once it arrives:
+
+- parse_ms:          median XML parse time over repeated runs
+- elements:          DOM element count
+- href_elements:     elements carrying an href (note heads)
+- data_bar_elements: elements carrying data-bar (bar highlights)
+
+Trials can be compared on several of these at once with pareto_front().
+Only deterministic metrics take part: parse_ms is wall-clock time, so it is
+reported but never decides whether a plugin is kept.
+
+Usage: python3 svg_metrics.py <svg_file> [more.svg ...]
+"""
+
+import contextlib
+import gc
+import gzip
+import statistics
+import sys
+import time
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+SIZE_OBJECTIVES = ("raw", "gzip", "brotli")
+
+# Metrics traded off against each other by the "pareto" objective. Parse
+# time is left out: its medians differ from run to run, and verdicts built
+# on it would differ between runs and strategies (and end up in the cache)
+PARETO_METRICS = ("gzip", "elements")
+
+DEFAULT_PARSE_REPEATS = 5
+
+def available_objectives():
+    """Size objectives that can be measured in this environment"""
+    return [name for name in SIZE_OBJECTIVES if name != "brotli" or brotli is not None]
+
+def compressed_sizes(svg_data):
+    """
+    Measure raw and compressed sizes of SVG content
+
+    Args:
+        svg_data: SVG content as bytes
+
+    Returns:
+        dict: {'raw', 'gzip'} plus 'brotli' when available, all in bytes
+    """
+    sizes = {
+        "raw": len(svg_data),
+        "gzip": len(gzip.compress(svg_data, compresslevel=9, mtime=0)),
+    }
+    if brotli is not None:
+        sizes["brotli"] = len(brotli.compress(svg_data, quality=11))
+    return sizes
+
+def client_costs(svg_data, repeats=DEFAULT_PARSE_REPEATS, timing_lock=None):
+    """
+    Measure parse time and DOM size of SVG content
+
+    Args:
+        svg_data: SVG content as bytes
+        repeats: Number of timed parses (the median is reported)
+        timing_lock: Optional lock held around the timed parses only, so
+                     concurrent measurements do not skew each other
+
+    Returns:
+        dict: {'parse_ms', 'elements', 'href_elements', 'data_bar_elements'},
+              all None when the content is not well-formed XML
+    """
+    try:
+        svg_root = ET.fromstring(svg_data)  # Untimed warm-up, also validates
+    except ET.ParseError:
+        return dict.fromkeys(("parse_ms", "elements", "href_elements", "data_bar_elements"))
+
+    # Like timeit: no garbage collection pauses inside the timed parses
+    timings = []
+    with timing_lock or contextlib.nullcontext():
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(max(1, repeats)):
+                started = time.perf_counter()
+                ET.fromstring(svg_data)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    elements = href_elements = data_bar_elements = 0
+    for elem in svg_root.iter():
+        elements += 1
+        names = elem.attrib.keys()
+        if any(name.endswith('href') for name in names):
+            href_elements += 1
+        if any(name.endswith('data-bar') for name in names):
+            data_bar_elements += 1
+
+    return {
+        "parse_ms": round(statistics.median(timings), 3),
+        "elements": elements,
+        "href_elements": href_elements,
+        "data_bar_elements": data_bar_elements,
+    }
+
+def measure_svg(svg_data, repeats=DEFAULT_PARSE_REPEATS, timing_lock=None):
+    """All size and client-cost metrics of SVG content in one dict (see client_costs for timing_lock)"""
+    metrics = compressed_sizes(svg_data)
+    metrics.update(client_costs(svg_data, repeats, timing_lock))
+    return metrics
+
+def format_sizes(sizes):
+    """One-line summary, e.g. '812,345 raw / 201,004 gzip / 160,112 brotli'"""
+    return " / ".join(f"{sizes[name]:,} {name}" for name in SIZE_OBJECTIVES if name in sizes)
+
+def format_metrics(metrics):
+    """Sizes plus client costs on one line"""
+    text = format_sizes(metrics) + " bytes"
+    if metrics.get("parse_ms") is not None:
+        text += f", {metrics['parse_ms']:.1f} ms parse, {metrics['elements']:,} elements"
+    return text
+
+def relative_gains(baseline, candidate, keys):
+    """Percentage improvement per metric (positive = candidate is smaller, 0 if unmeasured)"""
+    return {
+        key: ((baseline[key] - candidate[key]) / baseline[key]) * 100
+        if baseline.get(key) and candidate.get(key) is not None else 0.0
+        for key in keys
+    }
+
+def pareto_improves(baseline, candidate, threshold, keys=PARETO_METRICS):
+    """
+    Check whether a candidate is a worthwhile Pareto step from a baseline:
+    at least one metric improves by `threshold` percent and none gets worse.
+
+    Returns:
+        tuple: (improves, gains)
+    """
+    gains = relative_gains(baseline, candidate, keys)
+    worse = any(gain < 0 for gain in gains.values())
+    return (not worse and any(gain >= threshold for gain in gains.values())), gains
+
+def dominates(a, b, keys=PARETO_METRICS):
+    """True if `a` is no worse than `b` on every metric and better on one"""
+    return all(a[key] <= b[key] for key in keys) and any(a[key] < b[key] for key in keys)
+
+def pareto_front(entries, keys=PARETO_METRICS):
+    """
+    Non-dominated entries
+
+    Args:
+        entries: List of (label, metrics) pairs
+
+    Returns:
+        list: The (label, metrics) pairs no other entry dominates
+    """
+    entries = [(label, metrics) for label, metrics in entries
+               if all(metrics.get(key) is not None for key in keys)]
+    return [
+        (label, metrics) for label, metrics in entries
+        if not any(dominates(other, metrics, keys) for _, other in entries if other is not metrics)
+    ]
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 svg_metrics.py <svg_file> [more.svg ...]")
+        sys.exit(1)
+
+    if brotli is None:
+        print("ℹ️  brotli not installed - measuring raw and gzip only (pip install brotli)")
+
+    for svg_file in sys.argv[1:]:
+        metrics = measure_svg(Path(svg_file).read_bytes())
+        print(f"📏 {svg_file}: {format_metrics(metrics)}")
+        print(f"   {metrics['href_elements']:,} href elements, {metrics['data_bar_elements']:,} data-bar elements")
+
+if __name__ == "__main__":
+    main()
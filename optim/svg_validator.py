@@ -6,99 +6,235 @@ This script validates that an optimized SVG maintains the required structure
 for note head highlighting and bar highlighting functionality.
 
 Usage: python3 svg_validator.py <svg_file>
+
+Also importable: analyze_svg() validates bytes in memory and returns a
+result dict, validate_files() checks many files in a process pool.
 """
 
+import io
 import sys
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
-def find_note_heads(svg_root):
-    """Find all elements with href-like attributes that have path children (note heads)"""
-    note_heads = []
+class StructureScan:
+    """
+    Collects note heads and bar highlights in one post-order pass.
+    
+    Each element's path-descendant count is accumulated bottom-up from its
+    children when the element closes, so every element is visited once
+    regardless of nesting depth.
+    """
     
-    # Find all elements with any href-like attributes (ignoring namespaces)
-    for elem in svg_root.iter():
-        href_value = None
+    def __init__(self):
+        self.note_heads = []
+        self.bar_highlights = []
+        self._path_counts = []  # One counter per open element
+    
+    def start(self, elem):
+        self._path_counts.append(0)
         
-        # Check all attributes for anything ending with 'href'
+        # Elements with data-bar attributes (any namespace)
         for attr_name, attr_value in elem.attrib.items():
-            if attr_name.endswith('href'):
-                href_value = attr_value
-                break
-        
-        if href_value and 'textedit://' in href_value:
-            # Check if this element has path children
-            paths = []
-            # Look for path children (ignore namespaces)
-            for child in elem:
-                if child.tag.endswith('path'):
-                    paths.append(child)
-            
-            # Also check nested children
-            for descendant in elem.iter():
-                if descendant.tag.endswith('path') and descendant != elem:
-                    paths.append(descendant)
-            
-            if paths:
-                note_heads.append({
-                    'href': href_value,
-                    'path_count': len(paths)
+            if attr_name.endswith('data-bar'):
+                self.bar_highlights.append({
+                    'data_bar': attr_value,
+                    'tag': elem.tag.split('}')[-1],
+                    'moment_main': elem.get('data-bar-moment-main'),
+                    'moment_grace': elem.get('data-bar-moment-grace')
                 })
+                break  # Only count each element once
+    
+    def end(self, elem):
+        path_count = self._path_counts.pop()
+        
+        if path_count:
+            # Any href-like attribute (ignoring namespaces), first one wins
+            for attr_name, attr_value in elem.attrib.items():
+                if attr_name.endswith('href'):
+                    if 'textedit://' in attr_value:
+                        self.note_heads.append({
+                            'href': attr_value,
+                            'path_count': path_count
+                        })
+                    break
+        
+        if self._path_counts:
+            self._path_counts[-1] += path_count + (1 if elem.tag.endswith('path') else 0)
+
+def scan_tree(svg_root):
+    """Run a StructureScan over a parsed element tree"""
+    scan = StructureScan()
+    stack = [(svg_root, False)]
+    while stack:
+        elem, closing = stack.pop()
+        if closing:
+            scan.end(elem)
+            continue
+        scan.start(elem)
+        stack.append((elem, True))
+        stack.extend((child, False) for child in reversed(elem))
+    return scan
+
+def scan_svg(svg_data):
+    """
+    Run a StructureScan while parsing SVG bytes incrementally.
+    
+    Subtrees are cleared once they have been counted, so memory stays flat
+    on multi-megabyte unoptimized scores.
+    """
+    if isinstance(svg_data, str):
+        svg_data = svg_data.encode('utf-8')
     
-    return note_heads
+    scan = StructureScan()
+    for event, elem in ET.iterparse(io.BytesIO(svg_data), events=('start', 'end')):
+        if event == 'start':
+            scan.start(elem)
+        else:
+            scan.end(elem)
+            elem.clear()
+    return scan
+
+def find_note_heads(svg_root):
+    """Find all elements with href-like attributes that have path descendants (note heads)"""
+    return scan_tree(svg_root).note_heads
 
 def find_bar_highlights(svg_root):
     """Find all elements with data-bar attributes (bar highlights)"""
-    bar_highlights = []
+    return scan_tree(svg_root).bar_highlights
+
+def summarize_bar_highlights(bar_highlights):
+    """Group bar highlights by bar and check that each bar has one consistent moment"""
+    bars = {}
+    for highlight in bar_highlights:
+        bars.setdefault(highlight['data_bar'], []).append(highlight)
     
-    # Find all elements with data-bar attributes (any namespace)
-    for elem in svg_root.iter():
-        for attr_name, attr_value in elem.attrib.items():
-            if attr_name.endswith('data-bar') or attr_name == 'data-bar':
-                bar_highlights.append({
-                    'data_bar': attr_value
-                })
-                break  # Only count each element once
+    inconsistent_bars = [
+        bar for bar, highlights in bars.items()
+        if len({(h['moment_main'], h['moment_grace']) for h in highlights}) > 1
+    ]
     
-    return bar_highlights
+    return {
+        'bar_count': len(bars),
+        'element_count': len(bar_highlights),
+        'max_elements_per_bar': max((len(h) for h in bars.values()), default=0),
+        'inconsistent_bars': inconsistent_bars
+    }
 
-def validate_svg(svg_file):
-    """Validate a single SVG file"""
+def analyze_svg(svg_data, name=None):
+    """
+    Validate SVG content in memory
+    
+    Args:
+        svg_data: SVG content as bytes or str
+        name: Label for the result (usually the file path)
+    
+    Returns:
+        dict: {'name', 'parsed', 'valid', 'errors', 'note_heads',
+               'bar_highlights', 'bar_count', 'max_elements_per_bar'}
+    """
+    result = {
+        'name': str(name) if name is not None else None,
+        'parsed': False,
+        'valid': False,
+        'errors': [],
+        'note_heads': 0,
+        'bar_highlights': 0,
+        'bar_count': 0,
+        'max_elements_per_bar': 0
+    }
+    
     try:
-        tree = ET.parse(svg_file)
-        svg_root = tree.getroot()
+        scan = scan_svg(svg_data)
     except ET.ParseError as e:
-        print(f"❌ XML Parse Error: {e}")
-        return False
-    except Exception as e:
-        print(f"❌ Error reading file: {e}")
-        return False
+        result['errors'].append(f"XML Parse Error: {e}")
+        return result
     
-    # Find structural elements
-    note_heads = find_note_heads(svg_root)
-    bar_highlights = find_bar_highlights(svg_root)
+    result['parsed'] = True
     
-    print(f"📊 SVG Structure Analysis: {svg_file}")
-    print(f"   Note heads (elements with [href] + path children): {len(note_heads)}")
-    print(f"   Bar highlights (elements with [data-bar]): {len(bar_highlights)}")
+    # Structural elements, collected in a single pass
+    note_heads = scan.note_heads
+    bar_highlights = scan.bar_highlights
+    bar_summary = summarize_bar_highlights(bar_highlights)
     
-    # Validation
-    valid = True
+    result['note_heads'] = len(note_heads)
+    result['bar_highlights'] = len(bar_highlights)
+    result['bar_count'] = bar_summary['bar_count']
+    result['max_elements_per_bar'] = bar_summary['max_elements_per_bar']
     
+    # Validation
     if len(note_heads) == 0:
-        print("❌ ERROR: No note heads found")
-        valid = False
+        result['errors'].append("No note heads found")
     
     if len(bar_highlights) == 0:
-        print("❌ ERROR: No bar highlights found")
-        valid = False
+        result['errors'].append("No bar highlights found")
     
-    if valid:
-        print("✅ SVG structure is valid for musical notation functionality")
-    else:
-        print("❌ SVG structure is invalid - functionality will be broken")
+    if bar_summary['inconsistent_bars']:
+        result['errors'].append(
+            f"Bars with conflicting data-bar-moment attributes: "
+            f"{', '.join(bar_summary['inconsistent_bars'][:10])}"
+        )
+    
+    result['valid'] = not result['errors']
+    return result
+
+def analyze_svg_file(svg_file):
+    """Read and validate one SVG file (picklable entry point for process pools)"""
+    try:
+        svg_data = Path(svg_file).read_bytes()
+    except OSError as e:
+        return {
+            'name': str(svg_file), 'parsed': False, 'valid': False, 'errors': [f"Error reading file: {e}"],
+            'note_heads': 0, 'bar_highlights': 0, 'bar_count': 0, 'max_elements_per_bar': 0
+        }
+    return analyze_svg(svg_data, svg_file)
+
+def validate_files(svg_files, jobs=None):
+    """
+    Validate several SVG files concurrently
     
-    return valid
+    Args:
+        svg_files: Iterable of paths
+        jobs: Worker processes (default: CPU count); 1 validates in-process
+    
+    Returns:
+        list: One result dict per file, in input order
+    """
+    svg_files = [str(f) for f in svg_files]
+    if jobs == 1 or len(svg_files) <= 1:
+        return [analyze_svg_file(f) for f in svg_files]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(analyze_svg_file, svg_files))
+
+def print_result(result, log=print):
+    """Print a validation result in the validator's report format"""
+    if result['parsed']:
+        log(f"📊 SVG Structure Analysis: {result['name']}")
+        log(f"   Note heads (elements with [href] + path children): {result['note_heads']}")
+        log(f"   Bar highlights (elements with [data-bar]): {result['bar_highlights']}")
+        if result['bar_highlights']:
+            log(f"   Distinct bars: {result['bar_count']} "
+                f"(up to {result['max_elements_per_bar']} elements per bar)")
+    
+    if not result['parsed']:
+        for error in result['errors']:
+            log(f"❌ {error}")
+        return
+    
+    for error in result['errors']:
+        log(f"❌ ERROR: {error}")
+    
+    if result['valid']:
+        log("✅ SVG structure is valid for musical notation functionality")
+    else:
+        log("❌ SVG structure is invalid - functionality will be broken")
+
+def validate_svg(svg_file):
+    """Validate a single SVG file"""
+    result = analyze_svg_file(svg_file)
+    print_result(result)
+    return result['valid']
 
 def main():
     if len(sys.argv) != 2:
@@ -7,17 +7,70 @@ individually against your actual functionality tests.
 
 Usage: python3 svgo_test_framework.py input.svg test_command
 Example: python3 svgo_test_framework.py input.svg "npm test"
+         python3 svgo_test_framework.py input.svg "npm test" --jobs 8
+
+With --jobs N, the next N plugins are evaluated speculatively and
+concurrently against the current working set, each in its own scratch
+workspace. Results are merged in plugin order: as soon as one candidate is
+accepted, the later speculative results (computed against the old working
+set) are discarded and re-evaluated, so the final config is exactly the one
+a sequential run produces.
+
+With --strategy bisect, plugins are applied in large sets and the
+functionality test only runs once per set; a failing set is split in half
+until the breaking plugins are isolated (delta debugging). This assumes
+breakage is monotone - removing plugins from a passing set keeps it
+passing - and then yields the same working set as the greedy order with
+roughly logarithmic test runs when most plugins are safe.
+
+With --artifacts CONFIG, every candidate must also stay consistent with the
+notes JSON and bar count referenced by the player config (see
+artifact_validator.py) before its functionality test runs.
+
+With --golden [SVG], every candidate must also be semantically equivalent
+to a reference SVG (the input by default; see golden_outputs.py): the same
+element tree, with numbers within --golden-tol. This restricts the config
+to plugins that only reformat the file.
+
+Plugins are judged by --objective: raw bytes (default), gzip or brotli
+transfer size, or "pareto" - no regression in gzip size or element count,
+and at least one of them improved by the threshold. Every trial records
+all sizes plus client costs (median parse time, element, href and
+data-bar counts; see svg_metrics.py), and the report lists the Pareto
+front of all trials. Parse time is reported only: being wall-clock, it
+would make verdicts differ between runs.
+
+SVGO outputs and test verdicts are cached in .svgo_trial_cache/ (see
+svgo_trial_cache.py), so re-runs only pay for trials they have not seen.
 """
 
+import argparse
 import json
+import queue
 import subprocess
 import sys
-import tempfile
-import os
 import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# SVGO runs in persistent Node workers shared with the build scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from atomic_output import AtomicOutput, write_if_changed
+from svgo_pool import SVGOError, SVGOPool, SVGOWorkerError
+from svgo_trial_cache import DEFAULT_CACHE_DIR, SVGOTrialCache, content_hash, test_identity
+from svg_validator import analyze_svg, print_result
+from artifact_validator import ArtifactContext
+from artifact_validator import print_result as print_artifact_result
+from golden_outputs import GoldenSVG
+from svg_metrics import (PARETO_METRICS, available_objectives, format_metrics, measure_svg,
+                         pareto_front, pareto_improves, relative_gains)
+
+VALIDATOR_SCRIPT = Path(__file__).parent / "svg_validator.py"
+
 # All SVGO preset-default plugins in alphabetical order
 PLUGINS = [
 "addAttributesToSVGElement",
@@ -78,12 +131,57 @@ PLUGINS = [
 "sortDefsChildren",
 ]
 
+class ScratchWorkspace:
+    """
+    Private mirror of the working directory for one concurrent test run.
+    
+    Every top-level entry of the working directory is symlinked, except the
+    target SVG, which is a real file the candidate is copied onto. The test
+    command runs inside the mirror, so concurrent runs never swap the real
+    target SVG.
+    """
+    
+    def __init__(self, working_dir, target_name, exclude=()):
+        self.root = Path(tempfile.mkdtemp(prefix="svgo_workspace_"))
+        self.target = self.root / target_name
+        for entry in Path(working_dir).iterdir():
+            if entry.name == target_name or entry.name in exclude:
+                continue
+            (self.root / entry.name).symlink_to(entry.resolve())
+    
+    def close(self):
+        """Remove the mirror (symlinks only, never their targets)"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
 class IncrementalSVGOTester:
-    def __init__(self, input_file, test_command=None, size_threshold=1.0):
+    def __init__(self, input_file, test_command=None, size_threshold=1.0, svgo_pool=None, jobs=1,
+                 trial_cache=None, strategy="greedy", artifact_context=None, objective="raw",
+                 parse_repeats=5, golden=None):
         self.input_file = Path(input_file)
+        self.input_bytes = self.input_file.read_bytes()
+        self.input_hash = content_hash(self.input_bytes)
         self.test_command = test_command
         self.size_threshold = size_threshold  # Minimum size reduction percentage
         self.working_dir = Path.cwd()
+        self.jobs = max(1, int(jobs))
+        self.strategy = strategy  # "greedy" or "bisect"
+        if strategy == "bisect" and self.jobs > 1:
+            # Each half is tested against the working set the previous one produced
+            raise ValueError("The bisect strategy runs sequentially and does not support jobs > 1")
+        self.objective = objective  # "raw", "gzip", "brotli" or "pareto"
+        self.parse_repeats = parse_repeats
+        self._metrics = {}  # Content hash -> measured metrics
+        self._timing_lock = threading.Lock()
+        self.svgo_pool = svgo_pool or SVGOPool(size=self.jobs)
+        self.trial_cache = trial_cache  # Optional SVGOTrialCache
+        self.test_identity = test_identity(test_command, VALIDATOR_SCRIPT)
+        self.artifact_context = artifact_context  # Optional ArtifactContext gating every candidate
+        if artifact_context:
+            self.test_identity += f"|artifacts:{artifact_context.identity()}"
+        self.golden = golden  # Optional GoldenSVG every candidate must be equivalent to
+        if golden:
+            self.test_identity += f"|golden:{golden.identity()}"
         self.test_dir = Path(f"svgo_incremental_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
         
         # Results
@@ -91,68 +189,161 @@ class IncrementalSVGOTester:
         self.failed_plugins = []
         self.useless_plugins = []  # New: plugins that don't provide meaningful size reduction
         self.test_results = []
+        self.original_metrics = self.measure(self.input_file)
+        self.current_metrics = self.original_metrics  # Metrics with the current working set
+        self.discarded_evaluations = 0  # Speculative results invalidated by an accepted plugin
+        self.svgo_invocations = 0  # SVGO runs actually executed (cache hits excluded)
+        self.test_invocations = 0  # Functionality tests actually executed
+        self._counter_lock = threading.Lock()
+        # Set by a test run that timed out or errored, so its verdict is not cached
+        self._inconclusive = threading.local()
         
         # Create test directory
         self.test_dir.mkdir(exist_ok=True)
         print(f"🧪 Incremental test results will be saved to: {self.test_dir}")
-        print(f"📏 Size reduction threshold: {self.size_threshold}%")
+        print(f"📏 Size reduction threshold: {self.size_threshold}% "
+              f"({', '.join(PARETO_METRICS) + ' Pareto' if self.objective == 'pareto' else self.objective + ' size'})")
+        print(f"🧭 Search strategy: {self.strategy}")
+        if self.jobs > 1:
+            print(f"⚡ Parallel evaluation: {self.jobs} jobs")
+        if self.trial_cache:
+            print(f"📦 Trial cache: {self.trial_cache.root}")
         
     def get_file_size(self, svg_path):
         """Get file size"""
         return svg_path.stat().st_size if svg_path.exists() else 0
     
-    def run_svgo_with_plugins(self, plugins, output_file):
+    def measure(self, svg_path):
+        """Sizes and client costs of an SVG, memoized by content"""
+        data = Path(svg_path).read_bytes()
+        digest = content_hash(data)
+        metrics = self._metrics.get(digest)
+        if metrics is None:
+            # Compression runs concurrently; only the timed parses are
+            # serialized, so concurrent trials do not skew each other's timings
+            metrics = measure_svg(data, self.parse_repeats, timing_lock=self._timing_lock)
+            self._metrics.setdefault(digest, metrics)
+        return metrics
+    
+    def judge(self, baseline, candidate):
+        """
+        Decide whether a candidate's metrics are worth keeping.
+        
+        Returns:
+            tuple: (meets_threshold, description)
+        """
+        if self.objective == "pareto":
+            improves, gains = pareto_improves(baseline, candidate, self.size_threshold)
+            description = ", ".join(f"{gain:+.2f}% {key}" for key, gain in gains.items())
+            return improves, description
+        
+        contribution = relative_gains(baseline, candidate, [self.objective])[self.objective]
+        return contribution >= self.size_threshold, f"{contribution:.2f}%"
+    
+    def run_svgo_with_plugins(self, plugins, output_file, log=print):
         """Run SVGO with specific plugins"""
         if not plugins:
             # No plugins = copy original file
             shutil.copy2(self.input_file, output_file)
             return True
         
-        # Create SVGO config
-        config = {
-            "plugins": plugins,
-            "multipass": True
-        }
-        
-        # Write config as ES module
-        config_content = f"""export default {json.dumps(config, indent=2)};"""
+        if self.trial_cache:
+            record = self.trial_cache.get_output(self.input_hash, plugins)
+            if record is not None:
+                if "error" in record:
+                    log(f"      ❌ SVGO failed (cached): {record['error']}")
+                    return False
+                log(f"      ♻️  Cached SVGO result")
+                write_if_changed(output_file, self.trial_cache.read_object(record["output"]), quiet=True)
+                return True
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.mjs', delete=False) as f:
-            f.write(config_content)
-            config_file = f.name
+        self.count_invocation("svgo")
+        try:
+            optimized = self.svgo_pool.optimize(
+                self.input_bytes,
+                plugins=plugins,
+                path=str(self.input_file),
+            )
+        except SVGOError as e:
+            log(f"      ❌ SVGO failed: {e}")
+            # Only SVGO's own rejections are deterministic; a crashed or
+            # unresponsive worker must not poison later runs
+            if self.trial_cache and not isinstance(e, SVGOWorkerError):
+                self.trial_cache.put_output(self.input_hash, plugins, error=str(e))
+            return False
         
+        if self.trial_cache:
+            self.trial_cache.put_output(self.input_hash, plugins, optimized)
+        write_if_changed(output_file, optimized, quiet=True)
+        return True
+    
+    def run_artifact_check(self, svg_file, log=print):
+        """Check that the candidate still matches the notes JSON and bar count"""
+        result = self.artifact_context.check_svg(Path(svg_file).read_bytes())
+        if result['valid']:
+            log("      ✅ Artifact consistency: PASSED")
+        else:
+            log("      ❌ Artifact consistency: FAILED")
+            print_artifact_result(result, lambda line: log(f"         {line}"))
+        return result['valid']
+    
+    def run_golden_check(self, svg_file, log=print):
+        """Check that the candidate is semantically equivalent to the golden SVG"""
+        diffs = self.golden.check_svg(Path(svg_file).read_bytes())
+        if not diffs:
+            log("      ✅ Golden equivalence: PASSED")
+        else:
+            log(f"      ❌ Golden equivalence: FAILED ({len(diffs)} difference(s))")
+            for diff in diffs[:5]:
+                log(f"         • {diff}")
+        return not diffs
+    
+    def run_test_in_workspace(self, svg_file, workspace, log=print):
+        """Run the custom test command against a candidate inside a scratch workspace"""
         try:
-            # Run SVGO
-            result = subprocess.run([
-                'npx', 'svgo',
-                '--config', config_file,
-                '--input', str(self.input_file),
-                '--output', str(output_file)
-            ], capture_output=True, text=True, timeout=30)
+            shutil.copyfile(svg_file, workspace.target)
+            result = subprocess.run(
+                self.test_command,
+                shell=True,
+                cwd=workspace.root,
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
             
-            success = result.returncode == 0 and output_file.exists()
+            success = result.returncode == 0
             
             if not success:
-                print(f"      ❌ SVGO failed: {result.stderr}")
+                log(f"      ❌ Test failed: {result.stderr}")
             
             return success
             
         except subprocess.TimeoutExpired:
-            print(f"      ❌ SVGO timeout")
+            log(f"      ❌ Test timeout")
+            self._inconclusive.flag = True
             return False
         except Exception as e:
-            print(f"      ❌ SVGO error: {e}")
+            log(f"      ❌ Test error: {e}")
+            self._inconclusive.flag = True
             return False
-        finally:
-            # Clean up temp config file
-            try:
-                os.unlink(config_file)
-            except:
-                pass
     
-    def run_functionality_test(self, svg_file):
+    def count_invocation(self, kind):
+        with self._counter_lock:
+            if kind == "svgo":
+                self.svgo_invocations += 1
+            else:
+                self.test_invocations += 1
+    
+    def run_functionality_test(self, svg_file, workspace=None, log=print):
         """Run the functionality test on the optimized SVG"""
-        if self.test_command:
+        self.count_invocation("test")
+        if self.artifact_context and not self.run_artifact_check(svg_file, log):
+            return False
+        if self.golden and not self.run_golden_check(svg_file, log):
+            return False
+        if self.test_command and workspace is not None:
+            return self.run_test_in_workspace(svg_file, workspace, log)
+        elif self.test_command:
             # Run custom test command if provided
             # Get absolute paths for comparison
             svg_file = Path(svg_file).resolve()
@@ -180,9 +371,11 @@ class IncrementalSVGOTester:
                     
                 except subprocess.TimeoutExpired:
                     print(f"      ❌ Test timeout")
+                    self._inconclusive.flag = True
                     return False
                 except Exception as e:
                     print(f"      ❌ Test error: {e}")
+                    self._inconclusive.flag = True
                     return False
             
             # For different files, we need to swap them temporarily
@@ -216,9 +409,11 @@ class IncrementalSVGOTester:
                 
             except subprocess.TimeoutExpired:
                 print(f"      ❌ Test timeout")
+                self._inconclusive.flag = True
                 return False
             except Exception as e:
                 print(f"      ❌ Test error: {e}")
+                self._inconclusive.flag = True
                 return False
             finally:
                 # Restore original file
@@ -227,44 +422,47 @@ class IncrementalSVGOTester:
                 elif target_svg.exists() and svg_file != target_svg:
                     target_svg.unlink()
         else:
-            # No custom test command - use SVG structure validator
-            print("      🔍 Running SVG structure validation...")
+            # No custom test command - validate the SVG structure in-process
+            log("      🔍 Running SVG structure validation...")
             try:
-                # Run the svg_validator.py script
-                validator_script = Path(__file__).parent / "svg_validator.py"
-                result = subprocess.run([
-                    'python3', str(validator_script), str(svg_file)
-                ], capture_output=True, text=True, timeout=30)
-                
-                success = result.returncode == 0
-                
-                if success:
-                    print("      ✅ SVG structure validation: PASSED")
-                else:
-                    print("      ❌ SVG structure validation: FAILED")
-                    # Print the validator output for debugging
-                    if result.stdout:
-                        for line in result.stdout.strip().split('\n'):
-                            if line.strip():
-                                print(f"         {line}")
-                
-                return success
-                
-            except subprocess.TimeoutExpired:
-                print(f"      ❌ Validator timeout")
-                return False
+                result = analyze_svg(Path(svg_file).read_bytes(), svg_file)
             except Exception as e:
-                print(f"      ❌ Validator error: {e}")
+                log(f"      ❌ Validator error: {e}")
                 return False
+            
+            if result['valid']:
+                log("      ✅ SVG structure validation: PASSED")
+            else:
+                log("      ❌ SVG structure validation: FAILED")
+                # Print the validator report for debugging
+                print_result(result, lambda line: log(f"         {line}"))
+            
+            return result['valid']
+    
+    def cached_functionality_test(self, svg_file, workspace=None, log=print):
+        """Run the functionality test unless its verdict for this content is cached"""
+        if not self.trial_cache:
+            return self.run_functionality_test(svg_file, workspace, log)
+        
+        output_hash = content_hash(Path(svg_file).read_bytes())
+        passed = self.trial_cache.get_test(output_hash, self.test_identity)
+        if passed is not None:
+            log(f"      ♻️  Cached test result: {'PASSED' if passed else 'FAILED'}")
+            return passed
+        
+        self._inconclusive.flag = False
+        passed = self.run_functionality_test(svg_file, workspace, log)
+        if not self._inconclusive.flag:
+            self.trial_cache.put_test(output_hash, self.test_identity, passed)
+        return passed
     
     def test_baseline(self):
         """Test that the original file passes functionality tests"""
         print("📊 Testing baseline (original file)...")
         
-        original_size = self.get_file_size(self.input_file)
-        print(f"   📏 Original size: {original_size:,} bytes")
+        print(f"   📏 Original: {format_metrics(self.original_metrics)}")
         
-        passes_test = self.run_functionality_test(self.input_file)
+        passes_test = self.cached_functionality_test(self.input_file)
         
         if passes_test:
             print(f"   ✅ Baseline functionality test: PASSED")
@@ -274,62 +472,271 @@ class IncrementalSVGOTester:
             print(f"   🚨 Cannot continue - original file must pass tests!")
             return False
     
-    def test_plugin_incrementally(self, plugin):
-        """Test adding one plugin to the current working set"""
-        test_plugins = self.working_plugins + [plugin]
+    def evaluate_candidate(self, plugin, working_plugins, baseline_metrics, workspace=None, log=print):
+        """
+        Test adding one plugin to a given working set.
         
-        print(f"   🔧 Testing with {len(test_plugins)} plugins: {self.working_plugins} + {plugin}")
+        Returns:
+            tuple: (status, metrics) - status is True, "useless" or False;
+                   metrics is the svg_metrics dict (None if SVGO failed)
+        """
+        test_plugins = working_plugins + [plugin]
+        
+        log(f"   🔧 Testing with {len(test_plugins)} plugins: {working_plugins} + {plugin}")
         
         # Generate optimized SVG
         test_file = self.test_dir / f"test_{len(test_plugins):02d}_{plugin}.svg"
         
-        # Get baseline size (before adding this plugin)
-        if self.working_plugins:
-            # Find the last working plugin file
-            last_working_plugin = self.working_plugins[-1]
-            # Find the file for that plugin
-            baseline_file = None
-            for existing_file in self.test_dir.glob("*.svg"):
-                if existing_file.stem.endswith(last_working_plugin):
-                    baseline_file = existing_file
-                    break
-            baseline_size = self.get_file_size(baseline_file) if baseline_file else self.get_file_size(self.input_file)
-        else:
-            baseline_size = self.get_file_size(self.input_file)
-        
         # Run SVGO
-        svgo_success = self.run_svgo_with_plugins(test_plugins, test_file)
+        svgo_success = self.run_svgo_with_plugins(test_plugins, test_file, log)
         if not svgo_success:
-            print(f"      ❌ SVGO failed with {len(test_plugins)} plugins")
-            return False
+            log(f"      ❌ SVGO failed with {len(test_plugins)} plugins")
+            return False, None
         
-        # Get new file size
-        new_size = self.get_file_size(test_file)
-        original_size = self.get_file_size(self.input_file)
+        # Get new metrics, judged by the objective
+        metrics = self.measure(test_file)
+        meets_threshold, plugin_contribution = self.judge(baseline_metrics, metrics)
         
-        # Calculate reductions (negative = good reduction, positive = bad increase)
-        total_reduction = ((original_size - new_size) / original_size) * 100
-        plugin_contribution = ((baseline_size - new_size) / baseline_size) * 100 if baseline_size > 0 else 0
+        # Calculate reduction (negative = good reduction, positive = bad increase)
+        total_reduction = relative_gains(self.original_metrics, metrics, ["raw"])["raw"]
         
-        print(f"      📏 Size: {new_size:,} bytes ({total_reduction:+.1f}% total)")
-        print(f"      📊 This plugin's contribution: {plugin_contribution:.2f}%")
+        log(f"      📏 Size: {format_metrics(metrics)} ({total_reduction:+.1f}% raw total)")
+        log(f"      📊 This plugin's contribution: {plugin_contribution}")
         
         # Test functionality first
-        test_success = self.run_functionality_test(test_file)
+        test_success = self.cached_functionality_test(test_file, workspace, log)
         
         if not test_success:
-            print(f"      ❌ Functionality test: FAILED")
-            print(f"      💥 Plugin '{plugin}' breaks functionality when combined with: {self.working_plugins}")
-            return False
+            log(f"      ❌ Functionality test: FAILED")
+            log(f"      💥 Plugin '{plugin}' breaks functionality when combined with: {working_plugins}")
+            return False, metrics
         
-        print(f"      ✅ Functionality test: PASSED")
+        log(f"      ✅ Functionality test: PASSED")
         
         # Check if plugin provides meaningful size reduction
-        if plugin_contribution < self.size_threshold:
-            print(f"      ⚠️  Plugin contribution ({plugin_contribution:.2f}%) below threshold ({self.size_threshold}%)")
-            return "useless"
+        if not meets_threshold and self.objective == "pareto":
+            log(f"      ⚠️  No Pareto improvement of {self.size_threshold}% without a regression ({plugin_contribution})")
+            return "useless", metrics
+        if not meets_threshold:
+            log(f"      ⚠️  Plugin contribution ({plugin_contribution}) below threshold ({self.size_threshold}%)")
+            return "useless", metrics
+        
+        return True, metrics
+    
+    def test_plugin_incrementally(self, plugin):
+        """Test adding one plugin to the current working set"""
+        success, metrics = self.evaluate_candidate(plugin, self.working_plugins, self.current_metrics)
+        if success is True:
+            self.current_metrics = metrics
+        return success, metrics
+    
+    def record_result(self, plugin, success, metrics=None):
+        """Apply one plugin's verdict to the working set"""
+        if success is True:
+            self.working_plugins.append(plugin)
+            print(f"      ✅ ADDED to config ({len(self.working_plugins)} working total)")
+        elif success == "useless":
+            self.useless_plugins.append(plugin)
+            print(f"      🗑️  MARKED as useless ({len(self.useless_plugins)} useless total)")
+        else:  # success is False
+            self.failed_plugins.append(plugin)
+            print(f"      ❌ REJECTED ({len(self.failed_plugins)} failed total)")
+        
+        # Record result
+        self.test_results.append({
+            "plugin": plugin,
+            "success": success,
+            "total_plugins": len(self.working_plugins),
+            "metrics": metrics
+        })
+    
+    def print_plugin_header(self, i, plugin):
+        useless_count = len(self.useless_plugins)
+        useless_info = f"{useless_count} plugins marked useless" if useless_count > 0 else ""
         
-        return True
+        print(f"\n[{i:2}/{len(PLUGINS)}] Testing plugin: {plugin}")
+        if useless_info:
+            print(f"             {useless_info}")
+    
+    def build_sequential(self):
+        """Test each plugin in order against the growing working set"""
+        for i, plugin in enumerate(PLUGINS, 1):
+            self.print_plugin_header(i, plugin)
+            success, metrics = self.test_plugin_incrementally(plugin)
+            self.record_result(plugin, success, metrics)
+    
+    def build_parallel(self):
+        """
+        Evaluate the next `jobs` plugins concurrently against the current
+        working set and merge their verdicts in plugin order.
+        
+        Rejected and useless plugins leave the working set unchanged, so the
+        speculative results that follow them stay valid. An accepted plugin
+        changes the working set: the results after it are discarded and
+        re-evaluated in the next round.
+        """
+        target_name = self.input_file.name
+        workspaces = queue.Queue()
+        if self.test_command:
+            for _ in range(self.jobs):
+                workspaces.put(ScratchWorkspace(self.working_dir, target_name, exclude=(self.test_dir.name,)))
+        
+        def evaluate(plugin, working_plugins, baseline_metrics):
+            messages = []
+            workspace = workspaces.get() if self.test_command else None
+            try:
+                success, metrics = self.evaluate_candidate(
+                    plugin, working_plugins, baseline_metrics, workspace, messages.append
+                )
+            finally:
+                if workspace is not None:
+                    workspaces.put(workspace)
+            return success, metrics, messages
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                index = 0
+                while index < len(PLUGINS):
+                    # The same plugin twice in one round would write the same test file
+                    batch = []
+                    for plugin in PLUGINS[index:index + self.jobs]:
+                        if plugin in batch:
+                            break
+                        batch.append(plugin)
+                    
+                    working_plugins = list(self.working_plugins)
+                    futures = [
+                        executor.submit(evaluate, plugin, working_plugins, self.current_metrics)
+                        for plugin in batch
+                    ]
+                    
+                    for offset, (plugin, future) in enumerate(zip(batch, futures)):
+                        success, metrics, messages = future.result()
+                        self.print_plugin_header(index + offset + 1, plugin)
+                        for message in messages:
+                            print(message)
+                        self.record_result(plugin, success, metrics)
+                        if success is True:
+                            self.current_metrics = metrics
+                            break
+                    
+                    consumed = offset + 1
+                    self.discarded_evaluations += len(batch) - consumed
+                    for future in futures[consumed:]:
+                        future.result()  # Let discarded runs finish before their files are reused
+                    index += consumed
+        finally:
+            while not workspaces.empty():
+                workspaces.get().close()
+    
+    def simulate_plugins(self, chunk):
+        """
+        SVGO-only pass over a chunk of plugins: the greedy size verdicts,
+        assuming every functionality test passes.
+        
+        Returns:
+            tuple: (verdicts, accepted, final_metrics, combined_file) where
+                   verdicts is [(index, plugin, success, metrics), ...] and
+                   combined_file is the output for working set + accepted
+        """
+        verdicts = []
+        accepted = []
+        current = self.current_metrics
+        combined_file = None
+        
+        for i, plugin in chunk:
+            test_plugins = self.working_plugins + accepted + [plugin]
+            test_file = self.test_dir / f"test_{len(test_plugins):02d}_{plugin}.svg"
+            
+            if not self.run_svgo_with_plugins(test_plugins, test_file):
+                verdicts.append((i, plugin, False, None))
+                continue
+            
+            metrics = self.measure(test_file)
+            if not self.judge(current, metrics)[0]:
+                verdicts.append((i, plugin, "useless", metrics))
+            else:
+                accepted.append(plugin)
+                current = metrics
+                combined_file = test_file
+                verdicts.append((i, plugin, True, metrics))
+        
+        return verdicts, accepted, current, combined_file
+    
+    def bisect_plugins(self, chunk):
+        """Test a chunk of plugins at once, splitting it in half on failure"""
+        verdicts, accepted, final_metrics, combined_file = self.simulate_plugins(chunk)
+        
+        passed = True
+        if accepted:
+            print(f"\n🔀 Plugins {chunk[0][0]}-{chunk[-1][0]}: testing {len(accepted)} size-reducing plugins at once")
+            passed = self.cached_functionality_test(combined_file)
+            print(f"      {'✅ Functionality test: PASSED' if passed else '❌ Functionality test: FAILED'}")
+        
+        if passed:
+            for i, plugin, success, metrics in verdicts:
+                self.print_plugin_header(i, plugin)
+                self.record_result(plugin, success, metrics)
+            if accepted:
+                self.current_metrics = final_metrics
+            return
+        
+        if len(accepted) == 1:
+            # Every other plugin in the chunk leaves the working set unchanged,
+            # so the single candidate is the one that breaks functionality
+            for i, plugin, success, metrics in verdicts:
+                self.print_plugin_header(i, plugin)
+                if success is True:
+                    print(f"      💥 Plugin '{plugin}' breaks functionality when combined with: {self.working_plugins}")
+                self.record_result(plugin, False if success is True else success, metrics)
+            return
+        
+        middle = len(chunk) // 2
+        self.bisect_plugins(chunk[:middle])
+        self.bisect_plugins(chunk[middle:])
+    
+    def confirm_useless(self, plugins):
+        """
+        Test plugins marked useless from SVGO output alone, all at once on
+        top of the final working set, splitting the set on failure. A plugin
+        that breaks functionality is moved from useless to failed, as the
+        greedy search would report it.
+        """
+        test_plugins = self.working_plugins + plugins
+        test_file = self.test_dir / f"test_useless_{plugins[0]}_{len(plugins):02d}.svg"
+        print(f"\n🔀 Checking {len(plugins)} useless plugin(s) at once: {', '.join(plugins)}")
+        passed = (self.run_svgo_with_plugins(test_plugins, test_file)
+                  and self.cached_functionality_test(test_file))
+        print(f"      {'✅ Functionality test: PASSED' if passed else '❌ Functionality test: FAILED'}")
+        if passed:
+            return
+        
+        if len(plugins) == 1:
+            plugin = plugins[0]
+            print(f"      💥 Plugin '{plugin}' breaks functionality when combined with: {self.working_plugins}")
+            self.useless_plugins.remove(plugin)
+            self.failed_plugins.append(plugin)
+            for result in self.test_results:
+                if result["plugin"] == plugin and result["success"] == "useless":
+                    result["success"] = False
+            return
+        
+        middle = len(plugins) // 2
+        self.confirm_useless(plugins[:middle])
+        self.confirm_useless(plugins[middle:])
+    
+    def build_bisect(self):
+        """
+        Delta-debugging search: apply all remaining plugins at once and
+        bisect only when the functionality test fails.
+        
+        Plugins below the size threshold never change the working set, so
+        they are left out of the bisection and checked afterwards, together
+        against the final working set (see confirm_useless).
+        """
+        self.bisect_plugins(list(enumerate(PLUGINS, 1)))
+        if self.useless_plugins:
+            self.confirm_useless(list(dict.fromkeys(self.useless_plugins)))
     
     def build_optimal_config(self):
         """Build optimal config by testing each plugin incrementally"""
@@ -342,37 +749,30 @@ class IncrementalSVGOTester:
         
         print(f"\n🔄 Testing {len(PLUGINS)} plugins incrementally...")
         
-        for i, plugin in enumerate(PLUGINS, 1):
-            useless_count = len(self.useless_plugins)
-            useless_info = f"{useless_count} plugins marked useless" if useless_count > 0 else ""
-            
-            print(f"\n[{i:2}/{len(PLUGINS)}] Testing plugin: {plugin}")
-            if useless_info:
-                print(f"             {useless_info}")
-            
-            success = self.test_plugin_incrementally(plugin)
-            
-            if success is True:
-                self.working_plugins.append(plugin)
-                print(f"      ✅ ADDED to config ({len(self.working_plugins)} working total)")
-            elif success == "useless":
-                self.useless_plugins.append(plugin)
-                print(f"      🗑️  MARKED as useless ({len(self.useless_plugins)} useless total)")
-            else:  # success is False
-                self.failed_plugins.append(plugin)
-                print(f"      ❌ REJECTED ({len(self.failed_plugins)} failed total)")
-            
-            # Record result
-            self.test_results.append({
-                "plugin": plugin,
-                "success": success,
-                "total_plugins": len(self.working_plugins)
-            })
+        started = time.perf_counter()
+        if self.strategy == "bisect":
+            self.build_bisect()
+        elif self.jobs > 1:
+            self.build_parallel()
+        else:
+            self.build_sequential()
+        elapsed = time.perf_counter() - started
+        cache_info = ""
+        if self.trial_cache:
+            cache_info = f"   📦 Trial cache: {self.trial_cache.hits} hits, {self.trial_cache.misses} misses\n"
         
         print(f"\n📋 Final Results:")
         print(f"   ✅ Working plugins: {len(self.working_plugins)}")
         print(f"   🗑️  Useless plugins: {len(self.useless_plugins)}")
         print(f"   ❌ Failed plugins: {len(self.failed_plugins)}")
+        if self.strategy == "bisect":
+            print(f"   ⏱️  Search time: {elapsed:.1f}s (bisect)")
+        else:
+            print(f"   ⏱️  Search time: {elapsed:.1f}s ({self.jobs} job{'s' if self.jobs > 1 else ''}"
+                  f"{f', {self.discarded_evaluations} speculative evaluations discarded' if self.jobs > 1 else ''})")
+        print(f"   🔢 Invocations ({self.strategy}): {self.svgo_invocations} SVGO runs, "
+              f"{self.test_invocations} functionality tests")
+        print(cache_info, end="")
         
         return True
     
@@ -391,9 +791,12 @@ class IncrementalSVGOTester:
             reduction = ((original_size - final_size) / original_size) * 100
             
             print(f"\n🎯 Final Optimization Results:")
-            print(f"   📏 Original: {original_size:,} bytes")
-            print(f"   📏 Optimized: {final_size:,} bytes")
-            print(f"   📉 Reduction: {reduction:.1f}%")
+            final_metrics = self.measure(final_svg)
+            gains = relative_gains(self.original_metrics, final_metrics,
+                                   [name for name in final_metrics if name not in ("href_elements", "data_bar_elements")])
+            print(f"   📏 Original: {format_metrics(self.original_metrics)}")
+            print(f"   📏 Optimized: {format_metrics(final_metrics)}")
+            print(f"   📉 Reduction: " + ", ".join(f"{gain:.1f}% {name}" for name, gain in gains.items()))
         
         # Generate SVGO config file
         config_file = self.test_dir / "svgo.config.js"
@@ -411,8 +814,7 @@ module.exports = {{
 }};
 """
         
-        with open(config_file, 'w') as f:
-            f.write(config_content)
+        write_if_changed(config_file, config_content)
         
         # Generate report
         report_file = self.test_dir / "test_report.json"
@@ -421,15 +823,32 @@ module.exports = {{
             "input_file": str(self.input_file),
             "test_command": self.test_command,
             "size_threshold": self.size_threshold,
+            "strategy": self.strategy,
+            "jobs": self.jobs,
+            "svgo_invocations": self.svgo_invocations,
+            "test_invocations": self.test_invocations,
+            "discarded_evaluations": self.discarded_evaluations,
+            "cache_hits": self.trial_cache.hits if self.trial_cache else 0,
+            "cache_misses": self.trial_cache.misses if self.trial_cache else 0,
             "original_size": self.get_file_size(self.input_file),
             "final_size": self.get_file_size(final_svg) if svgo_success else 0,
+            "objective": self.objective,
+            "original_metrics": self.original_metrics,
+            "final_metrics": self.measure(final_svg) if svgo_success else None,
+            "pareto_front": [
+                {"plugin": result["plugin"], "total_plugins": result["total_plugins"], "metrics": result["metrics"]}
+                for result, _ in pareto_front(
+                    [(result, result["metrics"]) for result in self.test_results
+                     if result["metrics"] and result["success"] is not False]
+                )
+            ],
             "working_plugins": self.working_plugins,
             "failed_plugins": self.failed_plugins,
             "useless_plugins": self.useless_plugins,
             "detailed_results": self.test_results
         }
         
-        with open(report_file, 'w') as f:
+        with AtomicOutput(report_file) as f:
             json.dump(report, f, indent=2)
         
         # Generate usage instructions
@@ -474,8 +893,7 @@ cp {final_svg} ./optimized_output.svg
 {chr(10).join(f'- `{plugin}`' for plugin in self.useless_plugins) if self.useless_plugins else '- None (all plugins were effective!)'}
 """
         
-        with open(usage_file, 'w') as f:
-            f.write(usage_content)
+        write_if_changed(usage_file, usage_content)
         
         print(f"\n📁 Generated files:")
         print(f"   ✅ Optimal config: {config_file}")
@@ -486,40 +904,92 @@ cp {final_svg} ./optimized_output.svg
         return config_file
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 svgo_test_framework.py <input.svg> [test_command] [size_threshold]")
-        print("Examples:")
-        print("  python3 svgo_test_framework.py input.svg 'npm test'")
-        print("  python3 svgo_test_framework.py input.svg 'make test' 1.5")
-        print("  python3 svgo_test_framework.py input.svg  # Manual testing, 1% threshold")
-        print("  python3 svgo_test_framework.py input.svg '' 0.15  # Manual testing, 0.15% threshold")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='Build an optimal SVGO configuration by testing each plugin incrementally',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 svgo_test_framework.py input.svg 'npm test'
+  python3 svgo_test_framework.py input.svg 'make test' 1.5
+  python3 svgo_test_framework.py input.svg  # Manual testing, 0.15% threshold
+  python3 svgo_test_framework.py input.svg '' 0.15 --jobs 8  # 8 candidates at a time
+        """
+    )
+    parser.add_argument('input_file', help='Input SVG file')
+    parser.add_argument('test_command', nargs='?', default=None,
+                        help='Functionality test command (default: SVG structure validator)')
+    parser.add_argument('size_threshold', nargs='?', type=float, default=0.15,
+                        help='Minimum size reduction per plugin in percent (default: 0.15)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of candidates evaluated concurrently (default: 1)')
+    parser.add_argument('--strategy', choices=['greedy', 'bisect'], default='greedy',
+                        help='greedy: one test per plugin; bisect: test plugin sets, split on failure')
+    parser.add_argument('--objective', choices=available_objectives() + ['pareto'], default='raw',
+                        help='What the threshold applies to: a size (brotli needs the brotli package) or '
+                             'pareto (gzip size and element count; default: raw)')
+    parser.add_argument('--parse-repeats', type=int, default=5,
+                        help='Timed parses per trial; the median is recorded (default: 5)')
+    parser.add_argument('--artifacts', metavar='CONFIG',
+                        help='Also require consistency with the notes/bars of this player config '
+                             '(e.g. ../exports/bwv1006.config.yaml)')
+    parser.add_argument('--golden', nargs='?', const='', metavar='SVG',
+                        help='Also require semantic equivalence with this SVG (default: the input file)')
+    parser.add_argument('--golden-tol', type=float, default=1e-3,
+                        help='Absolute tolerance for numbers in the golden comparison (default: 0.001, '
+                             'the precision SVGO rounds to)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Trial cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Run every trial, without reading or writing the cache')
+    args = parser.parse_args()
+    if args.strategy == 'bisect' and args.jobs > 1:
+        parser.error('--strategy bisect runs sequentially; it cannot be combined with --jobs')
     
-    input_file = sys.argv[1]
-    test_command = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] else None
-    size_threshold = float(sys.argv[3]) if len(sys.argv) > 3 else 0.15
+    input_file = args.input_file
+    test_command = args.test_command or None
+    size_threshold = args.size_threshold
     
     if not Path(input_file).exists():
         print(f"❌ Input file not found: {input_file}")
         sys.exit(1)
     
     # Check if SVGO is available
+    svgo_pool = SVGOPool(size=args.jobs)
     try:
-        subprocess.run(['npx', 'svgo', '--version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ SVGO not available. Install with: npm install -g svgo")
+        svgo_version = svgo_pool.version()
+        print(f"🔧 SVGO {svgo_version} worker ready")
+    except SVGOError as e:
+        print(f"❌ SVGO not available ({e}). Install with: npm install -g svgo")
+        svgo_pool.close()
         sys.exit(1)
     
     # Run incremental testing
-    tester = IncrementalSVGOTester(input_file, test_command, size_threshold)
+    artifact_context = None
+    if args.artifacts:
+        artifact_context, _, _ = ArtifactContext.from_config(args.artifacts)
+        if not artifact_context.notes:
+            print(f"❌ No notes found through {args.artifacts}")
+            svgo_pool.close()
+            sys.exit(1)
     
-    if tester.build_optimal_config():
-        config_file = tester.generate_final_config()
-        print(f"\n🎉 Success! Optimal SVGO config generated.")
-        print(f"💡 To use: cp {config_file} ./svgo.config.js")
-    else:
-        print(f"\n❌ Failed to build optimal config")
-        sys.exit(1)
+    golden = None
+    if args.golden is not None:
+        golden = GoldenSVG(Path(args.golden or input_file).read_bytes(), abs_tol=args.golden_tol)
+    
+    trial_cache = None if args.no_cache else SVGOTrialCache(args.cache_dir, svgo_version)
+    tester = IncrementalSVGOTester(input_file, test_command, size_threshold, svgo_pool, args.jobs, trial_cache,
+                                   args.strategy, artifact_context, args.objective, args.parse_repeats,
+                                   golden)
+    try:
+        if tester.build_optimal_config():
+            config_file = tester.generate_final_config()
+            print(f"\n🎉 Success! Optimal SVGO config generated.")
+            print(f"💡 To use: cp {config_file} ./svgo.config.js")
+        else:
+            print(f"\n❌ Failed to build optimal config")
+            sys.exit(1)
+    finally:
+        svgo_pool.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for SVGO plugin trials
+
+A trial is one SVGO run with an ordered plugin list followed by one
+functionality test. Both halves are cached on disk and shared by every run
+of svgo_test_framework.py:
+
+  svgo/<key>.json     (input hash, plugin list, SVGO version) -> output hash + size
+  tests/<key>.json    (output hash, test identity)            -> passed
+  objects/<hash>.svg  optimized SVG bytes, stored once per content
+
+Test results are keyed by the optimized content rather than by the plugin
+list, so two plugin sets that produce the same bytes share one test run.
+
+Usage: python3 svgo_trial_cache.py [cache_dir]            # Show statistics
+       python3 svgo_trial_cache.py [cache_dir] --clear    # Remove all entries
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = ".svgo_trial_cache"
+
+
+def content_hash(data):
+    """SHA-256 of bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_identity(test_command, validator_script=None):
+    """
+    Describe what a functionality test checks.
+
+    Custom commands are identified by their text; the built-in validator by
+    the hash of its source, so editing svg_validator.py invalidates results.
+    """
+    if test_command:
+        return f"command:{test_command}"
+    source = Path(validator_script).read_bytes() if validator_script else b""
+    return f"validator:{content_hash(source)}"
+
+
+class SVGOTrialCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, svgo_version="unknown"):
+        self.root = Path(cache_dir)
+        self.svgo_version = svgo_version
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        for subdir in ("svgo", "tests", "objects"):
+            (self.root / subdir).mkdir(parents=True, exist_ok=True)
+
+    # Keys and storage
+
+    def _key(self, *parts):
+        return content_hash(json.dumps(parts).encode("utf-8"))
+
+    def _read(self, path):
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_atomic(self, path, data):
+        """Write through a temporary file so concurrent readers never see partial data"""
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def _object_path(self, digest):
+        return self.root / "objects" / digest[:2] / f"{digest}.svg"
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # SVGO results
+
+    def get_output(self, input_hash, plugins):
+        """
+        Look up an SVGO result.
+
+        Returns:
+            dict or None: {"output": hash, "size": bytes} or {"error": message}
+        """
+        record = self._read(self.root / "svgo" / f"{self._key(input_hash, list(plugins), self.svgo_version)}.json")
+        if record and "output" in record and not self._object_path(record["output"]).exists():
+            record = None
+        self._count(record is not None)
+        return record
+
+    def put_output(self, input_hash, plugins, data=None, error=None):
+        """Store an SVGO result (optimized bytes or an error message)"""
+        if error is not None:
+            record = {"error": error}
+        else:
+            digest = content_hash(data)
+            object_path = self._object_path(digest)
+            if not object_path.exists():
+                object_path.parent.mkdir(exist_ok=True)
+                self._write_atomic(object_path, data)
+            record = {"output": digest, "size": len(data)}
+        record["plugins"] = list(plugins)
+        record["svgo_version"] = self.svgo_version
+
+        key = self._key(input_hash, list(plugins), self.svgo_version)
+        self._write_atomic(self.root / "svgo" / f"{key}.json", json.dumps(record).encode("utf-8"))
+        return record
+
+    def read_object(self, digest):
+        return self._object_path(digest).read_bytes()
+
+    # Functionality test results
+
+    def get_test(self, output_hash, identity):
+        """Return the cached verdict (True/False) or None"""
+        record = self._read(self.root / "tests" / f"{self._key(output_hash, identity)}.json")
+        self._count(record is not None)
+        return record["passed"] if record else None
+
+    def put_test(self, output_hash, identity, passed):
+        key = self._key(output_hash, identity)
+        record = {"output": output_hash, "test": identity, "passed": bool(passed)}
+        self._write_atomic(self.root / "tests" / f"{key}.json", json.dumps(record).encode("utf-8"))
+
+    # Maintenance
+
+    def stats(self):
+        objects = list((self.root / "objects").glob("*/*.svg"))
+        return {
+            "svgo_results": len(list((self.root / "svgo").glob("*.json"))),
+            "test_results": len(list((self.root / "tests").glob("*.json"))),
+            "objects": len(objects),
+            "object_bytes": sum(p.stat().st_size for p in objects),
+        }
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    cache_dir = Path(args[0]) if args else Path(DEFAULT_CACHE_DIR)
+
+    if not cache_dir.exists():
+        print(f"ℹ️  No trial cache at {cache_dir}")
+        return 0
+
+    cache = SVGOTrialCache(cache_dir)
+    if "--clear" in sys.argv:
+        cache.clear()
+        print(f"🗑️  Cleared trial cache: {cache_dir}")
+        return 0
+
+    stats = cache.stats()
+    print(f"📦 SVGO trial cache: {cache_dir}")
+    print(f"   SVGO results: {stats['svgo_results']}")
+    print(f"   Test results: {stats['test_results']}")
+    print(f"   Stored SVGs:  {stats['objects']} ({stats['object_bytes']:,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,9 @@
 
 # Validate all SVG files in a directory
 # Usage: ./validate_all_svgs.sh <directory>
+#
+# Delegates to validate_svgs.py, which validates every file in-process
+# across a worker pool instead of starting one interpreter per file.
 
 if [ $# -ne 1 ]; then
     echo "Usage: $0 <directory>"
@@ -16,12 +19,4 @@ if [ ! -d "$DIRECTORY" ]; then
     exit 1
 fi
 
-echo "🔍 Validating all SVG files in: $DIRECTORY"
-echo
-
-# Find all .svg files and run validator on each
-find "$DIRECTORY" -name "*.svg" -type f | sort | while read -r svg_file; do
-    echo "Testing: $(basename "$svg_file")"
-    python3 optim/svg_validator.py "$svg_file"
-    echo
-done
\ No newline at end of file
+exec python3 "$(dirname "$0")/validate_svgs.py" "$DIRECTORY"
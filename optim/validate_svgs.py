@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Validate all SVG files in a directory
+
+Runs the svg_validator.py checks in-process across a pool of worker
+processes, instead of one interpreter per file.
+
+Usage: python3 validate_svgs.py <directory> [--jobs N] [--json]
+Example: python3 validate_svgs.py svgo_incremental_20250525_153244
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from svg_validator import print_result, validate_files
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate all SVG files in a directory')
+    parser.add_argument('directory', help='Directory to search for .svg files (recursively)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON instead of the validator report')
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"❌ Directory not found: {directory}")
+        sys.exit(1)
+
+    svg_files = sorted(directory.rglob("*.svg"))
+    results = validate_files(svg_files, jobs=args.jobs)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"🔍 Validating all SVG files in: {directory}")
+        print()
+        for result in results:
+            print(f"Testing: {Path(result['name']).name}")
+            print_result(result)
+            print()
+
+        valid_count = sum(1 for result in results if result['valid'])
+        print(f"📋 {valid_count}/{len(results)} SVG files valid")
+
+    sys.exit(0 if all(result['valid'] for result in results) else 1)
+
+if __name__ == "__main__":
+    main()
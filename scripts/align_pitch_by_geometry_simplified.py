@@ -19,22 +19,56 @@ Output:
 
 The alignment process ensures that visual noteheads in the SVG match their
 corresponding MIDI events for precise animated score following.
+
+Rows are plain dicts read with the csv module: the tables are a few
+thousand rows, and float() parses the CSV numbers back exactly.
 """
 
-import pandas as pd
+import csv
+import sys
 import json
 
-def main():
-    """Main function with project context support."""
-
-    # =============================================================================
-    # DATA LOADING
-    # =============================================================================
-
-    print("📁 Loading input data files...")
-    midi_df = pd.read_csv("bwv1006_csv_midi_note_events.csv")
-    svg_df = pd.read_csv("bwv1006_csv_svg_note_heads.csv") 
-    ties_df = pd.read_csv("bwv1006_ties.csv")
+from atomic_output import AtomicOutput
+from pipeline_trace import Phases, startup_profile
+
+MIDI_CSV = "bwv1006_csv_midi_note_events.csv"
+SVG_CSV = "bwv1006_csv_svg_note_heads.csv"
+TIES_CSV = "bwv1006_ties.csv"
+OUTPUT_JSON = "exports/bwv1006_json_notes.json"
+
+def read_csv_rows(path, numeric=()):
+    """
+    Read a CSV file into a list of dicts.
+    
+    Args:
+        path (str): CSV file with a header row
+        numeric (dict): Column name -> type (int or float) to convert
+        
+    Returns:
+        list: One dict per row
+    """
+    numeric = dict(numeric)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for column, kind in numeric.items():
+            row[column] = kind(row[column])
+    return rows
+
+def align_notes(midi_notes, noteheads, ties, phases=None):
+    """
+    Align MIDI note events with SVG noteheads.
+    
+    Args:
+        midi_notes (list): MIDI event dicts (pitch, channel, on, off), as written by midi_map.py
+        noteheads (list): Notehead dicts (index, x, y, snippet, href), as written by svg_extract_note_heads.py
+        ties (list): Tie dicts (primary, secondary)
+        phases (Phases): Optional phase recorder (sort, align)
+        
+    Returns:
+        list: Aligned notes (hrefs, on, off, pitch, channel) in playback order
+    """
+    phases = phases or Phases("align_pitch_by_geometry_simplified")
 
     # =============================================================================
     # STEP 1: CLEAN SVG HREF PATHS
@@ -43,11 +77,12 @@ def main():
     # Remove LilyPond editor artifacts from href paths to normalize references
     # Example: "textedit:///work/file.ly:10:5" -> "file.ly:10:5"
     print("🧹 Normalizing SVG href paths...")
-    svg_df["href"] = (
-        svg_df["href"]
-        .str.replace("textedit://", "", regex=False)  # Remove protocol prefix
-        .str.replace("/work/", "", regex=False)       # Remove workspace path
-    )
+    noteheads = [
+        dict(note, href=note["href"]
+             .replace("textedit://", "")   # Remove protocol prefix
+             .replace("/work/", ""))       # Remove workspace path
+        for note in noteheads
+    ]
 
     # =============================================================================
     # STEP 2: HANDLE TIED NOTES
@@ -57,10 +92,10 @@ def main():
     # a single sustained sound. We only want the primary (first) notehead for
     # alignment, so we filter out secondary tied noteheads.
     print("🎵 Filtering out secondary tied noteheads...")
-    secondary_hrefs = set(ties_df["secondary"])
-    original_count = len(svg_df)
-    svg_df = svg_df[~svg_df["href"].isin(secondary_hrefs)].copy()
-    filtered_count = len(svg_df)
+    secondary_hrefs = {tie["secondary"] for tie in ties}
+    original_count = len(noteheads)
+    noteheads = [note for note in noteheads if note["href"] not in secondary_hrefs]
+    filtered_count = len(noteheads)
     print(f"   Removed {original_count - filtered_count} secondary noteheads")
 
     # =============================================================================
@@ -71,19 +106,19 @@ def main():
     # 1. Primary: onset time (ascending)
     # 2. Secondary: channel (descending - higher channels first)  
     # 3. Tertiary: pitch (ascending)
+    phases.start("sort")
     print("📊 Sorting datasets for geometric alignment...")
-    midi_df = midi_df.sort_values(
-        by=["on", "channel", "pitch"], 
-        ascending=[True, False, True]
-    ).reset_index(drop=True)
+    midi_notes = sorted(midi_notes, key=lambda note: (note["on"], -note["channel"], note["pitch"]))
 
     # Sort SVG noteheads by visual position:
     # 1. Primary: x-coordinate (left to right)
     # 2. Secondary: y-coordinate (top to bottom, hence descending)
-    svg_df = svg_df.sort_values(
-        by=["x", "y"], 
-        ascending=[True, False]
-    ).reset_index(drop=True)
+    noteheads = sorted(noteheads, key=lambda note: (note["x"], -note["y"]))
+
+    # Tie lookup table: primary href -> secondary hrefs, in file order
+    ties_by_primary = {}
+    for tie in ties:
+        ties_by_primary.setdefault(tie["primary"], []).append(tie["secondary"])
 
     # =============================================================================
     # LILYPOND PITCH PARSING
@@ -166,7 +201,7 @@ def main():
     # TIE GROUP PROCESSING
     # =============================================================================
 
-    def collect_full_tie_group(primary_href, ties_df):
+    def collect_full_tie_group(primary_href, ties_by_primary):
         """
         Collect all noteheads connected by ties, starting from a primary notehead.
         
@@ -176,14 +211,14 @@ def main():
         
         Args:
             primary_href (str): Starting notehead reference
-            ties_df (DataFrame): Tie relationships with 'primary' and 'secondary' columns
+            ties_by_primary (dict): Primary href -> hrefs of the notes it ties to
             
         Returns:
             list: All href references in the tie group, including the starting primary
             
         Example:
             If Note A ties to B, and B ties to C:
-            collect_full_tie_group("A", ties_df) -> ["A", "B", "C"]
+            collect_full_tie_group("A", ties_by_primary) -> ["A", "B", "C"]
         """
         tie_group = [primary_href]  # Start with the primary notehead
         visited = set(tie_group)    # Track visited notes to prevent infinite loops
@@ -194,10 +229,7 @@ def main():
             current_href = processing_queue.pop(0)
             
             # Find all notes that this current note ties TO
-            tied_secondaries = ties_df.loc[
-                ties_df["primary"] == current_href, 
-                "secondary"
-            ].tolist()
+            tied_secondaries = ties_by_primary.get(current_href, [])
             
             # Add newly discovered tied notes to our group
             for secondary_href in tied_secondaries:
@@ -212,16 +244,17 @@ def main():
     # MAIN ALIGNMENT PROCESS
     # =============================================================================
 
+    phases.start("align")
     print("🎯 Aligning MIDI events with SVG noteheads...")
     aligned_notes = []
     mismatch_count = 0
 
     # Process each MIDI-SVG pair in synchronized order
-    for index, (midi_row, svg_row) in enumerate(zip(midi_df.itertuples(), svg_df.itertuples())):
+    for index, (midi_row, svg_row) in enumerate(zip(midi_notes, noteheads)):
         
         # Extract pitch information from both sources
-        lilypond_pitch = parse_lilypond_note(svg_row.snippet)
-        midi_pitch_class = midi_row.pitch % 12  # Reduce to pitch class (0-11)
+        lilypond_pitch = parse_lilypond_note(svg_row["snippet"])
+        midi_pitch_class = midi_row["pitch"] % 12  # Reduce to pitch class (0-11)
         
         # Convert LilyPond pitch to pitch class for comparison
         if lilypond_pitch != -1:
@@ -232,37 +265,36 @@ def main():
         # Verify pitch class alignment
         if lilypond_pitch_class != midi_pitch_class:
             print(f"⚠️  Pitch mismatch at position {index}:")
-            print(f"    MIDI: pitch={midi_row.pitch} (class={midi_pitch_class})")
-            print(f"    LilyPond: '{svg_row.snippet}' -> pitch={lilypond_pitch} (class={lilypond_pitch_class})")
-            print(f"    SVG href: {svg_row.href}")
+            print(f"    MIDI: pitch={midi_row['pitch']} (class={midi_pitch_class})")
+            print(f"    LilyPond: '{svg_row['snippet']}' -> pitch={lilypond_pitch} (class={lilypond_pitch_class})")
+            print(f"    SVG href: {svg_row['href']}")
             mismatch_count += 1
-            exit(1)  # Stop on first mismatch for debugging
+            sys.exit(1)  # Stop on first mismatch for debugging
 
         # Collect all noteheads connected by ties to this primary notehead
-        complete_tie_group = collect_full_tie_group(svg_row.href, ties_df)
+        complete_tie_group = collect_full_tie_group(svg_row["href"], ties_by_primary)
 
         # Create aligned note entry with all necessary information for animation
         aligned_note = {
             "hrefs": complete_tie_group,      # All SVG noteheads for this musical event
-            "on": midi_row.on,                # Start time in seconds
-            "off": midi_row.off,              # End time in seconds  
-            "pitch": midi_row.pitch,          # MIDI pitch number
-            "channel": midi_row.channel       # MIDI channel (for multi-voice music)
+            "on": midi_row["on"],             # Start time in seconds
+            "off": midi_row["off"],           # End time in seconds  
+            "pitch": midi_row["pitch"],       # MIDI pitch number
+            "channel": midi_row["channel"]    # MIDI channel (for multi-voice music)
         }
         
         aligned_notes.append(aligned_note)
 
-    # =============================================================================
-    # OUTPUT GENERATION
-    # =============================================================================
-
-    output_filename = "exports/bwv1006_json_notes.json"
-    print(f"💾 Writing aligned data to {output_filename}...")
+    phases.end()
+    return aligned_notes
 
-    with open(output_filename, "w") as output_file:
+def write_aligned_json(aligned_notes, output_filename=OUTPUT_JSON):
+    """Write aligned notes to the JSON file the player loads."""
+    with AtomicOutput(output_filename) as output_file:
         json.dump(aligned_notes, output_file, indent=2)
 
-    # Summary statistics
+def print_alignment_summary(aligned_notes, output_filename=OUTPUT_JSON):
+    """Print note, notehead and tie counts."""
     note_count = len(aligned_notes)
     total_hrefs = sum(len(note["hrefs"]) for note in aligned_notes)
     tie_count = total_hrefs - note_count
@@ -272,8 +304,33 @@ def main():
     print(f"   🔗 {tie_count} tied noteheads")
     print(f"   💾 Saved: {output_filename}")
 
-    if mismatch_count > 0:
-        print(f"⚠️  {mismatch_count} pitch mismatches detected")
+def main():
+    """Main function with project context support."""
+    phases = Phases("align_pitch_by_geometry_simplified")
+
+    # =============================================================================
+    # DATA LOADING
+    # =============================================================================
+
+    phases.start("parse")
+    print("📁 Loading input data files...")
+    midi_notes = read_csv_rows(MIDI_CSV, {"pitch": int, "channel": int, "on": float, "off": float})
+    noteheads = read_csv_rows(SVG_CSV, {"index": int, "x": float, "y": float})
+    ties = read_csv_rows(TIES_CSV)
+
+    aligned_notes = align_notes(midi_notes, noteheads, ties, phases)
+
+    # =============================================================================
+    # OUTPUT GENERATION
+    # =============================================================================
+
+    phases.start("serialize")
+    print(f"💾 Writing aligned data to {OUTPUT_JSON}...")
+    write_aligned_json(aligned_notes, OUTPUT_JSON)
+    phases.end()
+
+    print_alignment_summary(aligned_notes, OUTPUT_JSON)
 
 if __name__ == "__main__":
+    startup_profile()
     main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+atomic_output.py
+
+Write-If-Changed Output Files
+=============================
+
+Shared output layer for the pipeline scripts (scripts/ and optim/).
+
+Every output is written to a temporary file next to its destination. When
+the writer finishes, the content hash is compared with the existing file:
+
+- same content: the temporary file is dropped and the existing file keeps
+  its mtime and inode, so browser caches and the build cache stamps stay
+  valid and downstream tasks see an unchanged source
+- new content: the temporary file is renamed over the destination in one
+  step, so a crash mid-write never leaves a truncated file behind
+
+Usage:
+
+    from atomic_output import AtomicOutput, write_if_changed
+
+    write_if_changed("out.svg", svg_text)            # str or bytes
+
+    with AtomicOutput("out.json") as f:              # for writers that need a file
+        json.dump(data, f, indent=2)
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _file_digest(path):
+    """SHA256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _new_file_mode(path):
+    """
+    Keep the permissions of the file being replaced; new files follow the umask.
+
+    A read-only file is not copied: outputs restored by the build are hard
+    links to read-only artifact store objects, and their replacements must
+    be ordinary writable files again.
+    """
+    try:
+        mode = Path(path).stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    if mode is not None and mode & 0o200:
+        return mode
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def commit_output(temp_path, path, quiet=False):
+    """
+    Move a finished temporary file to `path` unless the content is the same.
+
+    Args:
+        temp_path: Completely written temporary file (same directory as path)
+        path: Destination
+        quiet: Don't print the "unchanged" line
+
+    Returns:
+        bool: True if `path` was replaced, False if it already had this content
+    """
+    path = Path(path)
+    if path.exists() and path.stat().st_size == os.path.getsize(temp_path) \
+            and _file_digest(path) == _file_digest(temp_path):
+        os.unlink(temp_path)
+        if not quiet:
+            print(f"   ⏸️  Unchanged: {path}")
+        return False
+    os.chmod(temp_path, _new_file_mode(path))
+    os.replace(temp_path, path)
+    return True
+
+# =============================================================================
+# OUTPUT API
+# =============================================================================
+
+class AtomicOutput:
+    """
+    File handle writing to a temporary file that replaces `path` on success.
+
+    After the `with` block, `changed` tells whether `path` was replaced. If
+    the block raises, the temporary file is removed and `path` is untouched.
+    """
+
+    def __init__(self, path, mode="w", encoding="utf-8", newline=None, quiet=False):
+        self.path = Path(path)
+        self.mode = mode
+        self.encoding = None if "b" in mode else encoding
+        self.newline = None if "b" in mode else newline
+        self.quiet = quiet
+        self.changed = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self.file = os.fdopen(fd, self.mode, encoding=self.encoding, newline=self.newline)
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.file.close()
+        finally:
+            if exc_type is not None:
+                Path(self.temp_path).unlink(missing_ok=True)
+        if exc_type is None:
+            self.changed = commit_output(self.temp_path, self.path, self.quiet)
+        return False
+
+def write_if_changed(path, data, encoding="utf-8", quiet=False):
+    """
+    Atomically write str or bytes to `path` unless it already holds them.
+
+    Returns:
+        bool: True if the file was written, False if it was unchanged
+    """
+    binary = isinstance(data, (bytes, bytearray))
+    output = AtomicOutput(path, "wb" if binary else "w", encoding=encoding, quiet=quiet)
+    with output as f:
+        f.write(data)
+    return output.changed
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+benchmark_pipeline.py
+
+Synthetic Scale-Up Benchmarks
+=============================
+
+Times the pipeline stages on synthetic inputs 1×, 10× and 100× the size of
+the Preludio, so that superlinear behavior shows up long before a longer
+piece reaches production.
+
+Inputs are synthesized from exports/bwv1006_json_notes.json (the only data
+set in the repository): the note sequence is replicated N times, every
+copy shifted in time and transposed by an octave, and the harness writes
+
+- a MIDI file with N× note events
+- a one-line SVG with N× noteheads (plus tied secondary noteheads) and a
+  LilyPond source file their textedit links point into
+- a ties CSV with long tie chains
+- a score SVG with N× notehead links, tab links and bar highlights
+
+Stages timed (in process, output suppressed, best of --repeats):
+
+    midi_extract    midi_map.extract_note_intervals
+    notehead_extract svg_extract_note_heads.extract_note_heads
+    align           align_pitch_by_geometry_simplified.align_notes
+    swell_prep      svg_prepare_for_swell.modify_svg_paths
+    href_removal    svg_remove_hrefs_in_tabs.remove_href_from_tab_links
+    validation      optim/svg_validator.analyze_svg
+
+Results are appended to a JSON history. A run fails (exit code 1) when a
+stage is slower than --threshold × the median of its last runs, or when
+its time grows faster than scale^--max-exponent between two scales.
+Stages projected to exceed --max-stage-seconds are skipped and flagged.
+
+Usage:
+    python3 scripts/benchmark_pipeline.py
+    python3 scripts/benchmark_pipeline.py --scales 1 10 --repeats 3
+    python3 scripts/benchmark_pipeline.py --no-save --keep-inputs /tmp/bench
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from mido import Message, MetaMessage, MidiFile, MidiTrack
+
+import align_pitch_by_geometry_simplified as align
+import midi_map
+import svg_extract_note_heads as note_heads
+import svg_prepare_for_swell as swell
+import svg_remove_hrefs_in_tabs as href_removal
+from atomic_output import AtomicOutput
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "optim"))
+from svg_validator import analyze_svg
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BASE_NOTES = Path(__file__).resolve().parent.parent / "exports" / "bwv1006_json_notes.json"
+BASE_CONFIG = Path(__file__).resolve().parent.parent / "exports" / "bwv1006.config.yaml"
+DEFAULT_HISTORY = "benchmarks/pipeline_history.json"
+
+TICKS_PER_BEAT = 384
+TICKS_PER_BAR = 3 * TICKS_PER_BEAT     # 3/4
+X_PER_TICK = 0.01                      # Staff units per MIDI tick in the synthetic SVGs
+
+TIE_EVERY = 25                         # Every 25th note starts a tie chain ...
+TIE_CHAIN = 6                          # ... of this many secondary noteheads
+
+LY_FILE = "bench.ly"
+PITCH_NAMES = ["c", "cis", "d", "dis", "e", "f", "fis", "g", "gis", "a", "ais", "b"]
+
+STAGES = ["midi_extract", "notehead_extract", "align", "swell_prep", "href_removal", "validation"]
+
+SVG_HEADER = ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+              'version="1.2" width="{width:.2f}mm" height="40.00mm" viewBox="0 0 {width:.4f} 40.0000">\n')
+
+# =============================================================================
+# SYNTHETIC INPUTS
+# =============================================================================
+
+def load_base_notes(path=BASE_NOTES, config_path=BASE_CONFIG):
+    """
+    Notes of the exported JSON as (on_tick, off_tick, pitch, channel, hrefs).
+
+    The pipeline writes on/off in seconds: midi_map.py stretches the MIDI
+    timeline so that its last tick lands on the audio duration. The last
+    note off is therefore the end of the score, totalBars bars of the
+    config, and seconds map back to ticks linearly. Exports written before
+    the seconds were added carry on_tick/off_tick instead.
+    """
+    with open(path, encoding="utf-8") as f:
+        notes = json.load(f)
+    if notes and "on" not in notes[0]:
+        return [(n["on_tick"], n["off_tick"], n["pitch"], n["channel"], n["hrefs"]) for n in notes]
+
+    import yaml
+    with open(config_path, encoding="utf-8") as f:
+        total_bars = yaml.safe_load(f)["musicalStructure"]["totalBars"]
+    ticks_per_second = total_bars * TICKS_PER_BAR / max(n["off"] for n in notes)
+    return [
+        (round(n["on"] * ticks_per_second), round(n["off"] * ticks_per_second), n["pitch"], n["channel"], n["hrefs"])
+        for n in notes
+    ]
+
+def lilypond_name(pitch):
+    """LilyPond note name the alignment parses back to `pitch` (c = MIDI 36)."""
+    octave = (pitch - 36) // 12
+    marks = "'" * octave if octave > 0 else "," * -octave
+    return PITCH_NAMES[pitch % 12] + marks
+
+def scaled_notes(base_notes, scale):
+    """
+    Replicate the base notes `scale` times, one copy after the other.
+
+    Copies are transposed by 0, +12 or -12 semitones in turn (skipped when a
+    copy would leave the MIDI range), so pitch classes - which the alignment
+    checks - stay valid.
+    """
+    span = max(off for _, off, _, _, _ in base_notes)
+    span = math.ceil(span / TICKS_PER_BAR) * TICKS_PER_BAR
+    low = min(p for _, _, p, _, _ in base_notes)
+    high = max(p for _, _, p, _, _ in base_notes)
+    notes = []
+    for copy in range(scale):
+        shift = (0, 12, -12)[copy % 3]
+        if not (0 <= low + shift and high + shift <= 127):
+            shift = 0
+        offset = copy * span
+        for on, off, pitch, channel, hrefs in base_notes:
+            notes.append((on + offset, off + offset, pitch + shift, channel, len(hrefs)))
+    return notes
+
+def write_midi(notes, path):
+    """One-track MIDI file with all note events."""
+    events = []
+    for on, off, pitch, channel, _ in notes:
+        events.append((on, 1, Message("note_on", note=pitch, velocity=80, channel=channel)))
+        events.append((off, 0, Message("note_off", note=pitch, velocity=0, channel=channel)))
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    midi = MidiFile(ticks_per_beat=TICKS_PER_BEAT)
+    track = MidiTrack()
+    track.append(MetaMessage("set_tempo", tempo=500000, time=0))
+    last = 0
+    for tick, _, msg in events:
+        track.append(msg.copy(time=tick - last))
+        last = tick
+    track.append(MetaMessage("end_of_track", time=0))
+    midi.tracks.append(track)
+    midi.save(path)
+
+def write_inputs(notes, workdir):
+    """
+    Write MIDI, LilyPond source, one-line SVG, score SVG and ties CSV.
+
+    Returns:
+        dict: Paths and counts of the synthetic inputs
+    """
+    workdir = Path(workdir)
+    write_midi(notes, workdir / "bench.midi")
+
+    ly_lines = []
+    one_line = []
+    score = []
+    ties = ["primary,secondary"]
+
+    def add_notehead(pitch, x, y):
+        ly_lines.append(f"  {lilypond_name(pitch)}4")
+        href = f"textedit:///work/{LY_FILE}:{len(ly_lines)}:2:3"
+        one_line.append(f'<a xlink:href="{href}"><g transform="translate({x:.4f}, {y:.4f})">'
+                        f'<path d="M0 0h1.2v0.9h-1.2z"/></g></a>\n')
+        score.append(f'<a xlink:href="{href}"><path transform="translate({x:.4f}, {y:.4f})" '
+                     f'd="M0 0h1.2v0.9h-1.2z"/></a>\n')
+        return href[len("textedit:///work/"):]
+
+    for index, (on, off, pitch, channel, _) in enumerate(notes):
+        # y orders simultaneous notes like the MIDI sort: higher channel first, then ascending pitch
+        x, y = on * X_PER_TICK, channel * 100 - pitch * 0.5
+        primary = add_notehead(pitch, x, y)
+        if index % TIE_EVERY == 0:
+            previous = primary
+            for link in range(1, TIE_CHAIN + 1):
+                secondary = add_notehead(pitch, x + link * 0.37, y)
+                ties.append(f"{previous},{secondary}")
+                previous = secondary
+
+    bars = max(off for _, off, _, _, _ in notes) // TICKS_PER_BAR + 1
+    width = bars * TICKS_PER_BAR * X_PER_TICK
+    for bar in range(1, bars + 1):
+        x = (bar - 1) * TICKS_PER_BAR * X_PER_TICK
+        score.append(f'<rect data-bar="{bar}" x="{x:.4f}" y="0" width="{TICKS_PER_BAR * X_PER_TICK:.4f}" height="40"/>\n')
+        if bar % 4 == 1:  # Tablature numbers carry links too; href removal drops them
+            score.append(f'<a xlink:href="textedit:///work/{LY_FILE}:1:2:3"><text x="{x:.4f}" y="30">0</text></a>\n')
+
+    (workdir / LY_FILE).write_text("\n".join(ly_lines) + "\n", encoding="utf-8")
+    (workdir / "bench_one_line.svg").write_text(
+        SVG_HEADER.format(width=width) + "".join(one_line) + "</svg>\n", encoding="utf-8")
+    (workdir / "bench_score.svg").write_text(
+        SVG_HEADER.format(width=width) + '<g color="black">\n' + "".join(score) + "</g>\n</svg>\n", encoding="utf-8")
+    (workdir / "bench_ties.csv").write_text("\n".join(ties) + "\n", encoding="utf-8")
+
+    return {
+        "notes": len(notes),
+        "noteheads": len(ly_lines),
+        "ties": len(ties) - 1,
+        "bars": bars,
+        "svg_bytes": (workdir / "bench_score.svg").stat().st_size,
+    }
+
+# =============================================================================
+# STAGES
+# =============================================================================
+
+def stage_functions(workdir):
+    """Stage name -> function(previous results) -> result, run inside workdir."""
+    workdir = Path(workdir)
+    results = {}
+
+    def midi_extract():
+        results["midi"] = midi_map.extract_note_intervals(str(workdir / "bench.midi"))
+
+    def notehead_extract():
+        results["noteheads"] = note_heads.extract_note_heads(str(workdir / "bench_one_line.svg"),
+                                                             str(workdir / LY_FILE))
+
+    def align_stage():
+        ties = align.read_csv_rows(workdir / "bench_ties.csv")
+        results["aligned"] = align.align_notes(results["midi"], results["noteheads"], ties)
+
+    def swell_prep():
+        content = (workdir / "bench_score.svg").read_text(encoding="utf-8")
+        results["swellable"], _ = swell.modify_svg_paths(content)
+
+    def href_stage():
+        href_removal.remove_href_from_tab_links(workdir / "bench_score.svg", workdir / "bench_no_hrefs.svg")
+
+    def validation():
+        result = analyze_svg(results["swellable"], "bench_swellable.svg")
+        if not result["valid"]:
+            raise RuntimeError(f"Synthetic SVG failed validation: {result['errors']}")
+
+    return {
+        "midi_extract": midi_extract,
+        "notehead_extract": notehead_extract,
+        "align": align_stage,
+        "swell_prep": swell_prep,
+        "href_removal": href_stage,
+        "validation": validation,
+    }
+
+def time_stage(function, repeats):
+    """Best wall time of `repeats` runs, with the stage's printing suppressed."""
+    best = float("inf")
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def projected_seconds(times, scale):
+    """
+    Project a stage's time at `scale` from its times at smaller scales.
+
+    Uses the growth exponent between the two largest measured scales
+    (linear if only one was measured).
+    """
+    measured = sorted(times.items())
+    if not measured:
+        return 0.0
+    (s1, t1) = measured[-1]
+    exponent = 1.0
+    if len(measured) >= 2:
+        (s0, t0) = measured[-2]
+        if t0 > 0 and t1 > 0:
+            exponent = max(1.0, math.log(t1 / t0) / math.log(s1 / s0))
+    return t1 * (scale / s1) ** exponent
+
+# =============================================================================
+# HISTORY AND REGRESSIONS
+# =============================================================================
+
+def load_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"runs": []}
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+def find_regressions(run, history, threshold, max_exponent, min_seconds, window=5):
+    """
+    Compare a run with the history and with itself across scales.
+
+    Args:
+        run: The current run record
+        history: Previous runs
+        threshold: Allowed slowdown factor against the median of the last `window` runs
+        max_exponent: Allowed growth exponent of a stage's time between two scales
+        min_seconds: Times below this are noise and never flagged
+
+    Returns:
+        list: Human-readable regression messages
+    """
+    regressions = []
+    for scale, stages in run["results"].items():
+        for stage, seconds in stages.items():
+            if seconds is None:
+                regressions.append(f"{stage} at {scale}×: skipped, projected {run['skipped'][scale][stage]:.0f} s")
+                continue
+            previous = [r["results"].get(scale, {}).get(stage) for r in history[-window:]]
+            previous = [t for t in previous if t is not None]
+            if previous:
+                baseline = statistics.median(previous)
+                if seconds > baseline * threshold and seconds - baseline > min_seconds:
+                    regressions.append(f"{stage} at {scale}×: {seconds:.3f} s vs median {baseline:.3f} s "
+                                       f"(> {threshold:.2f}×)")
+
+    scales = sorted(run["results"], key=int)
+    for small, large in zip(scales, scales[1:]):
+        for stage in STAGES:
+            t_small = run["results"][small].get(stage)
+            t_large = run["results"][large].get(stage)
+            if not t_small or not t_large or t_large < min_seconds:
+                continue
+            exponent = math.log(t_large / t_small) / math.log(int(large) / int(small))
+            if exponent > max_exponent:
+                regressions.append(f"{stage}: time grows like scale^{exponent:.2f} from {small}× to {large}× "
+                                   f"({t_small:.3f} s → {t_large:.3f} s)")
+    return regressions
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def run_benchmarks(scales, repeats, max_stage_seconds, keep_inputs=None):
+    """
+    Synthesize inputs and time every stage at every scale.
+
+    Returns:
+        dict: Run record (results[scale][stage] = seconds or None if skipped)
+    """
+    base_notes = load_base_notes()
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "repeats": repeats,
+        "inputs": {},
+        "results": {},
+        "skipped": {},
+    }
+    stage_times = {stage: {} for stage in STAGES}
+
+    for scale in scales:
+        workdir = Path(keep_inputs) / f"{scale}x" if keep_inputs else Path(tempfile.mkdtemp(prefix=f"bench_{scale}x_"))
+        workdir.mkdir(parents=True, exist_ok=True)
+        print(f"\n🧪 Scale {scale}×")
+        inputs = write_inputs(scaled_notes(base_notes, scale), workdir)
+        run["inputs"][str(scale)] = inputs
+        print(f"   📦 {inputs['notes']:,} notes, {inputs['noteheads']:,} noteheads, {inputs['ties']:,} ties, "
+              f"{inputs['svg_bytes'] / 1e6:.1f} MB score SVG")
+
+        results = run["results"][str(scale)] = {}
+        skipped = {}
+        functions = stage_functions(workdir)
+        cwd = os.getcwd()
+        os.chdir(workdir)  # textedit links resolve relative to the working directory
+        try:
+            for stage in STAGES:
+                projected = projected_seconds(stage_times[stage], scale)
+                depends_on_skipped = (stage == "align" and (results.get("midi_extract") is None
+                                                             or results.get("notehead_extract") is None)) \
+                    or (stage == "validation" and results.get("swell_prep") is None)
+                if projected > max_stage_seconds or depends_on_skipped:
+                    results[stage] = None
+                    skipped[stage] = projected
+                    print(f"   ⏭️  {stage:<17} skipped (projected {projected:.0f} s)")
+                    continue
+                seconds = time_stage(functions[stage], repeats)
+                results[stage] = seconds
+                stage_times[stage][scale] = seconds
+                print(f"   ⏱️  {stage:<17} {seconds:>9.3f} s")
+        finally:
+            os.chdir(cwd)
+            if not keep_inputs:
+                shutil.rmtree(workdir, ignore_errors=True)
+        if skipped:
+            run["skipped"][str(scale)] = skipped
+    return run
+
+def main():
+    parser = argparse.ArgumentParser(description="Time pipeline stages on synthetic 1×/10×/100× inputs")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Input scale factors")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per stage (best time is kept)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help=f"JSON history file (default: {DEFAULT_HISTORY})")
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Allowed slowdown against the median of recent runs (default: 1.5)")
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="Allowed growth exponent of stage time vs. scale (default: 1.3)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Differences below this are noise (default: 0.05)")
+    parser.add_argument("--max-stage-seconds", type=float, default=120,
+                        help="Skip a stage when its projected time exceeds this (default: 120)")
+    parser.add_argument("--keep-inputs", metavar="DIR", help="Write the synthetic inputs to DIR and keep them")
+    args = parser.parse_args()
+
+    print("🚀 Pipeline Scale-Up Benchmarks")
+    print("=" * 45)
+
+    run = run_benchmarks(sorted(set(args.scales)), args.repeats, args.max_stage_seconds, args.keep_inputs)
+
+    history = load_history(args.history)
+    regressions = find_regressions(run, history["runs"], args.threshold, args.max_exponent, args.min_seconds)
+    run["regressions"] = regressions
+
+    if not args.no_save:
+        history["runs"].append(run)
+        Path(args.history).parent.mkdir(parents=True, exist_ok=True)
+        with AtomicOutput(args.history) as f:
+            json.dump(history, f, indent=2)
+        print(f"\n💾 Saved run {len(history['runs'])} to {args.history}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s):")
+        for message in regressions:
+            print(f"   • {message}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
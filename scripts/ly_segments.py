@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+ly_segments.py
+
+Per-Segment One-Line Engraving
+==============================
+
+The movement is split into segment files (_1/m001_008.ly ... _3/m134_end.ly),
+each defining one guitar and one bass variable. Engraving the whole one-line
+score takes minutes, although an edit usually touches a single segment.
+
+This script supports an incremental mode of the one-line build:
+
+1. prepare: write one LilyPond wrapper per segment into .segments/
+   (bwv1006_ly_one_line.ly with bwv1006_ly_main.ly inlined, only that
+   segment included, and guitarPart/bassPart reduced to its variables,
+   starting at the segment's bar number) plus .segments/segments.json.
+   Wrappers are only rewritten when their text changes, so the build
+   system sees exactly the segments that need re-engraving.
+
+2. (the build engraves the stale wrappers: lilypond -I . -o .segments --svg)
+
+3. stitch: combine the per-segment outputs into bwv1006_ly_one_line.svg
+   and bwv1006_ly_one_line.midi:
+   - SVG: each segment is shifted right by the width of the segments
+     before it (the x of every translate() positioned element), tie ids are
+     renumbered and textedit hrefs normalized
+   - MIDI: events are moved by the segment's start bar in ticks, and only
+     the first segment's setup events (names, programs, tempo, ...) are kept
+
+Limitations: ties across a segment boundary are not engraved (each segment
+is a separate score), every later segment starts with its own clef, key and
+time signature, and note spacing differs slightly from a full engraving.
+The full build remains the reference for exports.
+
+Usage:
+    python ly_segments.py prepare
+    python ly_segments.py stitch
+"""
+
+import argparse
+import json
+import posixpath
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from mido import MetaMessage, MidiFile, MidiTrack
+
+from atomic_output import AtomicOutput, write_if_changed
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Register XML namespaces to prevent ns0: prefixes in output
+ET.register_namespace('', 'http://www.w3.org/2000/svg')
+ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+
+ONE_LINE_FILE = Path("bwv1006_ly_one_line.ly")
+MAIN_FILE = Path("bwv1006_ly_main.ly")
+SEGMENT_DIR = Path(".segments")
+MANIFEST_FILE = SEGMENT_DIR / "segments.json"
+OUTPUT_SVG = Path("bwv1006_ly_one_line.svg")
+OUTPUT_MIDI = Path("bwv1006_ly_one_line.midi")
+
+_SEGMENT_INCLUDE = re.compile(r'^[ \t]*\\include\s+"(_\d+/[^"]+\.ly)"[^\n]*\n', re.MULTILINE)
+_MAIN_INCLUDE = re.compile(r'^[ \t]*\\include\s+"' + re.escape(MAIN_FILE.name) + r'"[^\n]*$', re.MULTILINE)
+_VERSION = re.compile(r'^\\version\s+"[^"]*"[^\n]*\n', re.MULTILINE)
+_DEFINITION = re.compile(r'^(\w+)\s*=', re.MULTILINE)
+_TRANSLATE = re.compile(r"^(\s*translate\(\s*)([-+\d.eE]+)")
+_TIE_ID = re.compile(r"tie-note-(\d+)")
+_XLINK_HREF = '{http://www.w3.org/1999/xlink}href'
+
+# =============================================================================
+# PREPARE: SEGMENT WRAPPERS
+# =============================================================================
+
+def part_block(name):
+    """Regex matching `name = { ... }` at the start of a line."""
+    return re.compile(r'^' + name + r'\s*=\s*\{(.*?)^\}', re.MULTILINE | re.DOTALL)
+
+def part_entries(main_text, name):
+    """Variables listed in a part definition, e.g. guitarPart."""
+    match = part_block(name).search(main_text)
+    if not match:
+        raise ValueError(f"{MAIN_FILE}: no {name} definition")
+    body = re.sub(r'%[^\n]*', '', match.group(1))
+    return re.findall(r'\\(\w+)', body)
+
+def start_bar(segment_file):
+    """First bar of a segment, from its name (m017_028.ly -> 17)."""
+    match = re.match(r'm(\d+)_', Path(segment_file).name)
+    if not match:
+        raise ValueError(f"Cannot read the start bar from {segment_file}")
+    return int(match.group(1))
+
+def find_segments(main_text):
+    """
+    Segments included by the main file, in order.
+
+    Returns:
+        list: dicts with name, source, start_bar, guitar and bass variables
+    """
+    guitar_entries = part_entries(main_text, 'guitarPart')
+    bass_entries = part_entries(main_text, 'bassPart')
+
+    segments = []
+    for source in _SEGMENT_INCLUDE.findall(main_text):
+        defined = set(_DEFINITION.findall(Path(source).read_text(encoding='utf-8')))
+        guitar = [name for name in guitar_entries if name in defined]
+        bass = [name for name in bass_entries if name in defined]
+        if not guitar and not bass:
+            raise ValueError(f"{source} defines none of the guitarPart/bassPart variables")
+        segments.append({
+            'name': Path(source).stem,
+            'source': source,
+            'start_bar': start_bar(source),
+            'guitar': guitar,
+            'bass': bass,
+        })
+    return segments
+
+def wrapper_text(segment, main_text, one_line_text):
+    """LilyPond source engraving one segment as a one-line score."""
+    own_include = f'\\include "{segment["source"]}"\n'
+    main = _SEGMENT_INCLUDE.sub(lambda m: own_include if m.group(1) == segment['source'] else '', main_text)
+    main = _VERSION.sub('', main)
+
+    guitar = "".join(f"  \\{name}\n" for name in segment['guitar'])
+    bass = "".join(f"  \\{name}\n" for name in segment['bass'])
+    bar_number = f"  \\set Score.currentBarNumber = #{segment['start_bar']}\n"
+    main = part_block('guitarPart').sub(lambda m: "guitarPart = {\n" + bar_number + guitar + "}", main)
+    main = part_block('bassPart').sub(lambda m: "bassPart = {\n" + bass + "}", main)
+
+    text = _MAIN_INCLUDE.sub(lambda m: main, one_line_text)
+    return f"% Generated by scripts/ly_segments.py from {ONE_LINE_FILE} - do not edit\n" + text
+
+def prepare():
+    """Write wrappers and manifest; return the number of wrappers changed."""
+    main_text = MAIN_FILE.read_text(encoding='utf-8')
+    one_line_text = ONE_LINE_FILE.read_text(encoding='utf-8')
+    if not _MAIN_INCLUDE.search(one_line_text):
+        raise ValueError(f"{ONE_LINE_FILE} does not include {MAIN_FILE}")
+
+    SEGMENT_DIR.mkdir(exist_ok=True)
+    segments = find_segments(main_text)
+    changed = 0
+    for segment in segments:
+        wrapper = SEGMENT_DIR / f"{segment['name']}.ly"
+        segment['ly_file'] = str(wrapper)
+        segment['svg'] = str(SEGMENT_DIR / f"{segment['name']}.svg")
+        segment['midi'] = str(SEGMENT_DIR / f"{segment['name']}.midi")
+
+        text = wrapper_text(segment, main_text, one_line_text)
+        if write_if_changed(wrapper, text, quiet=True):
+            changed += 1
+            print(f"   📝 {wrapper} (bars from {segment['start_bar']})")
+
+    write_if_changed(MANIFEST_FILE, json.dumps(segments, indent=2) + "\n", quiet=True)
+
+    print(f"✅ {len(segments)} segments, {changed} wrapper(s) updated")
+    return changed
+
+# =============================================================================
+# STITCH: SVG
+# =============================================================================
+
+def viewbox(root):
+    return [float(value) for value in root.get('viewBox').replace(',', ' ').split()]
+
+def shift_x(elem, offset):
+    """
+    Move an element tree right by `offset`.
+
+    LilyPond positions every graphical object with its own translate(), so
+    the x of the outermost translate() on each path down the tree is shifted
+    (the note head extraction reads exactly these transforms).
+
+    Returns:
+        int: Number of elements shifted
+    """
+    match = _TRANSLATE.match(elem.get('transform', ''))
+    if match:
+        x = float(match.group(2)) + offset
+        elem.set('transform', _TRANSLATE.sub(lambda m: f"{m.group(1)}{x:.4f}", elem.get('transform'), count=1))
+        return 1
+    return sum(shift_x(child, offset) for child in elem)
+
+def renumber_ties(elem, offset):
+    """Shift tie-note-N ids (and references to them) by `offset`; return the largest N seen."""
+    largest = 0
+    for node in elem.iter():
+        for attr in ('id', 'data-tie-to', 'data-tie-from'):
+            value = node.get(attr)
+            if value and 'tie-note-' in value:
+                largest = max([largest] + [int(n) for n in _TIE_ID.findall(value)])
+                node.set(attr, _TIE_ID.sub(lambda m: f"tie-note-{int(m.group(1)) + offset}", value))
+    return largest
+
+def normalize_hrefs(elem):
+    """Collapse ./ and ../ in textedit links (wrappers include segments via -I .)."""
+    for node in elem.iter():
+        for attr in (_XLINK_HREF, 'href'):
+            href = node.get(attr)
+            if href and href.startswith('textedit://'):
+                path, sep, position = href[len('textedit://'):].partition('.ly:')
+                node.set(attr, 'textedit://' + posixpath.normpath(path) + sep + position)
+
+def stitch_svg(segments, output_file):
+    """Concatenate segment SVGs left to right into one SVG."""
+    stitched = None
+    offset = 0.0
+    tie_offset = 0
+    height = 0.0
+    mm_per_unit = None
+
+    for segment in segments:
+        root = ET.parse(segment['svg']).getroot()
+        min_x, min_y, width, seg_height = viewbox(root)
+        height = max(height, seg_height)
+        if mm_per_unit is None:
+            mm_per_unit = float(root.get('width').replace('mm', '')) / width
+
+        normalize_hrefs(root)
+        tie_offset += renumber_ties(root, tie_offset)
+
+        if stitched is None:
+            stitched = root
+            offset = width
+            continue
+
+        for child in list(root):
+            if child.tag.rsplit('}', 1)[-1] == 'style':
+                continue
+            shift_x(child, offset - min_x)
+            stitched.append(child)
+        offset += width
+
+    stitched.set('viewBox', f"0.0000 0.0000 {offset:.4f} {height:.4f}")
+    stitched.set('width', f"{offset * mm_per_unit:.2f}mm")
+    stitched.set('height', f"{height * mm_per_unit:.2f}mm")
+    with AtomicOutput(output_file, "wb") as f:
+        ET.ElementTree(stitched).write(f, encoding='utf-8', xml_declaration=False)
+    return offset
+
+# =============================================================================
+# STITCH: MIDI
+# =============================================================================
+
+def ticks_per_bar(midi):
+    """Bar length from the first time signature (4/4 if there is none)."""
+    for track in midi.tracks:
+        for msg in track:
+            if msg.type == 'time_signature':
+                return midi.ticks_per_beat * 4 * msg.numerator // msg.denominator
+    return midi.ticks_per_beat * 4
+
+def stitch_midi(segments, output_file):
+    """Merge segment MIDI files, each moved to its start bar."""
+    midis = [MidiFile(segment['midi']) for segment in segments]
+    first = midis[0]
+    if any(midi.ticks_per_beat != first.ticks_per_beat or len(midi.tracks) != len(first.tracks) for midi in midis):
+        raise ValueError("Segment MIDI files differ in resolution or track layout")
+
+    bar_ticks = ticks_per_bar(first)
+    tracks = [[] for _ in first.tracks]
+    end = 0
+    for index, (segment, midi) in enumerate(zip(segments, midis)):
+        offset = (segment['start_bar'] - segments[0]['start_bar']) * bar_ticks
+        for events, track in zip(tracks, midi.tracks):
+            now = offset
+            for msg in track:
+                now += msg.time
+                if msg.type == 'end_of_track':
+                    end = max(end, now)
+                elif index == 0 or not (msg.is_meta or msg.type == 'program_change'):
+                    events.append((now, msg))
+
+    output = MidiFile(type=first.type, ticks_per_beat=first.ticks_per_beat)
+    for events in tracks:
+        track = MidiTrack()
+        last = 0
+        # Stable sort: at equal ticks, earlier segments (note offs) come first
+        for now, msg in sorted(events, key=lambda event: event[0]):
+            track.append(msg.copy(time=now - last))
+            last = now
+        track.append(MetaMessage('end_of_track', time=max(end, last) - last))
+        output.tracks.append(track)
+    with AtomicOutput(output_file, "wb") as f:
+        output.save(file=f)
+    return end
+
+def stitch():
+    segments = json.loads(MANIFEST_FILE.read_text(encoding='utf-8'))
+    missing = [path for segment in segments for path in (segment['svg'], segment['midi']) if not Path(path).exists()]
+    if missing:
+        print(f"❌ Missing segment outputs: {', '.join(missing)}")
+        return False
+
+    width = stitch_svg(segments, OUTPUT_SVG)
+    print(f"🧵 {OUTPUT_SVG}: {len(segments)} segments, {width:.1f} units wide")
+    ticks = stitch_midi(segments, OUTPUT_MIDI)
+    print(f"🧵 {OUTPUT_MIDI}: {len(segments)} segments, {ticks:,} ticks")
+    return True
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main():
+    """Main function handling command line arguments."""
+
+    parser = argparse.ArgumentParser(
+        description='Engrave the one-line score per segment and stitch the results',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python ly_segments.py prepare    # Write .segments/*.ly and .segments/segments.json
+  python ly_segments.py stitch     # Combine .segments/*.svg|midi into the one-line SVG and MIDI
+        """
+    )
+    parser.add_argument('command', choices=['prepare', 'stitch'])
+    args = parser.parse_args()
+
+    print(f"🧩 One-line segments: {args.command}")
+    if args.command == 'prepare':
+        prepare()
+        return 0
+    return 0 if stitch() else 1
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+
+if __name__ == '__main__':
+    sys.exit(main())
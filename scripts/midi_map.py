@@ -20,10 +20,25 @@ Workflow:
 3. Compute tempo adjustment to match known audio duration
 4. Convert all timing from MIDI ticks to real seconds
 5. Export synchronized timing data as CSV
+
+A few thousand rows are sorted and written with the standard library; the
+script does not need pandas (which alone takes longer to import than the
+whole extraction).
 """
 
+import csv
+
 from mido import MidiFile, tick2second
-import pandas as pd
+
+from atomic_output import AtomicOutput
+from pipeline_trace import Phases, startup_profile
+
+PHASES = Phases("midi_map")
+
+MIDI_FILE = "bwv1006_ly_one_line.midi"
+OUTPUT_CSV = "bwv1006_csv_midi_note_events.csv"
+
+CSV_FIELDS = ["pitch", "channel", "on", "off"]
 
 
 def extract_note_intervals(midi_path):
@@ -39,7 +54,7 @@ def extract_note_intervals(midi_path):
         midi_path (str): Path to the MIDI file to process
         
     Returns:
-        pandas.DataFrame: Note events with columns:
+        list: Note event dicts, sorted for alignment, with keys:
             - pitch: MIDI note number (0-127)
             - on: Start time in seconds (float)
             - off: End time in seconds (float) 
@@ -52,6 +67,7 @@ def extract_note_intervals(midi_path):
     - Treats note_on with velocity=0 as note_off (MIDI standard)
     """
     
+    PHASES.start("parse")
     print(f"🎵 Loading MIDI file: {midi_path}")
     
     # =================================================================
@@ -69,6 +85,7 @@ def extract_note_intervals(midi_path):
     current_tick = 0     # Running total of elapsed MIDI ticks
     max_tick = 0         # Total duration of MIDI file in ticks
     
+    PHASES.start("extract")
     print("🔍 Analyzing MIDI events...")
     
     # =================================================================
@@ -145,29 +162,31 @@ def extract_note_intervals(midi_path):
     # STEP 5: SORT AND ORGANIZE RESULTS
     # =================================================================
     
-    # Convert to DataFrame for easier manipulation and export
-    note_events_df = pd.DataFrame(note_events)
+    PHASES.start("sort")
     
-    # Sort by musical priority:
+    # Sort by musical priority (stable sort):
     # 1. Start time (chronological order)
     # 2. Channel (higher channels first - often melody vs accompaniment)
     # 3. Pitch (ascending - bass to treble within simultaneous events)
-    note_events_df = note_events_df.sort_values(
-        by=["on", "channel", "pitch"], 
-        ascending=[True, False, True]
-    )
+    note_events.sort(key=lambda note: (note["on"], -note["channel"], note["pitch"]))
     
-    print(f"✅ Synchronized {len(note_events_df)} notes to audio timeline")
+    print(f"✅ Synchronized {len(note_events)} notes to audio timeline")
     
     # Timing validation
-    if len(note_events_df) > 0:
-        actual_duration = note_events_df["off"].max()
+    if note_events:
+        actual_duration = max(note["off"] for note in note_events)
         print(f"   📏 Actual final timing: {actual_duration:.2f} seconds")
         print(f"   🎯 Target duration: {audio_duration_seconds} seconds")
         print(f"   📊 Timing accuracy: {abs(actual_duration - audio_duration_seconds):.2f}s difference")
     
-    return note_events_df
+    return note_events
 
+def write_note_events_csv(note_events, output_csv=OUTPUT_CSV):
+    """Write note events from extract_note_intervals() to CSV."""
+    with AtomicOutput(output_csv, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(note_events)
 
 # =============================================================================
 # MAIN EXECUTION
@@ -179,22 +198,24 @@ def main():
     print("=" * 60)
     
     # Configuration
-    midi_file_path = "bwv1006_ly_one_line.midi"
-    output_file_path = "bwv1006_csv_midi_note_events.csv"
+    midi_file_path = MIDI_FILE
+    output_file_path = OUTPUT_CSV
     
     # Process MIDI file
     try:
-        synchronized_notes_df = extract_note_intervals(midi_file_path)
+        synchronized_notes = extract_note_intervals(midi_file_path)
         
         # Export results
+        PHASES.start("serialize")
         print(f"\n💾 Saving synchronized data...")
-        synchronized_notes_df.to_csv(output_file_path, index=False)
+        write_note_events_csv(synchronized_notes, output_file_path)
+        PHASES.end()
         
         # Summary statistics
-        total_notes = len(synchronized_notes_df)
-        duration = synchronized_notes_df["off"].max() if total_notes > 0 else 0
-        unique_pitches = synchronized_notes_df["pitch"].nunique() if total_notes > 0 else 0
-        channels_used = synchronized_notes_df["channel"].nunique() if total_notes > 0 else 0
+        total_notes = len(synchronized_notes)
+        duration = max(note["off"] for note in synchronized_notes) if total_notes > 0 else 0
+        unique_pitches = len({note["pitch"] for note in synchronized_notes})
+        channels_used = len({note["channel"] for note in synchronized_notes})
         
         print(f"✅ Export complete!")
         print(f"   📁 File: {output_file_path}")
@@ -208,4 +229,5 @@ def main():
         raise
     
 if __name__ == "__main__":
+    startup_profile()
     main()
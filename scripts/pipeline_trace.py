@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+pipeline_trace.py
+
+Pipeline Phase Tracing
+======================
+
+Records wall time, CPU time and peak RSS of the major phases of a pipeline
+script (parse, extract, sort, align, serialize, ...) as Chrome trace
+events. The build (tasks_utils.start_trace) sets BUILD_TRACE_FILE to an
+events file; every script run by the build appends its phases to it, and
+the build merges them into one trace that chrome://tracing or
+https://ui.perfetto.dev can open.
+
+When BUILD_TRACE_FILE is not set, nothing is recorded.
+
+Every script calling startup_profile() also accepts --startup-profile: it
+re-runs itself under `python -X importtime` and reports which packages
+were imported before the first phase (startup) and during each phase.
+
+Usage in a script:
+
+    from pipeline_trace import Phases
+
+    phases = Phases("midi_map")
+    phases.start("parse")
+    ...
+    phases.start("extract")     # ends "parse"
+    ...
+    phases.end()
+
+    if __name__ == "__main__":
+        startup_profile()       # Handles --startup-profile, then returns
+        main()
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+# Environment variable naming the JSON-lines file trace events are appended to
+TRACE_ENV = "BUILD_TRACE_FILE"
+
+# Set by the build for each command: id of the command span the script runs under
+PARENT_ENV = "BUILD_TRACE_PARENT"
+
+# Set in the child run by --startup-profile: phases print stage markers to stderr
+STARTUP_PROFILE_ENV = "PIPELINE_STARTUP_PROFILE"
+STARTUP_PROFILE_FLAG = "--startup-profile"
+IMPORT_TIME_PREFIX = "import time:"
+STAGE_MARKER = "startup-profile stage: "
+
+# =============================================================================
+# EVENT RECORDING
+# =============================================================================
+
+def now_us():
+    """Wall clock in microseconds (shared by all processes of a build)"""
+    return time.time_ns() // 1000
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def record_event(name, category, start_us, duration_us, args=None, events_file=None):
+    """
+    Append one complete ("X") Chrome trace event to the events file.
+
+    Args:
+        name: Event name
+        category: Event category (task, command, phase)
+        start_us: Start time from now_us()
+        duration_us: Duration in microseconds
+        args: Extra values shown with the event (cpu_ms, peak_rss_mb, ...)
+        events_file: Defaults to $BUILD_TRACE_FILE; no-op if neither is set
+    """
+    events_file = events_file or os.environ.get(TRACE_ENV)
+    if not events_file:
+        return
+    args = dict(args or {})
+    if os.environ.get(PARENT_ENV):
+        args["parent"] = os.environ[PARENT_ENV]
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start_us,
+        "dur": duration_us,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": args,
+    }
+    # One write per line with O_APPEND: lines from concurrent processes do not mix
+    with open(events_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event) + "\n")
+
+class Phases:
+    """Consecutive named phases of one script run"""
+
+    def __init__(self, script_name):
+        self.script_name = script_name
+        self.enabled = bool(os.environ.get(TRACE_ENV))
+        self.current = None
+
+    def start(self, phase):
+        """End the running phase (if any) and start `phase`"""
+        self.end()
+        if os.environ.get(STARTUP_PROFILE_ENV):
+            print(f"{STAGE_MARKER}{self.script_name}: {phase}", file=sys.stderr, flush=True)
+        if self.enabled:
+            self.current = (phase, now_us(), time.process_time())
+
+    def end(self):
+        """End the running phase"""
+        if self.current is None:
+            return
+        phase, start_us, start_cpu = self.current
+        self.current = None
+        record_event(
+            f"{self.script_name}: {phase}", "phase", start_us, now_us() - start_us,
+            {"cpu_ms": round((time.process_time() - start_cpu) * 1000, 1), "peak_rss_mb": peak_rss_mb()},
+        )
+
+# =============================================================================
+# STARTUP PROFILE
+# =============================================================================
+
+def parse_import_times(stderr_lines):
+    """
+    Split `-X importtime` output by stage.
+
+    Args:
+        stderr_lines: stderr of a run with -X importtime and stage markers
+
+    Returns:
+        tuple: ({stage: {top-level package: cumulative µs}}, other stderr lines)
+    """
+    stages = {"startup": {}}
+    stage = "startup"
+    other = []
+    for line in stderr_lines:
+        if line.startswith(STAGE_MARKER):
+            stage = line[len(STAGE_MARKER):].strip()
+            stages.setdefault(stage, {})
+        elif line.startswith(IMPORT_TIME_PREFIX):
+            fields = line[len(IMPORT_TIME_PREFIX):].split("|")
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue  # Header line
+            name = fields[2].rstrip()
+            if len(name) - len(name.lstrip()) == 1:  # Top-level import (nested ones are indented)
+                package = name.strip().split(".")[0]
+                stages[stage][package] = stages[stage].get(package, 0) + int(fields[1])
+        else:
+            other.append(line)
+    return stages, other
+
+def print_import_report(stages, wall_seconds, top=5):
+    """Print import time per stage, heaviest packages first"""
+    print(f"\n⏱️  Import time per stage (-X importtime, cumulative)")
+    width = max(len(stage) for stage in stages)
+    total = 0
+    for stage, packages in stages.items():
+        stage_us = sum(packages.values())
+        total += stage_us
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:top]
+        listing = ", ".join(f"{name} {us / 1000:.1f}" for name, us in heaviest) or "-"
+        print(f"   {stage:<{width}} {stage_us / 1000:>8.1f} ms   {listing}")
+    print(f"   {'imports total':<{width}} {total / 1000:>8.1f} ms of {wall_seconds * 1000:.0f} ms wall time")
+
+def startup_profile(argv=None):
+    """
+    Handle --startup-profile: re-run this script under -X importtime, report, exit.
+
+    Without the flag (or inside the profiled run) this returns immediately.
+    """
+    argv = sys.argv if argv is None else argv
+    if STARTUP_PROFILE_FLAG not in argv[1:] or os.environ.get(STARTUP_PROFILE_ENV):
+        return
+    args = [arg for arg in argv[1:] if arg != STARTUP_PROFILE_FLAG]
+    env = dict(os.environ, **{STARTUP_PROFILE_ENV: "1"})
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", argv[0], *args],
+                            env=env, stderr=subprocess.PIPE, text=True)
+    wall_seconds = time.perf_counter() - start
+
+    stages, other = parse_import_times(result.stderr.splitlines())
+    for line in other:
+        print(line, file=sys.stderr)
+    print_import_report(stages, wall_seconds)
+    sys.exit(result.returncode)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+run_pipeline.py
+
+In-Process Data Extraction Pipeline
+===================================
+
+Runs the three data extraction stages in one Python process:
+
+1. midi_map.extract_note_intervals        (MIDI note events)
+2. svg_extract_note_heads.extract_note_heads  (SVG notehead positions)
+3. align_pitch_by_geometry_simplified.align_notes  (MIDI ↔ SVG alignment)
+
+Each stage hands its records straight to the next one instead of
+writing a CSV that the next script parses again, so the path from the
+one-line engraving to exports/bwv1006_json_notes.json pays one interpreter
+start and no text round-trips. Noteheads keep the 3-decimal coordinates of
+the CSV, so the result is the same as running the three scripts in turn.
+
+Usage:
+    python3 scripts/run_pipeline.py              # Write the aligned JSON only
+    python3 scripts/run_pipeline.py --write-csv  # ... and the intermediate CSVs (debugging)
+"""
+
+import argparse
+import sys
+
+import align_pitch_by_geometry_simplified as align
+import midi_map
+import svg_extract_note_heads as note_heads
+from pipeline_trace import Phases, startup_profile
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def run_pipeline(midi_file=midi_map.MIDI_FILE, svg_file=note_heads.SVG_FILE, ly_file=note_heads.LY_FILE,
+                 ties_csv=align.TIES_CSV, output_json=align.OUTPUT_JSON, write_csv=False):
+    """
+    Extract, align and export the note data.
+
+    Args:
+        midi_file: One-line MIDI engraving
+        svg_file: One-line SVG engraving
+        ly_file: LilyPond source of the score
+        ties_csv: Tie relationships (primary, secondary)
+        output_json: Aligned notes for the player
+        write_csv: Also write the intermediate CSVs read by the standalone scripts
+
+    Returns:
+        list: The aligned notes
+    """
+    phases = Phases("run_pipeline")
+
+    # Stage 1: MIDI note events
+    midi_notes = midi_map.extract_note_intervals(midi_file)
+    midi_map.PHASES.end()
+
+    # Stage 2: SVG noteheads
+    notehead_data = note_heads.extract_note_heads(svg_file, ly_file)
+    note_heads.print_extraction_summary(notehead_data)
+
+    if write_csv:
+        phases.start("write_csv")
+        print(f"💾 Writing intermediate CSVs: {midi_map.OUTPUT_CSV}, {note_heads.OUTPUT_CSV}")
+        midi_map.write_note_events_csv(midi_notes, midi_map.OUTPUT_CSV)
+        note_heads.write_note_heads_csv(notehead_data, note_heads.OUTPUT_CSV)
+        phases.end()
+
+    # Stage 3: alignment (same values as the CSVs read back)
+    ties = align.read_csv_rows(ties_csv)
+    aligned_notes = align.align_notes(midi_notes, notehead_data, ties)
+
+    phases.start("serialize")
+    print(f"💾 Writing aligned data to {output_json}...")
+    align.write_aligned_json(aligned_notes, output_json)
+    phases.end()
+
+    align.print_alignment_summary(aligned_notes, output_json)
+    return aligned_notes
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MIDI extraction, notehead extraction and alignment in one process")
+    parser.add_argument("--write-csv", action="store_true",
+                        help="Also write the intermediate CSV files (for debugging)")
+    args = parser.parse_args()
+
+    print("🚀 In-process data extraction pipeline")
+    print("=" * 60)
+    run_pipeline(write_csv=args.write_csv)
+    return 0
+
+if __name__ == "__main__":
+    startup_profile()
+    sys.exit(main())
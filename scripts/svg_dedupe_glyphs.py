@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+svg_dedupe_glyphs.py
+
+Glyph Deduplication into <symbol>/<use>
+=======================================
+
+LilyPond emits the complete outline of every glyph each time it is drawn:
+the same notehead, flag, clef or digit path appears hundreds of times, and
+only its transform differs. This script hoists repeated shapes into shared
+symbols and references them:
+
+  <path transform="translate(x,y)" d="M...long outline..." fill="currentColor"/>
+  <path transform="translate(u,v)" d="M...long outline..." fill="currentColor"/>
+
+becomes
+
+  <defs>
+    <symbol id="g0" overflow="visible"><path d="M...long outline..." fill="currentColor"/></symbol>
+  </defs>
+  <use href="#g0" transform="translate(x,y)"/>
+  <use href="#g0" transform="translate(u,v)"/>
+
+Shapes are grouped by a hash of their normalized path data plus their
+presentation attributes. Paths carrying or nested under a musical href
+(noteheads used for highlighting and swell animations) are left in place by
+default, so the structure checked by optim/svg_validator.py is preserved,
+as are all data-bar elements.
+
+Usage:
+    python svg_dedupe_glyphs.py input.svg [output.svg]
+    python svg_dedupe_glyphs.py input.svg  # Creates input_deduped.svg
+"""
+
+import argparse
+import hashlib
+import itertools
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from atomic_output import write_if_changed
+from pipeline_trace import Phases, startup_profile
+from svg_optimize_path_data import optimize_path_data
+
+PHASES = Phases("svg_dedupe_glyphs")
+
+# =============================================================================
+# SVG NAMESPACE CONFIGURATION
+# =============================================================================
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+# Register XML namespaces to prevent ns0: prefixes in output
+ET.register_namespace('', SVG_NAMESPACE)
+ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+
+# Attributes that stay on each instance instead of moving into the symbol
+INSTANCE_ATTRIBUTES = ('transform', 'id', 'class', 'style')
+
+# Decimals used to normalize path data before hashing
+NORMALIZE_PRECISION = 6
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def local_name(tag):
+    """Strip the namespace from an element tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def has_musical_href(element):
+    """Check whether an element carries a LilyPond textedit link."""
+    for attribute_name, attribute_value in element.attrib.items():
+        if (attribute_name == 'href' or attribute_name.endswith('}href')) and 'textedit://' in attribute_value:
+            return True
+    return False
+
+
+def count_elements(root):
+    """Count elements by local tag name."""
+    counts = {}
+    for element in root.iter():
+        name = local_name(element.tag)
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def glyph_key(path_element):
+    """
+    Hash a path's shape and presentation attributes.
+
+    Path data is normalized through the path-data tokenizer, so the same
+    outline written with different number formatting still matches.
+    """
+    normalized = optimize_path_data(path_element.get('d'), NORMALIZE_PRECISION)
+    presentation = sorted(
+        (name, value) for name, value in path_element.attrib.items()
+        if name != 'd' and name not in INSTANCE_ATTRIBUTES and not name.startswith('data-')
+    )
+    digest = hashlib.sha1(normalized.encode('utf-8'))
+    digest.update(repr(presentation).encode('utf-8'))
+    return digest.hexdigest()
+
+# =============================================================================
+# CORE DEDUPLICATION ENGINE
+# =============================================================================
+
+def dedupe_svg_glyphs(svg_content, min_count=2, min_length=32, include_noteheads=False):
+    """
+    Replace repeated glyph paths with <use> references to shared symbols.
+
+    Args:
+        svg_content (str): Original SVG content as string
+        min_count (int): Minimum number of occurrences for a shape to be shared
+        min_length (int): Minimum path data length worth sharing
+        include_noteheads (bool): Also share paths under musical hrefs
+
+    Returns:
+        tuple: (modified_svg_string, report)
+               - modified_svg_string: Transformed SVG content
+               - report: dict with byte and DOM statistics
+    """
+    print("   🔍 Parsing SVG structure...")
+    svg_root = ET.fromstring(svg_content)
+    elements_before = count_elements(svg_root)
+
+    # =================================================================
+    # CANDIDATE DISCOVERY
+    # =================================================================
+
+    print("   🔗 Hashing glyph outlines...")
+    parent_map = {child: parent for parent in svg_root.iter() for child in parent}
+
+    def protected(element):
+        """Paths inside <defs> or under a musical href stay untouched."""
+        ancestor = parent_map.get(element)
+        while ancestor is not None:
+            if local_name(ancestor.tag) in ('defs', 'symbol', 'clipPath', 'mask', 'pattern', 'marker'):
+                return True
+            if not include_noteheads and has_musical_href(ancestor):
+                return True
+            ancestor = parent_map.get(ancestor)
+        return not include_noteheads and has_musical_href(element)
+
+    groups = {}
+    for element in svg_root.iter():
+        if local_name(element.tag) != 'path' or len(element):
+            continue
+        d = element.get('d')
+        if not d or len(d) < min_length or protected(element):
+            continue
+        groups.setdefault(glyph_key(element), []).append(element)
+
+    shared = [paths for paths in groups.values() if len(paths) >= min_count]
+    shared.sort(key=lambda paths: -len(paths))
+    print(f"   📊 Found {len(shared)} repeated shapes among {sum(len(p) for p in groups.values())} candidate paths")
+
+    if not shared:
+        # Nothing to share: re-serializing would only reformat the document
+        elements = sum(elements_before.values())
+        size = len(svg_content.encode('utf-8'))
+        return svg_content, {
+            'symbols': 0,
+            'replaced_paths': 0,
+            'bytes_before': size,
+            'bytes_after': size,
+            'elements_before': elements,
+            'elements_after': elements,
+            'paths_before': elements_before.get('path', 0),
+            'paths_after': elements_before.get('path', 0),
+        }
+
+    # =================================================================
+    # SYMBOL HOISTING
+    # =================================================================
+
+    ns = f"{{{SVG_NAMESPACE}}}" if svg_root.tag.startswith('{') else ''
+    defs = ET.Element(f"{ns}defs")
+    replaced_count = 0
+
+    # Symbol ids must not collide with ids already in the document
+    taken_ids = {element.get('id') for element in svg_root.iter() if element.get('id')}
+    symbol_ids = (f"g{n}" for n in itertools.count() if f"g{n}" not in taken_ids)
+
+    for paths in shared:
+        symbol_id = next(symbol_ids)
+        template = paths[0]
+
+        symbol = ET.SubElement(defs, f"{ns}symbol", {'id': symbol_id, 'overflow': 'visible'})
+        ET.SubElement(symbol, f"{ns}path", {
+            name: value for name, value in template.attrib.items()
+            if name not in INSTANCE_ATTRIBUTES and not name.startswith('data-')
+        })
+
+        for path_element in paths:
+            instance_attributes = {'href': f"#{symbol_id}"}
+            for name, value in path_element.attrib.items():
+                if name in INSTANCE_ATTRIBUTES or name.startswith('data-'):
+                    instance_attributes[name] = value
+
+            parent = parent_map[path_element]
+            position = list(parent).index(path_element)
+            use = ET.Element(f"{ns}use", instance_attributes)
+            use.tail = path_element.tail
+            parent.remove(path_element)
+            parent.insert(position, use)
+            replaced_count += 1
+
+    svg_root.insert(0, defs)
+
+    # =================================================================
+    # RESULT GENERATION
+    # =================================================================
+
+    print("   📝 Serializing modified SVG...")
+    xml_string = ET.tostring(svg_root, encoding='unicode', xml_declaration=False)
+
+    # Preserve original XML declaration if present
+    if svg_content.strip().startswith('<?xml'):
+        xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_string
+
+    elements_after = count_elements(svg_root)
+    report = {
+        'symbols': len(shared),
+        'replaced_paths': replaced_count,
+        'bytes_before': len(svg_content.encode('utf-8')),
+        'bytes_after': len(xml_string.encode('utf-8')),
+        'elements_before': sum(elements_before.values()),
+        'elements_after': sum(elements_after.values()),
+        'paths_before': elements_before.get('path', 0),
+        'paths_after': elements_after.get('path', 0),
+    }
+    return xml_string, report
+
+# =============================================================================
+# FILE PROCESSING INTERFACE
+# =============================================================================
+
+def process_svg_file(input_path, output_path=None, min_count=2, include_noteheads=False):
+    """
+    Deduplicate glyphs in a single SVG file.
+
+    Args:
+        input_path (str): Path to input SVG file
+        output_path (str, optional): Path for output. If None, creates input_deduped.svg
+        min_count (int): Minimum number of occurrences for a shape to be shared
+        include_noteheads (bool): Also share paths under musical hrefs
+
+    Returns:
+        bool: True if processing succeeded, False otherwise
+    """
+    input_file = Path(input_path)
+
+    if not input_file.exists():
+        print(f"❌ Error: Input file '{input_path}' does not exist")
+        return False
+
+    print(f"🎼 Processing: {input_path}")
+
+    try:
+        PHASES.start("read")
+        print("   📖 Reading SVG file...")
+        original_svg_content = input_file.read_text(encoding='utf-8')
+
+        PHASES.start("transform")
+        modified_svg_content, report = dedupe_svg_glyphs(
+            original_svg_content, min_count=min_count, include_noteheads=include_noteheads
+        )
+
+        output_file = Path(output_path) if output_path else input_file.parent / f"{input_file.stem}_deduped.svg"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        PHASES.start("write")
+        print(f"   💾 Writing deduplicated SVG...")
+        write_if_changed(output_file, modified_svg_content)
+        PHASES.end()
+
+        saved = report['bytes_before'] - report['bytes_after']
+        reduction = (saved / report['bytes_before']) * 100 if report['bytes_before'] else 0
+
+        print(f"✅ Success: {output_file}")
+        print(f"   🔣 {report['symbols']} shared symbols replace {report['replaced_paths']} paths")
+        print(f"   📏 Size: {report['bytes_before']:,} → {report['bytes_after']:,} bytes "
+              f"({saved:,} saved, {reduction:.1f}% reduction)")
+        print(f"   🌳 DOM: {report['elements_before']:,} → {report['elements_after']:,} elements, "
+              f"<path> {report['paths_before']:,} → {report['paths_after']:,}")
+        return True
+
+    except Exception as processing_error:
+        print(f"❌ Error processing '{input_path}': {processing_error}")
+        return False
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main():
+    """Main function handling command line arguments."""
+
+    parser = argparse.ArgumentParser(
+        description='Share repeated glyph outlines through <symbol>/<use>',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python svg_dedupe_glyphs.py score.svg output.svg     # Specific output file
+  python svg_dedupe_glyphs.py score.svg                # Creates score_deduped.svg
+  python svg_dedupe_glyphs.py score.svg --min-count 3  # Only share shapes used 3+ times
+        """
+    )
+
+    parser.add_argument('input_file', help='Input SVG file')
+    parser.add_argument('output_file', nargs='?', help='Output SVG file')
+    parser.add_argument('--min-count', type=int, default=2,
+                        help='Minimum occurrences for a shape to be shared (default: 2)')
+    parser.add_argument('--include-noteheads', action='store_true',
+                        help='Also share paths under musical hrefs (breaks [href] + <path> lookups)')
+
+    args = parser.parse_args()
+
+    print("🚀 SVG Glyph Deduplication")
+    print("=" * 45)
+
+    success = process_svg_file(args.input_file, args.output_file, args.min_count, args.include_noteheads)
+    return 0 if success else 1
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+
+if __name__ == '__main__':
+    startup_profile()
+    sys.exit(main())
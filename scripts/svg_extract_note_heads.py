@@ -28,6 +28,9 @@ import re
 import csv
 import xml.etree.ElementTree as ET
 
+from atomic_output import AtomicOutput
+from pipeline_trace import Phases, startup_profile
+
 # =============================================================================
 # LILYPOND PITCH PATTERN MATCHING
 # =============================================================================
@@ -100,29 +103,55 @@ def extract_text_from_href(href):
     except Exception as e:
         return f"(error: {e})"
 
-def main():
-    """Main function with project context support."""
+# =============================================================================
+# DEFAULT FILES
+# =============================================================================
+
+SVG_FILE = "bwv1006_ly_one_line.svg"            # LilyPond-generated SVG with noteheads
+LY_FILE = "bwv1006.ly"                          # Original LilyPond source code
+OUTPUT_CSV = "bwv1006_csv_svg_note_heads.csv"   # Output dataset
+
+CSV_FIELDS = ["index", "x", "y", "snippet", "href"]
 
-    SVG_FILE = "bwv1006_ly_one_line.svg"     # LilyPond-generated SVG with noteheads
-    LY_FILE = "bwv1006.ly"                   # Original LilyPond source code
-    OUTPUT_CSV = "bwv1006_csv_svg_note_heads.csv"  # Output dataset
+# =============================================================================
+# STAGE API
+# =============================================================================
+
+def extract_note_heads(svg_file=SVG_FILE, ly_file=LY_FILE, phases=None):
+    """
+    Extract noteheads from a LilyPond SVG in visual reading order.
+    
+    Coordinates are rounded to 3 decimals, exactly as the CSV stores them,
+    so the in-process pipeline (run_pipeline.py) sees the same values as a
+    stage reading the CSV back.
+    
+    Args:
+        svg_file (str): LilyPond-generated SVG with textedit links
+        ly_file (str): LilyPond source the score was engraved from
+        phases (Phases): Optional phase recorder (parse, extract, sort)
+        
+    Returns:
+        list: One dict per notehead with the CSV_FIELDS keys
+    """
+    phases = phases or Phases("svg_extract_note_heads")
 
     print(f"🎼 Processing musical score:")
-    print(f"   📄 SVG source: {SVG_FILE}")
-    print(f"   🎵 LilyPond source: {LY_FILE}")
+    print(f"   📄 SVG source: {svg_file}")
+    print(f"   🎵 LilyPond source: {ly_file}")
     
     # =============================================================================
     # XML NAMESPACE SETUP AND FILE LOADING
     # =============================================================================
 
+    phases.start("parse")
     print("🔍 Loading and parsing SVG file...")
 
     # Load SVG file
-    with open(SVG_FILE, encoding="utf-8") as f:
+    with open(svg_file, encoding="utf-8") as f:
         svg = ET.parse(f)
 
     # Load LilyPond source (used by extract_text_from_href function)
-    with open(LY_FILE, encoding="utf-8") as f:
+    with open(ly_file, encoding="utf-8") as f:
         ly_lines = f.readlines()
 
     # SVG namespaces for XPath queries
@@ -132,6 +161,7 @@ def main():
     # NOTEHEAD DISCOVERY AND COORDINATE EXTRACTION
     # =============================================================================
 
+    phases.start("extract")
     print("📍 Extracting notehead positions and pitch data...")
 
     # Storage for discovered noteheads
@@ -180,6 +210,7 @@ def main():
     # SPATIAL SORTING FOR VISUAL ALIGNMENT
     # =============================================================================
 
+    phases.start("sort")
     print("📐 Sorting noteheads by visual position...")
 
     # Sort noteheads by visual reading order:
@@ -190,28 +221,58 @@ def main():
 
     print(f"   🎯 Sorted {len(notehead_data)} noteheads in reading order")
 
+    phases.end()
+
+    # Sequential index and CSV precision
+    return [
+        {
+            "index": i,                             # Sequential position number
+            "x": round(note["x"], 3),              # X-coordinate (3 decimal precision)
+            "y": round(note["y"], 3),              # Y-coordinate (3 decimal precision)  
+            "snippet": note["snippet"],            # LilyPond pitch notation
+            "href": note["href"]                   # Original cross-reference URL
+        }
+        for i, note in enumerate(notehead_data, 1)
+    ]
+
+def write_note_heads_csv(notehead_data, output_csv=OUTPUT_CSV):
+    """Write noteheads from extract_note_heads() to CSV."""
+    with AtomicOutput(output_csv, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(notehead_data)
+
+def print_extraction_summary(notehead_data):
+    """Print coordinate and pitch statistics for verification."""
+    if notehead_data:
+        x_range = max(n["x"] for n in notehead_data) - min(n["x"] for n in notehead_data)
+        y_range = max(n["y"] for n in notehead_data) - min(n["y"] for n in notehead_data)
+        unique_pitches = len(set(n["snippet"] for n in notehead_data))
+        
+        print(f"\n📊 Extraction Statistics:")
+        print(f"   📏 X-coordinate range: {x_range:.1f} units")
+        print(f"   📐 Y-coordinate range: {y_range:.1f} units") 
+        print(f"   🎵 Unique pitch notations: {unique_pitches}")
+        print(f"   🔗 Average notes per pitch: {len(notehead_data)/unique_pitches:.1f}")
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main():
+    """Main function with project context support."""
+
+    phases = Phases("svg_extract_note_heads")
+    notehead_data = extract_note_heads(SVG_FILE, LY_FILE, phases)
+
     # =============================================================================
     # CSV EXPORT
     # =============================================================================
 
+    phases.start("serialize")
     print(f"💾 Writing results to {OUTPUT_CSV}...")
-
-    # Define CSV structure with all relevant data for downstream processing
-    with open(OUTPUT_CSV, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["index", "x", "y", "snippet", "href"])
-        
-        # Write header row
-        writer.writeheader()
-        
-        # Write data rows with sequential indexing
-        for i, note in enumerate(notehead_data, 1):
-            writer.writerow({
-                "index": i,                             # Sequential position number
-                "x": round(note["x"], 3),              # X-coordinate (3 decimal precision)
-                "y": round(note["y"], 3),              # Y-coordinate (3 decimal precision)  
-                "snippet": note["snippet"],            # LilyPond pitch notation
-                "href": note["href"]                   # Original cross-reference URL
-            })
+    write_note_heads_csv(notehead_data, OUTPUT_CSV)
+    phases.end()
 
     # =============================================================================
     # COMPLETION SUMMARY
@@ -221,18 +282,10 @@ def main():
     print(f"✅ Export complete: {OUTPUT_CSV} {extraction_summary}")
 
     # Additional statistics for verification
-    if notehead_data:
-        x_range = max(n["x"] for n in notehead_data) - min(n["x"] for n in notehead_data)
-        y_range = max(n["y"] for n in notehead_data) - min(n["y"] for n in notehead_data)
-        unique_pitches = len(set(n["snippet"] for n in notehead_data))
-        
-        print(f"\n📊 Extraction Statistics:")
-        print(f"   📏 X-coordinate range: {x_range:.1f} units")
-        print(f"   📐 Y-coordinate range: {y_range:.1f} units") 
-        print(f"   🎵 Unique pitch notations: {unique_pitches}")
-        print(f"   🔗 Average notes per pitch: {len(notehead_data)/unique_pitches:.1f}")
+    print_extraction_summary(notehead_data)
 
     print(f"\n� Ready for alignment with MIDI data in next pipeline stage")
 
 if __name__ == "__main__":
+    startup_profile()
     main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+svg_merge_bar_highlights.py
+
+Bar Highlight Merging
+=====================
+
+includes/highlight-bars.ily emits one highlight per staff context, so every
+bar is drawn by several rectangles carrying the same data-bar value, with
+the same x/width and a different y translation:
+
+  <rect x="13.18" ... transform="translate(3.161 18.065)" data-bar="1" .../>
+  <rect x="13.18" ... transform="translate(3.161 37.945)" data-bar="1" .../>
+
+This script merges each bar's rectangles into a single <path> with one
+closed subpath per rectangle, keeping data-bar, data-bar-moment-main and
+data-bar-moment-grace and the shared paint attributes:
+
+  <path d="M16.341 16.011h32.364v4.107h-32.364zM16.341 35.891h..." data-bar="1" .../>
+
+The player then toggles one element per bar change instead of one per staff.
+Highlights are only merged when every transform involved is a plain
+translation, the rectangles have square corners and all highlights of the
+bar carry the same data-* attributes.
+
+Usage:
+    python svg_merge_bar_highlights.py input.svg [output.svg]
+    python svg_merge_bar_highlights.py input.svg  # Creates input_bars.svg
+"""
+
+import argparse
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from atomic_output import write_if_changed
+from pipeline_trace import Phases, startup_profile
+from svg_optimize_path_data import format_number
+
+PHASES = Phases("svg_merge_bar_highlights")
+
+# =============================================================================
+# SVG NAMESPACE CONFIGURATION
+# =============================================================================
+
+# Register XML namespaces to prevent ns0: prefixes in output
+ET.register_namespace('', 'http://www.w3.org/2000/svg')
+ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+
+# Rectangle geometry, folded into the merged path data
+GEOMETRY_ATTRIBUTES = ('x', 'y', 'width', 'height', 'rx', 'ry', 'transform')
+
+# Decimals written for merged coordinates (LilyPond emits 4)
+PRECISION = 4
+
+_TRANSLATE = re.compile(r"^\s*translate\(\s*([-+\d.eE]+)(?:[\s,]+([-+\d.eE]+))?\s*\)\s*$")
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def local_name(tag):
+    """Strip the namespace from an element tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_translate(transform):
+    """
+    Parse a pure translation.
+
+    Returns:
+        tuple or None: (tx, ty), (0, 0) when there is no transform, or None
+                       when the transform is anything but a translation
+    """
+    if not transform:
+        return 0.0, 0.0
+    match = _TRANSLATE.match(transform)
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2) or 0.0)
+
+
+def collect_rects(element, offset_x=0.0, offset_y=0.0):
+    """
+    Collect the rectangles drawn by a highlight element.
+
+    Args:
+        element (Element): Element carrying data-bar
+        offset_x, offset_y (float): Translation accumulated so far
+
+    Returns:
+        list or None: [(x, y, width, height, paint_attributes), ...] in the
+                      coordinate system of the element's parent, or None
+                      when the subtree cannot be expressed as plain rects
+    """
+    translation = parse_translate(element.get('transform'))
+    if translation is None:
+        return None
+    offset_x += translation[0]
+    offset_y += translation[1]
+
+    name = local_name(element.tag)
+    if name == 'rect':
+        if float(element.get('rx', 0) or 0) != 0 or float(element.get('ry', 0) or 0) != 0:
+            return None
+        paint = tuple(sorted(
+            (k, v) for k, v in element.attrib.items()
+            if k not in GEOMETRY_ATTRIBUTES and not k.startswith('data-')
+        ))
+        return [(
+            float(element.get('x', 0)) + offset_x,
+            float(element.get('y', 0)) + offset_y,
+            float(element.get('width', 0)),
+            float(element.get('height', 0)),
+            paint,
+        )]
+
+    if name != 'g':
+        return None
+
+    rects = []
+    for child in element:
+        child_rects = collect_rects(child, offset_x, offset_y)
+        if child_rects is None:
+            return None
+        rects.extend(child_rects)
+    return rects
+
+
+def rects_to_path_data(rects):
+    """Write rectangles as closed subpaths of one path."""
+    parts = []
+    for x, y, width, height, _ in rects:
+        parts.append(
+            f"M{format_number(x, PRECISION)} {format_number(y, PRECISION)}"
+            f"h{format_number(width, PRECISION)}v{format_number(height, PRECISION)}"
+            f"h{format_number(-width, PRECISION)}z"
+        )
+    return ''.join(parts)
+
+# =============================================================================
+# CORE MERGING ENGINE
+# =============================================================================
+
+def merge_bar_highlights(svg_content):
+    """
+    Merge all highlight rectangles of each bar into one <path>.
+
+    Args:
+        svg_content (str): Original SVG content as string
+
+    Returns:
+        tuple: (modified_svg_string, summary_message)
+    """
+    print("   🔍 Parsing SVG structure...")
+
+    try:
+        svg_root = ET.fromstring(svg_content)
+    except ET.ParseError as parse_error:
+        error_message = f"SVG parsing failed: {parse_error}"
+        print(f"   ❌ {error_message}")
+        return svg_content, error_message
+
+    parent_map = {child: parent for parent in svg_root.iter() for child in parent}
+
+    # =================================================================
+    # GROUP HIGHLIGHTS BY BAR
+    # =================================================================
+
+    print("   📊 Grouping highlight elements by data-bar...")
+
+    groups = {}
+    for element in svg_root.iter():
+        bar = element.get('data-bar')
+        if bar is None or element not in parent_map:
+            continue
+        # Only siblings share a coordinate system
+        groups.setdefault((id(parent_map[element]), bar), []).append(element)
+
+    # =================================================================
+    # MERGING
+    # =================================================================
+
+    print("   🔄 Merging rectangles per bar...")
+
+    ns = '{http://www.w3.org/2000/svg}' if svg_root.tag.startswith('{') else ''
+    elements_before = 0
+    merged_bars = 0
+    skipped_bars = 0
+
+    for (_, bar), elements in groups.items():
+        elements_before += len(elements)
+
+        rects = []
+        for element in elements:
+            element_rects = collect_rects(element)
+            if element_rects is None:
+                rects = None
+                break
+            rects.extend(element_rects)
+
+        paints = {rect[4] for rect in rects} if rects else set()
+        if not rects or len(paints) != 1 or (len(elements) == 1 and len(rects) == 1):
+            skipped_bars += 1
+            continue
+
+        # The merged path carries one set of data-bar-moment-* (and class)
+        # values: a bar whose highlights disagree keeps its elements
+        kept = [
+            {name: value for name, value in element.attrib.items()
+             if name.startswith('data-') or name == 'class'}
+            for element in elements
+        ]
+        if any(k != kept[0] for k in kept[1:]) or sum('id' in e.attrib for e in elements) > 1:
+            print(f"   ⚠️  Bar {bar}: highlight attributes differ between staves, not merged")
+            skipped_bars += 1
+            continue
+
+        first = elements[0]
+        attributes = dict(paints.pop())
+        attributes.update(kept[0])
+        for element in elements:
+            if 'id' in element.attrib:
+                attributes['id'] = element.get('id')
+        attributes['d'] = rects_to_path_data(sorted(rects, key=lambda r: (r[1], r[0])))
+
+        merged = ET.Element(f"{ns}path", attributes)
+        parent = parent_map[first]
+        merged.tail = first.tail
+        parent.insert(list(parent).index(first), merged)
+        for element in elements:
+            parent.remove(element)
+        merged_bars += 1
+
+    elements_after = sum(1 for element in svg_root.iter() if element.get('data-bar') is not None)
+
+    summary = (f"Merged {merged_bars} bar(s): {elements_before} highlight elements → "
+               f"{elements_after} ({skipped_bars} bar(s) left unchanged)")
+    print(f"   ✅ {summary}")
+
+    print("   📝 Serializing modified SVG...")
+    xml_string = ET.tostring(svg_root, encoding='unicode', xml_declaration=False)
+
+    # Preserve original XML declaration if present
+    if svg_content.strip().startswith('<?xml'):
+        xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_string
+
+    return xml_string, summary
+
+# =============================================================================
+# FILE PROCESSING INTERFACE
+# =============================================================================
+
+def process_svg_file(input_path, output_path=None):
+    """
+    Merge bar highlights in a single SVG file.
+
+    Args:
+        input_path (str): Path to input SVG file
+        output_path (str, optional): Path for output. If None, creates input_bars.svg
+
+    Returns:
+        bool: True if processing succeeded, False otherwise
+    """
+    input_file = Path(input_path)
+
+    if not input_file.exists():
+        print(f"❌ Error: Input file '{input_path}' does not exist")
+        return False
+
+    print(f"🎼 Processing: {input_path}")
+
+    try:
+        PHASES.start("read")
+        print("   📖 Reading SVG file...")
+        original_svg_content = input_file.read_text(encoding='utf-8')
+
+        PHASES.start("transform")
+        modified_svg_content, summary = merge_bar_highlights(original_svg_content)
+
+        output_file = Path(output_path) if output_path else input_file.parent / f"{input_file.stem}_bars.svg"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        PHASES.start("write")
+        print(f"   💾 Writing merged SVG...")
+        write_if_changed(output_file, modified_svg_content)
+        PHASES.end()
+
+        print(f"✅ Success: {output_file}")
+        print(f"   📊 {summary}")
+        return True
+
+    except Exception as processing_error:
+        print(f"❌ Error processing '{input_path}': {processing_error}")
+        return False
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main():
+    """Main function handling command line arguments."""
+
+    parser = argparse.ArgumentParser(
+        description='Merge per-staff bar highlight rectangles into one element per bar',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python svg_merge_bar_highlights.py score.svg output.svg    # Specific output file
+  python svg_merge_bar_highlights.py score.svg               # Creates score_bars.svg
+        """
+    )
+
+    parser.add_argument('input_file', help='Input SVG file')
+    parser.add_argument('output_file', nargs='?', help='Output SVG file')
+
+    args = parser.parse_args()
+
+    print("🚀 SVG Bar Highlight Merging")
+    print("=" * 45)
+
+    success = process_svg_file(args.input_file, args.output_file)
+    return 0 if success else 1
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+
+if __name__ == '__main__':
+    startup_profile()
+    sys.exit(main())
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """
 svg_optimize.py - Minimal SVGO wrapper with consistent logging
+
+SVGO runs in a persistent worker (svgo_pool.py) instead of `npx svgo`, using
+svgo.config.js from the current directory like the SVGO CLI does.
 """
 
-import subprocess
 import sys
 from pathlib import Path
 
+from atomic_output import write_if_changed
+from pipeline_trace import Phases, startup_profile
+from svgo_pool import SVGOError, SVGOPool
+
 def main():
     if len(sys.argv) != 3:
         print("Usage: python3 svg_optimize.py <input.svg> <output.svg>")
@@ -25,19 +31,32 @@ def main():
     
     # Run SVGO
     print(f"   🔧 Running SVGO optimization...")
-    result = subprocess.run([
-        'npx', 'svgo', str(input_file), '--output', str(output_file)
-    ], capture_output=True, text=True)
+    config_file = Path("svgo.config.js")
+    phases = Phases("svg_optimize")
+    phases.start("svgo")
+    try:
+        with SVGOPool() as pool:
+            optimized = pool.optimize(
+                input_file.read_bytes(),
+                config_file=config_file if config_file.exists() else None,
+                path=str(input_file),
+            )
+        write_if_changed(output_file, optimized)
+        error = None
+    except SVGOError as e:
+        error = e
+    phases.end()
     
-    if result.returncode == 0 and output_file.exists():
+    if error is None and output_file.exists():
         optimized_size = output_file.stat().st_size
         reduction = ((original_size - optimized_size) / original_size) * 100
         
         print(f"✅ Optimization complete: {output_file.name}")
         print(f"   📊 Size: {original_size:,} → {optimized_size:,} bytes ({reduction:.1f}% reduction)")
     else:
-        print(f"❌ SVGO optimization failed: {result.stderr}")
+        print(f"❌ SVGO optimization failed: {error}")
         sys.exit(1)
 
 if __name__ == "__main__":
+    startup_profile()
     main()
\ No newline at end of file
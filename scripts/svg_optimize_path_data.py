@@ -0,0 +1,604 @@
+#!/usr/bin/env python3
+"""
+svg_optimize_path_data.py
+
+Native Path Data Optimizer for LilyPond Glyph Paths
+===================================================
+
+Most of the bytes in an exported score are the `d` attributes of LilyPond
+glyph outlines. This script shortens them without Node/SVGO:
+
+- Tokenizes each path once into commands and a single numeric array
+- Quantizes coordinates to a configurable decimal precision
+- Writes every segment in the shorter of its absolute/relative forms
+- Turns axis-aligned lines into H/V and drops zero-length line segments
+- Omits repeated command letters and unnecessary separators
+
+Quantization is done on absolute coordinates and relative values are derived
+from the quantized points, so rounding errors never accumulate along a path.
+Every rewritten path is checked against the original geometry and the
+original `d` is kept when the deviation exceeds the tolerance.
+
+Usage:
+    python svg_optimize_path_data.py input.svg [output.svg]
+    python svg_optimize_path_data.py input.svg --precision 2
+    python svg_optimize_path_data.py input.svg  # Creates input_paths.svg
+"""
+
+import argparse
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# numpy is imported by the functions using it: svg_merge_bar_highlights.py only
+# needs format_number and should not pay for the import
+
+from atomic_output import write_if_changed
+from pipeline_trace import Phases, startup_profile
+
+PHASES = Phases("svg_optimize_path_data")
+
+# =============================================================================
+# SVG NAMESPACE CONFIGURATION
+# =============================================================================
+
+# Register XML namespaces to prevent ns0: prefixes in output
+ET.register_namespace('', 'http://www.w3.org/2000/svg')
+ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+
+# =============================================================================
+# PATH DATA GRAMMAR
+# =============================================================================
+
+# Number of arguments consumed by one segment of each command
+COMMAND_ARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+# Which argument slots are x / y coordinates (shifted by the current point
+# when a segment is relative). Arc radii, rotation and flags are neither.
+X_SLOTS = {
+    'M': (1, 0), 'L': (1, 0), 'H': (1,), 'V': (0,), 'C': (1, 0, 1, 0, 1, 0),
+    'S': (1, 0, 1, 0), 'Q': (1, 0, 1, 0), 'T': (1, 0), 'A': (0, 0, 0, 0, 0, 1, 0), 'Z': (),
+}
+Y_SLOTS = {
+    'M': (0, 1), 'L': (0, 1), 'H': (0,), 'V': (1,), 'C': (0, 1, 0, 1, 0, 1),
+    'S': (0, 1, 0, 1), 'Q': (0, 1, 0, 1), 'T': (0, 1), 'A': (0, 0, 0, 0, 0, 0, 1), 'Z': (),
+}
+
+_COMMAND_CHUNK = re.compile(r"([MmLlHhVvCcSsQqTtAaZz])([^MmLlHhVvCcSsQqTtAaZz]*)")
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_ARC_FLAG = re.compile(r"[\s,]*([01])")
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+def _arc_numbers(chunk):
+    """Parse arc arguments, where the two flags may be written without separators."""
+    numbers = []
+    position = 0
+    slot = 0
+    while True:
+        if slot in (3, 4):
+            match = _ARC_FLAG.match(chunk, position)
+        else:
+            match = _NUMBER.search(chunk, position)
+        if not match:
+            return numbers
+        numbers.append(float(match.group(1) if slot in (3, 4) else match.group(0)))
+        position = match.end()
+        slot = (slot + 1) % 7
+
+
+def parse_path_data(d):
+    """
+    Tokenize path data once into segment commands and one numeric array.
+
+    Implicit command repetitions are expanded so that every segment carries
+    exactly one argument set; extra coordinate pairs after a moveto become
+    linetos, as the SVG grammar specifies.
+
+    Args:
+        d (str): SVG path data
+
+    Returns:
+        tuple: (commands, values)
+               - commands: list of single-letter commands, one per segment
+               - values: float ndarray with all arguments concatenated
+    """
+    import numpy as np
+    commands = []
+    values = []
+
+    for letter, chunk in _COMMAND_CHUNK.findall(d):
+        upper = letter.upper()
+        if upper == 'Z':
+            commands.append(letter)
+            continue
+
+        numbers = _arc_numbers(chunk) if upper == 'A' else [float(n) for n in _NUMBER.findall(chunk)]
+        arg_count = COMMAND_ARGS[upper]
+        segment_count = len(numbers) // arg_count
+
+        for i in range(segment_count):
+            if upper == 'M' and i > 0:
+                commands.append('l' if letter == 'm' else 'L')
+            else:
+                commands.append(letter)
+        values.extend(numbers[:segment_count * arg_count])
+
+    return commands, np.asarray(values, dtype=float)
+
+
+def _slot_masks(commands):
+    """Build per-argument x/y slot masks and segment index arrays."""
+    import numpy as np
+    x_slots = []
+    y_slots = []
+    owners = []
+    for index, command in enumerate(commands):
+        upper = command.upper()
+        x_slots.extend(X_SLOTS[upper])
+        y_slots.extend(Y_SLOTS[upper])
+        owners.extend([index] * COMMAND_ARGS[upper])
+    return (np.asarray(x_slots, dtype=bool), np.asarray(y_slots, dtype=bool),
+            np.asarray(owners, dtype=int))
+
+
+def _segment_endpoints(commands, values, starts_x, starts_y, absolute):
+    """
+    Walk the segments once to find each segment's start point.
+
+    Only scalar endpoint bookkeeping happens here; the per-argument work is
+    done on whole arrays by the callers.
+    """
+    cursor = 0
+    x = y = 0.0
+    subpath_x = subpath_y = 0.0
+
+    for index, command in enumerate(commands):
+        upper = command.upper()
+        relative = not absolute and command.islower() and index > 0
+        starts_x[index] = x
+        starts_y[index] = y
+        arg_count = COMMAND_ARGS[upper]
+        args = values[cursor:cursor + arg_count]
+        cursor += arg_count
+
+        if upper == 'Z':
+            x, y = subpath_x, subpath_y
+            continue
+        if upper == 'H':
+            x = args[0] + x if relative else args[0]
+        elif upper == 'V':
+            y = args[0] + y if relative else args[0]
+        else:
+            end_x, end_y = args[-2], args[-1]
+            x, y = (x + end_x, y + end_y) if relative else (end_x, end_y)
+        if upper == 'M':
+            subpath_x, subpath_y = x, y
+
+
+def to_absolute(commands, values):
+    """
+    Convert all segment arguments to absolute coordinates.
+
+    Args:
+        commands (list): Segment commands from parse_path_data
+        values (ndarray): Segment arguments from parse_path_data
+
+    Returns:
+        tuple: (upper_commands, absolute_values, starts_x, starts_y)
+    """
+    import numpy as np
+    starts_x = np.zeros(len(commands))
+    starts_y = np.zeros(len(commands))
+    _segment_endpoints(commands, values, starts_x, starts_y, absolute=False)
+
+    x_mask, y_mask, owners = _slot_masks(commands)
+    relative = np.array([c.islower() and i > 0 for i, c in enumerate(commands)], dtype=bool)
+    relative_args = relative[owners] if len(owners) else np.zeros(0, dtype=bool)
+
+    absolute_values = values.copy()
+    shift_x = relative_args & x_mask
+    shift_y = relative_args & y_mask
+    absolute_values[shift_x] += starts_x[owners[shift_x]]
+    absolute_values[shift_y] += starts_y[owners[shift_y]]
+
+    return [c.upper() for c in commands], absolute_values, starts_x, starts_y
+
+# =============================================================================
+# NUMBER FORMATTING
+# =============================================================================
+
+def format_number(value, precision):
+    """Format a number in its shortest SVG form (no leading zero, no trailing zeros)."""
+    text = f"{value:.{precision}f}"
+    if precision > 0:
+        text = text.rstrip('0').rstrip('.')
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    if text in ('-0', '', '-'):
+        text = '0'
+    return text
+
+
+def _join_numbers(numbers, previous=None):
+    """Join formatted numbers using a separator only where the grammar needs one."""
+    parts = []
+    for number in numbers:
+        if previous is not None and not number.startswith('-'):
+            if not (number.startswith('.') and ('.' in previous or 'e' in previous)):
+                parts.append(' ')
+        parts.append(number)
+        previous = number
+    return ''.join(parts)
+
+# =============================================================================
+# CORE OPTIMIZATION
+# =============================================================================
+
+def optimize_path_data(d, precision=3):
+    """
+    Rewrite path data in a shorter, quantized form.
+
+    Args:
+        d (str): Original SVG path data
+        precision (int): Number of decimals kept for every coordinate
+
+    Returns:
+        str: Optimized path data
+    """
+    import numpy as np
+    commands, values = parse_path_data(d)
+    if not commands:
+        return d.strip()
+
+    upper, absolute_values, _, _ = to_absolute(commands, values)
+    quantized = np.round(absolute_values, precision)
+
+    # Start points derived from the quantized geometry, so relative values
+    # are exact differences of already-rounded absolute coordinates
+    starts_x = np.zeros(len(upper))
+    starts_y = np.zeros(len(upper))
+    _segment_endpoints(upper, quantized, starts_x, starts_y, absolute=True)
+
+    x_mask, y_mask, owners = _slot_masks(upper)
+    relative_values = quantized.copy()
+    relative_values[x_mask] -= starts_x[owners[x_mask]]
+    relative_values[y_mask] -= starts_y[owners[y_mask]]
+    relative_values = np.round(relative_values, precision)
+
+    offsets = np.concatenate(([0], np.cumsum([COMMAND_ARGS[c] for c in upper])))
+
+    output = []
+    last_letter = None
+    last_number = None
+    for index, command in enumerate(upper):
+        absolute_args = quantized[offsets[index]:offsets[index + 1]]
+        relative_args = relative_values[offsets[index]:offsets[index + 1]]
+        next_command = upper[index + 1] if index + 1 < len(upper) else None
+
+        if command in ('L', 'H', 'V'):
+            dx = relative_args[0] if command != 'V' else 0.0
+            dy = relative_args[-1] if command != 'H' else 0.0
+            # Zero-length lines draw nothing, unless a following smooth
+            # curve would reflect a different control point without them
+            if dx == 0 and dy == 0 and next_command not in ('S', 'T'):
+                continue
+            if command == 'L' and dy == 0:
+                command, absolute_args, relative_args = 'H', absolute_args[:1], relative_args[:1]
+            elif command == 'L' and dx == 0:
+                command, absolute_args, relative_args = 'V', absolute_args[1:], relative_args[1:]
+
+        if command == 'Z':
+            letter, numbers = 'z', []
+        else:
+            absolute_numbers = [format_number(v, precision) for v in absolute_args]
+            relative_numbers = [format_number(v, precision) for v in relative_args]
+            if command == 'A':
+                # Flags are not coordinates: keep them as bare 0/1 digits
+                flags = [str(int(v)) for v in absolute_args[3:5]]
+                absolute_numbers[3:5] = flags
+                relative_numbers[3:5] = flags
+            if index == 0 or len(_join_numbers(absolute_numbers)) < len(_join_numbers(relative_numbers)):
+                letter, numbers = command, absolute_numbers
+            else:
+                letter, numbers = command.lower(), relative_numbers
+
+        # Repeated commands may omit their letter, and a lineto directly
+        # after a moveto of the same case is implied by the moveto
+        implicit = numbers and (
+            (letter == last_letter and letter not in ('M', 'm'))
+            or (last_letter, letter) in (('M', 'L'), ('m', 'l'))
+        )
+        if implicit:
+            output.append(_join_numbers(numbers, previous=last_number))
+        else:
+            output.append(letter + _join_numbers(numbers))
+            last_letter = letter
+        last_number = numbers[-1] if numbers else None
+
+    return ''.join(output)
+
+# =============================================================================
+# GEOMETRIC TOLERANCE CHECK
+# =============================================================================
+
+def _canonical_segments(d):
+    """
+    Normalize path data for geometric comparison.
+
+    All segments become absolute; H/V become L and S/T become C/Q with their
+    reflected control points. Lines also carry their length so that
+    vanishing segments can be recognized.
+    """
+    import numpy as np
+    commands, values = parse_path_data(d)
+    if not commands:
+        return []
+
+    upper, absolute_values, starts_x, starts_y = to_absolute(commands, values)
+    offsets = np.concatenate(([0], np.cumsum([COMMAND_ARGS[c] for c in upper])))
+
+    segments = []
+    previous_control = None
+    previous_command = None
+    subpath_start = (0.0, 0.0)
+
+    for index, command in enumerate(upper):
+        args = absolute_values[offsets[index]:offsets[index + 1]]
+        x0, y0 = starts_x[index], starts_y[index]
+
+        if command == 'H':
+            command, args = 'L', np.array([args[0], y0])
+        elif command == 'V':
+            command, args = 'L', np.array([x0, args[0]])
+        elif command in ('S', 'T'):
+            if previous_control is not None and previous_command in (('C', 'S') if command == 'S' else ('Q', 'T')):
+                reflected = (2 * x0 - previous_control[0], 2 * y0 - previous_control[1])
+            else:
+                reflected = (x0, y0)
+            command, args = ('C' if command == 'S' else 'Q'), np.concatenate((reflected, args))
+
+        if command == 'M':
+            subpath_start = (args[0], args[1])
+        elif command == 'Z':
+            args = np.array(subpath_start)
+
+        if command in ('C', 'Q'):
+            previous_control = (args[-4], args[-3])
+        else:
+            previous_control = None
+        previous_command = upper[index]
+
+        length = float(np.hypot(args[0] - x0, args[1] - y0)) if command == 'L' else None
+        segments.append((command, args, length))
+
+    return segments
+
+
+def path_deviation(original_d, optimized_d, tolerance=1e-3):
+    """
+    Measure the geometric deviation between two path data strings.
+
+    Lines no longer than the tolerance may vanish on either side: they are
+    set aside on both sides before the remaining segments are matched in
+    order, and their length counts as deviation. Pairing by command letter
+    alone would match a dropped zero-length line against the next line and
+    reject the whole path.
+
+    Args:
+        original_d (str): Reference path data
+        optimized_d (str): Rewritten path data
+        tolerance (float): Longest line that may vanish on either side
+
+    Returns:
+        float: Largest absolute coordinate difference between matching
+               control points, or infinity if the segment structure differs
+
+    Examples:
+        >>> path_deviation("M 0 0 L 0 0 L 5 5", "M0 0l5 5")
+        0.0
+        >>> path_deviation("M10 10 L10.0001 10 L20 20", "M10 10l10 10") <= 1e-3
+        True
+        >>> path_deviation("M0 0 L5 5", "M0 0 L5 5 L6 6")
+        inf
+    """
+    import numpy as np
+    original = _canonical_segments(original_d)
+    optimized = _canonical_segments(optimized_d)
+
+    def drawn(segments):
+        kept = []
+        vanished = 0.0
+        for command, args, length in segments:
+            if length is not None and length <= tolerance:
+                vanished = max(vanished, length)
+            else:
+                kept.append((command, args))
+        return kept, vanished
+
+    original, original_vanished = drawn(original)
+    optimized, optimized_vanished = drawn(optimized)
+    deviation = max(original_vanished, optimized_vanished)
+
+    if len(original) != len(optimized):
+        return float('inf')
+    if any(a[0] != b[0] for a, b in zip(original, optimized)):
+        return float('inf')
+
+    if original:
+        original_points = np.concatenate([args for _, args in original])
+        optimized_points = np.concatenate([args for _, args in optimized])
+        if len(original_points):
+            deviation = max(deviation, float(np.max(np.abs(original_points - optimized_points))))
+    return deviation
+
+# =============================================================================
+# SVG DOCUMENT PROCESSING
+# =============================================================================
+
+def optimize_svg_path_data(svg_content, precision=3, tolerance=None):
+    """
+    Optimize the `d` attribute of every path in an SVG document.
+
+    Args:
+        svg_content (str): Original SVG content as string
+        precision (int): Number of decimals kept for coordinates
+        tolerance (float, optional): Maximum allowed geometric deviation,
+                                     defaults to two units of the last decimal
+                                     (reflected S/T control points inherit
+                                     the rounding error of two points)
+
+    Returns:
+        tuple: (modified_svg_string, summary_message)
+    """
+    if tolerance is None:
+        tolerance = 2 * 10.0 ** -precision
+
+    print("   🔍 Parsing SVG structure...")
+    try:
+        svg_root = ET.fromstring(svg_content)
+    except ET.ParseError as parse_error:
+        error_message = f"SVG parsing failed: {parse_error}"
+        print(f"   ❌ {error_message}")
+        return svg_content, error_message
+
+    print(f"   📐 Optimizing path data (precision {precision}, tolerance {tolerance:g})...")
+
+    path_count = 0
+    rejected_count = 0
+    original_bytes = 0
+    optimized_bytes = 0
+
+    for element in svg_root.iter():
+        if not (element.tag == 'path' or element.tag.endswith('}path')):
+            continue
+        d = element.get('d')
+        if not d:
+            continue
+
+        path_count += 1
+        optimized_d = optimize_path_data(d, precision)
+
+        if path_deviation(d, optimized_d, tolerance) > tolerance:
+            rejected_count += 1
+            optimized_d = d
+        element.set('d', optimized_d)
+
+        original_bytes += len(d)
+        optimized_bytes += len(optimized_d)
+
+    summary = (f"Optimized {path_count} path(s): d attributes {original_bytes:,} → "
+               f"{optimized_bytes:,} bytes, {rejected_count} kept unchanged (tolerance)")
+    print(f"   ✅ {summary}")
+
+    print("   📝 Serializing modified SVG...")
+    xml_string = ET.tostring(svg_root, encoding='unicode', xml_declaration=False)
+    # ElementTree writes empty elements as `<path ... />`; the space costs a
+    # byte per element, more than compaction saves on already optimized input
+    xml_string = xml_string.replace(' />', '/>')
+
+    # Preserve original XML declaration if present
+    if svg_content.strip().startswith('<?xml'):
+        xml_string = '<?xml version="1.0" encoding="UTF-8"?>\n' + xml_string
+
+    return xml_string, summary
+
+# =============================================================================
+# FILE PROCESSING INTERFACE
+# =============================================================================
+
+def process_svg_file(input_path, output_path=None, precision=3, tolerance=None):
+    """
+    Optimize path data in a single SVG file.
+
+    Args:
+        input_path (str): Path to input SVG file
+        output_path (str, optional): Path for output. If None, creates input_paths.svg
+        precision (int): Number of decimals kept for coordinates
+        tolerance (float, optional): Maximum allowed geometric deviation
+
+    Returns:
+        bool: True if processing succeeded, False otherwise
+    """
+    input_file = Path(input_path)
+
+    if not input_file.exists():
+        print(f"❌ Error: Input file '{input_path}' does not exist")
+        return False
+
+    print(f"🎼 Processing: {input_path}")
+
+    try:
+        PHASES.start("read")
+        print("   📖 Reading SVG file...")
+        original_svg_content = input_file.read_text(encoding='utf-8')
+
+        PHASES.start("transform")
+        modified_svg_content, summary = optimize_svg_path_data(original_svg_content, precision, tolerance)
+
+        output_file = Path(output_path) if output_path else input_file.parent / f"{input_file.stem}_paths.svg"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        PHASES.start("write")
+        print(f"   💾 Writing optimized SVG...")
+        write_if_changed(output_file, modified_svg_content)
+        PHASES.end()
+
+        original_size = input_file.stat().st_size
+        optimized_size = output_file.stat().st_size
+        reduction = ((original_size - optimized_size) / original_size) * 100 if original_size else 0
+
+        print(f"✅ Success: {output_file}")
+        print(f"   📊 {summary}")
+        print(f"   📏 Size: {original_size:,} → {optimized_size:,} bytes ({reduction:.1f}% reduction)")
+        return True
+
+    except Exception as processing_error:
+        print(f"❌ Error processing '{input_path}': {processing_error}")
+        return False
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main():
+    """Main function handling command line arguments."""
+
+    parser = argparse.ArgumentParser(
+        description='Optimize SVG path data without Node/SVGO',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python svg_optimize_path_data.py score.svg output.svg       # Specific output file
+  python svg_optimize_path_data.py score.svg                  # Creates score_paths.svg
+  python svg_optimize_path_data.py score.svg -p 2 -t 0.01     # Coarser quantization
+        """
+    )
+
+    parser.add_argument('input_file', help='Input SVG file')
+    parser.add_argument('output_file', nargs='?', help='Output SVG file')
+    parser.add_argument('-p', '--precision', type=int, default=3,
+                        help='Decimals kept for coordinates (default: 3)')
+    parser.add_argument('-t', '--tolerance', type=float, default=None,
+                        help='Maximum geometric deviation (default: 2 * 10^-precision)')
+
+    args = parser.parse_args()
+
+    print("🚀 SVG Path Data Optimization")
+    print("=" * 45)
+
+    success = process_svg_file(args.input_file, args.output_file, args.precision, args.tolerance)
+    return 0 if success else 1
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+
+if __name__ == '__main__':
+    startup_profile()
+    sys.exit(main())
@@ -34,6 +34,11 @@ import sys
 import argparse
 from pathlib import Path
 
+from atomic_output import write_if_changed
+from pipeline_trace import Phases, startup_profile
+
+PHASES = Phases("svg_prepare_for_swell")
+
 # =============================================================================
 # SVG NAMESPACE CONFIGURATION
 # =============================================================================
@@ -231,11 +236,13 @@ def process_svg_file(input_path, output_path=None):
         # FILE LOADING AND PROCESSING
         # =============================================================
         
+        PHASES.start("read")
         print("   📖 Reading SVG file...")
         with open(input_file, 'r', encoding='utf-8') as file_handle:
             original_svg_content = file_handle.read()
         
         # Apply transformations
+        PHASES.start("transform")
         modified_svg_content, transformation_summary = modify_svg_paths(original_svg_content)
         
         # =============================================================
@@ -255,9 +262,10 @@ def process_svg_file(input_path, output_path=None):
         # FILE WRITING
         # =============================================================
         
+        PHASES.start("write")
         print(f"   💾 Writing transformed SVG...")
-        with open(output_file, 'w', encoding='utf-8') as output_handle:
-            output_handle.write(modified_svg_content)
+        write_if_changed(output_file, modified_svg_content)
+        PHASES.end()
         
         print(f"✅ Success: {output_file}")
         print(f"   📊 {transformation_summary}")
@@ -342,4 +350,5 @@ Examples:
 # =============================================================================
 
 if __name__ == '__main__':
+    startup_profile()
     sys.exit(main())
\ No newline at end of file
@@ -30,6 +30,11 @@ This creates cleaner SVG files optimized for musical score interaction.
 from xml.etree import ElementTree as ET
 from pathlib import Path
 
+from atomic_output import AtomicOutput
+from pipeline_trace import Phases, startup_profile
+
+PHASES = Phases("svg_remove_hrefs_in_tabs")
+
 # =============================================================================
 # XML NAMESPACE CONFIGURATION
 # =============================================================================
@@ -89,6 +94,7 @@ def remove_href_from_tab_links(input_path: Path, output_path: Path):
     # =================================================================
     
     try:
+        PHASES.start("parse")
         print("   📖 Loading SVG file...")
         svg_tree = ET.parse(input_path)
         svg_root = svg_tree.getroot()
@@ -104,6 +110,7 @@ def remove_href_from_tab_links(input_path: Path, output_path: Path):
     # NAMESPACE CLEANUP: CONVERT xlink:href TO href
     # =================================================================
     
+    PHASES.start("transform")
     print("   🔧 Converting legacy xlink:href to modern href...")
     
     xlink_conversion_count = 0
@@ -166,15 +173,18 @@ def remove_href_from_tab_links(input_path: Path, output_path: Path):
     # CLEANED SVG OUTPUT
     # =================================================================
     
+    PHASES.start("serialize")
     print(f"   💾 Writing cleaned SVG to: {output_path.name}")
     
     try:
         # Write cleaned SVG with proper XML declaration and encoding
-        svg_tree.write(
-            output_path, 
-            encoding="utf-8", 
-            xml_declaration=True
-        )
+        with AtomicOutput(output_path, "wb") as output_handle:
+            svg_tree.write(
+                output_handle, 
+                encoding="utf-8", 
+                xml_declaration=True
+            )
+        PHASES.end()
         
         # Calculate file size change for reporting
         original_size = input_path.stat().st_size
@@ -348,4 +358,5 @@ def main():
 # =============================================================================
 
 if __name__ == "__main__":
+    startup_profile()
     exit_code = main()
\ No newline at end of file
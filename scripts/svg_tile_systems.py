@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+svg_tile_systems.py
+
+Per-System SVG Tiling
+=====================
+
+The exported score is one tall SVG holding every system, so the browser
+parses and lays out all of it before the first paint. This script splits
+it into one tile per system (or per N systems) that a player can load
+lazily as tiles scroll into view:
+
+  tiles/
+    defs.svg        shared <defs> (the glyph symbols of svg_dedupe_glyphs.py),
+                    inlined once into the page
+    tile_01.svg     systems 1..N, viewBox cropped to their y-range
+    tile_02.svg     ...
+    manifest.json   per tile: file, drawn y-range, cut, bar range and href set
+
+Systems are found from the drawing itself:
+
+1. Staff lines are horizontal strokes spanning at least half the page;
+   lines closer than MAX_STAFF_LINE_GAP form one staff.
+2. Staves drawn in the same bar (overlapping the same data-bar highlight)
+   belong to one system, e.g. the notation staff and its tablature.
+3. Tiles are cut halfway between the systems, and every top-level element
+   goes to the tile containing its vertical center. Groups straddling a
+   cut are split, with a copy of the group around each part. A tile's
+   viewBox is widened to the elements placed in it (manifest "y"), so
+   tiles may overlap slightly; "cut" is the tile's share of the page.
+
+Tiles keep the elements unchanged - hrefs, data-bar attributes and symbol
+references (#g0 ...) stay globally consistent - so highlighting works the
+same across tiles. The manifest lists hrefs the way
+exports/bwv1006_json_notes.json does (without the textedit:///work/ prefix).
+
+Usage:
+    python svg_tile_systems.py input.svg [output_dir]
+    python svg_tile_systems.py input.svg            # Creates input_tiles/
+    python svg_tile_systems.py input.svg tiles --systems-per-tile 2
+"""
+
+import argparse
+import bisect
+import copy
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from atomic_output import write_if_changed
+from pipeline_trace import Phases, startup_profile
+from svg_optimize_path_data import COMMAND_ARGS, Y_SLOTS, format_number, parse_path_data, to_absolute
+
+PHASES = Phases("svg_tile_systems")
+
+# =============================================================================
+# SVG NAMESPACE CONFIGURATION
+# =============================================================================
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+# Register XML namespaces to prevent ns0: prefixes in output
+ET.register_namespace('', SVG_NAMESPACE)
+ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+
+# Staff lines span at least this fraction of the page width
+MIN_STAFF_LINE_FRACTION = 0.5
+
+# Adjacent lines of one staff are at most this far apart (staff units)
+MAX_STAFF_LINE_GAP = 2.0
+
+# A staff has at least this many lines (5 for notation, 6 for tablature)
+MIN_STAFF_LINES = 4
+
+# Elements that are not drawn; they are copied to every tile (style) or
+# moved to the shared defs file (defs)
+NON_DRAWING = ('defs', 'style', 'metadata', 'title', 'desc')
+
+# Decimals written for tile coordinates
+PRECISION = 4
+
+_TRANSFORM = re.compile(r"([a-zA-Z]+)\s*\(([^)]*)\)")
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+# =============================================================================
+# GEOMETRY
+# =============================================================================
+
+def local_name(tag):
+    """Strip the namespace from an element tag."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def vertical_transform(transform):
+    """
+    Reduce a transform attribute to its effect on y.
+
+    Returns:
+        tuple or None: (scale_y, offset_y) with y' = scale_y * y + offset_y,
+                       or None if y' also depends on x (rotation, skew)
+    """
+    scale, offset = 1.0, 0.0
+    for name, arguments in _TRANSFORM.findall(transform or ''):
+        values = [float(v) for v in _NUMBER.findall(arguments)]
+        if name == 'translate' and values:
+            s, t = 1.0, values[1] if len(values) > 1 else 0.0
+        elif name == 'scale' and values:
+            s, t = values[1] if len(values) > 1 else values[0], 0.0
+        elif name == 'matrix' and len(values) == 6 and values[1] == 0:
+            s, t = values[3], values[5]
+        else:
+            return None
+        # The rightmost transform applies first
+        scale, offset = scale * s, scale * t + offset
+    return scale, offset
+
+
+def path_segments(d):
+    """
+    Absolute y coordinates and horizontal runs of path data.
+
+    Returns:
+        tuple: (ys, runs) - every y coordinate of the path (control points
+               included) and (y, length) for each horizontal segment
+    """
+    commands, values = parse_path_data(d)
+    if not commands:
+        return [], []
+    upper, absolute, starts_x, starts_y = to_absolute(commands, values)
+    absolute, starts_x, starts_y = absolute.tolist(), starts_x.tolist(), starts_y.tolist()
+
+    ys = starts_y[1:]  # The first segment starts at the origin, not on the path
+    runs = []
+    cursor = 0
+    for index, command in enumerate(upper):
+        arguments = absolute[cursor:cursor + COMMAND_ARGS[command]]
+        cursor += COMMAND_ARGS[command]
+        ys.extend(value for value, is_y in zip(arguments, Y_SLOTS[command]) if is_y)
+        if command == 'H':
+            runs.append((starts_y[index], abs(arguments[0] - starts_x[index])))
+        elif command == 'L' and arguments[1] == starts_y[index]:
+            runs.append((starts_y[index], abs(arguments[0] - starts_x[index])))
+    return ys, runs
+
+
+def number(element, name, default=0.0):
+    try:
+        return float(element.get(name, default))
+    except ValueError:
+        return default
+
+
+def own_extent(element, symbols, cache):
+    """
+    Vertical extent of an element in its own coordinates (before its transform).
+
+    Returns:
+        tuple or None: (top, bottom), or None for elements without geometry
+    """
+    name = local_name(element.tag)
+    if name == 'path':
+        ys, _ = path_segments(element.get('d', ''))
+        return (min(ys), max(ys)) if ys else None
+    if name in ('rect', 'image'):
+        y = number(element, 'y')
+        return y, y + number(element, 'height')
+    if name == 'line':
+        y1, y2 = number(element, 'y1'), number(element, 'y2')
+        return min(y1, y2), max(y1, y2)
+    if name in ('circle', 'ellipse'):
+        cy = number(element, 'cy')
+        radius = number(element, 'r' if name == 'circle' else 'ry')
+        return cy - radius, cy + radius
+    if name in ('polyline', 'polygon'):
+        ys = [float(v) for v in _NUMBER.findall(element.get('points', ''))[1::2]]
+        return (min(ys), max(ys)) if ys else None
+    if name == 'text':
+        y = number(element, 'y')
+        size = number(element, 'font-size', 2.0)
+        return y - size, y + 0.3 * size
+    if name == 'use':
+        href = element.get('href') or element.get(XLINK_HREF) or ''
+        target = symbols.get(href.lstrip('#'))
+        extent = element_extent(target, symbols, cache) if target is not None else None
+        if extent is None:
+            return None
+        y = number(element, 'y')
+        return extent[0] + y, extent[1] + y
+
+    extents = [element_extent(child, symbols, cache) for child in element]
+    extents = [extent for extent in extents if extent is not None]
+    if not extents:
+        return None
+    return min(top for top, _ in extents), max(bottom for _, bottom in extents)
+
+
+def element_extent(element, symbols, cache):
+    """Vertical extent of an element in its parent's coordinates (memoized)."""
+    key = id(element)
+    if key not in cache:
+        extent = None
+        if local_name(element.tag) not in NON_DRAWING:
+            transform = vertical_transform(element.get('transform'))
+            inner = own_extent(element, symbols, cache)
+            if transform is not None and inner is not None:
+                scale, offset = transform
+                top, bottom = sorted((scale * inner[0] + offset, scale * inner[1] + offset))
+                extent = (top, bottom)
+        cache[key] = extent
+    return cache[key]
+
+
+def iter_drawn(element, scale=1.0, offset=0.0):
+    """
+    Yield (element, scale_y, offset_y) for every drawn element below `element`.
+
+    scale_y/offset_y map the element's own coordinates to the root's; <defs>
+    and subtrees with rotations are skipped.
+    """
+    for child in element:
+        if local_name(child.tag) in NON_DRAWING:
+            continue
+        transform = vertical_transform(child.get('transform'))
+        if transform is None:
+            continue
+        child_scale, child_offset = scale * transform[0], scale * transform[1] + offset
+        yield child, child_scale, child_offset
+        yield from iter_drawn(child, child_scale, child_offset)
+
+# =============================================================================
+# SYSTEM DETECTION
+# =============================================================================
+
+def find_staff_lines(root, page_width):
+    """y coordinates (root coordinates) of all horizontal strokes spanning the page."""
+    min_length = MIN_STAFF_LINE_FRACTION * page_width
+    lines = []
+    for element, scale, offset in iter_drawn(root):
+        name = local_name(element.tag)
+        if name == 'path':
+            _, runs = path_segments(element.get('d', ''))
+            lines.extend(scale * y + offset for y, length in runs if length >= min_length)
+        elif name == 'line':
+            if (number(element, 'y1') == number(element, 'y2')
+                    and abs(number(element, 'x2') - number(element, 'x1')) >= min_length):
+                lines.append(scale * number(element, 'y1') + offset)
+        elif name == 'rect':
+            if number(element, 'width') >= min_length and number(element, 'height') < 0.5:
+                lines.append(scale * (number(element, 'y') + number(element, 'height') / 2) + offset)
+    return sorted(lines)
+
+
+def group_staves(lines):
+    """Group sorted staff line positions into staves: [(top, bottom), ...]."""
+    staves = []
+    group = []
+    for y in lines:
+        if group and y - group[-1] > MAX_STAFF_LINE_GAP:
+            if len(group) >= MIN_STAFF_LINES:
+                staves.append((group[0], group[-1]))
+            group = []
+        # Coinciding lines (a staff drawn twice) count once
+        if not group or y - group[-1] > 1e-6:
+            group.append(y)
+    if len(group) >= MIN_STAFF_LINES:
+        staves.append((group[0], group[-1]))
+    return staves
+
+
+def find_systems(root, staves, symbols, cache):
+    """
+    Join staves sharing a bar highlight into systems.
+
+    Returns:
+        list: [{'top', 'bottom', 'bars': set of bar numbers}, ...] sorted by top
+    """
+    owner = list(range(len(staves)))  # Union-find over staves
+
+    def find(i):
+        while owner[i] != i:
+            owner[i] = owner[owner[i]]
+            i = owner[i]
+        return i
+
+    # Staves touched by each bar's highlights (one rect per staff, or one merged path)
+    staves_of_bar = {}
+    for element, scale, offset in iter_drawn(root):
+        bar = element.get('data-bar')
+        if bar is None or not bar.isdigit():
+            continue
+        inner = own_extent(element, symbols, cache)
+        if inner is None:
+            continue
+        top, bottom = sorted((scale * inner[0] + offset, scale * inner[1] + offset))
+        staves_of_bar.setdefault(int(bar), set()).update(
+            i for i, (staff_top, staff_bottom) in enumerate(staves) if top <= staff_bottom and bottom >= staff_top)
+
+    bars_of = {}
+    for bar, touched in staves_of_bar.items():
+        touched = sorted(touched)
+        for i in touched[1:]:
+            owner[find(i)] = find(touched[0])
+        for i in touched:
+            bars_of.setdefault(i, set()).add(bar)
+
+    systems = {}
+    for i, (top, bottom) in enumerate(staves):
+        system = systems.setdefault(find(i), {'top': top, 'bottom': bottom, 'bars': set()})
+        system['top'] = min(system['top'], top)
+        system['bottom'] = max(system['bottom'], bottom)
+        system['bars'] |= bars_of.get(i, set())
+
+    # Staves without highlights lying between the staves of a system (an
+    # unhighlighted voice staff) join that system
+    merged = []
+    for system in sorted(systems.values(), key=lambda system: system['top']):
+        if merged and system['top'] <= merged[-1]['bottom']:
+            merged[-1]['bottom'] = max(merged[-1]['bottom'], system['bottom'])
+            merged[-1]['bars'] |= system['bars']
+        else:
+            merged.append(system)
+    return merged
+
+# =============================================================================
+# TILING
+# =============================================================================
+
+def parse_view_box(svg_root):
+    """viewBox as [x, y, width, height], falling back to width/height."""
+    values = [float(v) for v in _NUMBER.findall(svg_root.get('viewBox', ''))]
+    if len(values) == 4:
+        return values
+    return [0.0, 0.0, number(svg_root, 'width'), number(svg_root, 'height')]
+
+
+def scale_length(length, factor):
+    """Scale an SVG length attribute ("6601.172", "270mm") by factor."""
+    match = re.match(r"^\s*([-+\d.eE]+)(.*)$", length or '')
+    if not match:
+        return length
+    return f"{format_number(float(match.group(1)) * factor, PRECISION)}{match.group(2).strip()}"
+
+
+def normalize_href(href):
+    """Strip LilyPond editor prefixes, as the alignment step does for notes"""
+    return href.replace("textedit://", "").replace("/work/", "")
+
+
+def tile_svg(svg_content, systems_per_tile=1):
+    """
+    Split an SVG score into per-system tiles.
+
+    Args:
+        svg_content (str): SVG content as string
+        systems_per_tile (int): Consecutive systems per tile
+
+    Returns:
+        tuple: (tiles, defs_svg, report)
+               - tiles: [(svg_string, info), ...] with info keys y, systems,
+                 bars, hrefs, elements
+               - defs_svg: shared defs document as string, or None
+               - report: counts for the summary
+    """
+    PHASES.start("parse")
+    print("   🔍 Parsing SVG structure...")
+    svg_root = ET.fromstring(svg_content)
+    ns = f"{{{SVG_NAMESPACE}}}" if svg_root.tag.startswith('{') else ''
+
+    symbols = {element.get('id'): element for element in svg_root.iter() if element.get('id')}
+    cache = {}
+    view_x, view_y, view_width, view_height = parse_view_box(svg_root)
+
+    PHASES.start("systems")
+    print("   🎼 Finding staves and systems...")
+    staves = group_staves(find_staff_lines(svg_root, view_width))
+    systems = find_systems(svg_root, staves, symbols, cache)
+    print(f"   📊 {len(staves)} staves in {len(systems)} systems")
+    if not systems:
+        systems = [{'top': view_y, 'bottom': view_y + view_height, 'bars': set()}]
+        print("   ⚠️  No staves found - writing a single tile")
+
+    groups = [systems[i:i + systems_per_tile] for i in range(0, len(systems), systems_per_tile)]
+    cuts = [(previous[-1]['bottom'] + following[0]['top']) / 2 for previous, following in zip(groups, groups[1:])]
+    bounds = [view_y] + cuts + [view_y + view_height]
+
+    # =================================================================
+    # DISTRIBUTE ELEMENTS
+    # =================================================================
+
+    PHASES.start("distribute")
+    print("   ✂️  Distributing elements over tiles...")
+
+    tile_roots = [ET.Element(svg_root.tag, dict(svg_root.attrib)) for _ in groups]
+    # Drawn y-range per tile: its share of the page, widened to the elements placed in it
+    extents = [[bounds[index], bounds[index + 1]] for index in range(len(groups))]
+
+    defs = []
+    report = {'split_groups': 0, 'unplaced': 0, 'straddling': 0}
+    last_tile = 0
+
+    def tile_of(y):
+        return bisect.bisect_right(cuts, y)
+
+    def place(element, scale, offset, parent_for_tile):
+        nonlocal last_tile
+        extent = element_extent(element, symbols, cache)
+        if extent is None:
+            report['unplaced'] += 1
+            parent_for_tile(last_tile).append(element)
+            return
+        top, bottom = sorted((scale * extent[0] + offset, scale * extent[1] + offset))
+        first, last = tile_of(top), tile_of(bottom)
+
+        is_plain_group = (local_name(element.tag) == 'g' and element.get('data-bar') is None
+                          and element.get('href') is None and element.get(XLINK_HREF) is None)
+        if first != last and is_plain_group:
+            # Split the group: each tile gets a copy of it around its share of the children
+            report['split_groups'] += 1
+            transform = vertical_transform(element.get('transform'))
+            inner_scale, inner_offset = scale * transform[0], scale * transform[1] + offset
+            shells = {}
+
+            def shell_for_tile(index):
+                if index not in shells:
+                    attributes = dict(element.attrib)
+                    if shells:
+                        attributes.pop('id', None)  # ids stay unique across tiles
+                    shells[index] = ET.SubElement(parent_for_tile(index), element.tag, attributes)
+                return shells[index]
+
+            for child in list(element):
+                place(child, inner_scale, inner_offset, shell_for_tile)
+            return
+
+        if first != last:
+            report['straddling'] += 1
+        last_tile = tile_of((top + bottom) / 2)
+        parent_for_tile(last_tile).append(element)
+        extents[last_tile][0] = min(extents[last_tile][0], top)
+        extents[last_tile][1] = max(extents[last_tile][1], bottom)
+
+    for child in list(svg_root):
+        name = local_name(child.tag)
+        if name == 'defs':
+            defs.append(child)
+        elif name in NON_DRAWING:
+            for tile_root in tile_roots:
+                tile_root.append(copy.deepcopy(child))
+        else:
+            place(child, 1.0, 0.0, lambda index: tile_roots[index])
+
+    # Elements straddling a cut would be clipped at a viewBox cut exactly
+    # there; elements without measurable geometry are kept visible too
+    for tile_root, (top, bottom) in zip(tile_roots, extents):
+        tile_root.set('viewBox', " ".join(format_number(v, PRECISION) for v in (view_x, top, view_width, bottom - top)))
+        if 'height' in tile_root.attrib:
+            tile_root.set('height', scale_length(tile_root.get('height'), (bottom - top) / view_height))
+        tile_root.set('overflow', 'visible')
+
+    # =================================================================
+    # SERIALIZE
+    # =================================================================
+
+    PHASES.start("serialize")
+    print("   📝 Serializing tiles...")
+    tiles = []
+    for index, tile_root in enumerate(tile_roots):
+        hrefs = []
+        bars = set()
+        for element in tile_root.iter():
+            href = element.get('href') or element.get(XLINK_HREF)
+            if href and 'textedit://' in href:
+                hrefs.append(normalize_href(href))
+            bar = element.get('data-bar')
+            if bar is not None and bar.isdigit():
+                bars.add(int(bar))
+        bars |= set().union(*(system['bars'] for system in groups[index]))
+        info = {
+            'y': [round(extents[index][0], PRECISION), round(extents[index][1], PRECISION)],
+            'cut': [round(bounds[index], PRECISION), round(bounds[index + 1], PRECISION)],
+            'systems': len(groups[index]),
+            'bars': [min(bars), max(bars)] if bars else None,
+            'hrefs': list(dict.fromkeys(hrefs)),
+            'elements': sum(1 for _ in tile_root.iter()) - 1,
+        }
+        tiles.append((ET.tostring(tile_root, encoding='unicode'), info))
+
+    defs_svg = None
+    if defs:
+        defs_root = ET.Element(f"{ns}svg", {'width': '0', 'height': '0', 'style': 'position:absolute',
+                                            'aria-hidden': 'true'})
+        defs_root.extend(defs)
+        defs_svg = ET.tostring(defs_root, encoding='unicode')
+    PHASES.end()
+
+    report.update({
+        'staves': len(staves),
+        'systems': len(systems),
+        'tiles': len(tiles),
+        'symbols': sum(1 for d in defs for _ in d),
+        'view_box': [view_x, view_y, view_width, view_height],
+    })
+    return tiles, defs_svg, report
+
+# =============================================================================
+# FILE PROCESSING INTERFACE
+# =============================================================================
+
+def process_svg_file(input_path, output_dir=None, systems_per_tile=1):
+    """
+    Tile one SVG file and write the tiles, shared defs and manifest.
+
+    Args:
+        input_path (str): Path to input SVG file
+        output_dir (str, optional): Output directory. If None, creates input_tiles/
+        systems_per_tile (int): Consecutive systems per tile
+
+    Returns:
+        bool: True if processing succeeded, False otherwise
+    """
+    input_file = Path(input_path)
+    if not input_file.exists():
+        print(f"❌ Error: Input file '{input_path}' does not exist")
+        return False
+
+    output_dir = Path(output_dir) if output_dir else input_file.parent / f"{input_file.stem}_tiles"
+    print(f"🎼 Processing: {input_path}")
+
+    try:
+        PHASES.start("read")
+        svg_content = input_file.read_text(encoding='utf-8')
+        tiles, defs_svg, report = tile_svg(svg_content, systems_per_tile)
+
+        PHASES.start("write")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        declaration = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        digits = max(2, len(str(len(tiles))))
+        manifest_tiles = []
+        for index, (tile_content, info) in enumerate(tiles, 1):
+            tile_file = output_dir / f"tile_{index:0{digits}d}.svg"
+            write_if_changed(tile_file, declaration + tile_content, quiet=True)
+            manifest_tiles.append({'file': tile_file.name, 'bytes': tile_file.stat().st_size, **info})
+
+        # Tiles left over from a run with more systems
+        written = {tile['file'] for tile in manifest_tiles}
+        for stale in output_dir.glob("tile_*.svg"):
+            if stale.name not in written:
+                stale.unlink()
+
+        defs_file = output_dir / "defs.svg"
+        if defs_svg is not None:
+            write_if_changed(defs_file, declaration + defs_svg, quiet=True)
+        elif defs_file.exists():
+            defs_file.unlink()
+
+        manifest = {
+            'source': input_file.name,
+            'viewBox': report['view_box'],
+            'systemsPerTile': systems_per_tile,
+            'defs': defs_file.name if defs_svg is not None else None,
+            'tiles': manifest_tiles,
+        }
+        write_if_changed(output_dir / "manifest.json", json.dumps(manifest, indent=2) + "\n")
+        PHASES.end()
+
+        print(f"✅ Success: {output_dir}")
+        print(f"   📊 {report['staves']} staves, {report['systems']} systems → {report['tiles']} tiles "
+              f"({min(t['bytes'] for t in manifest_tiles):,}-{max(t['bytes'] for t in manifest_tiles):,} bytes)")
+        if defs_svg is not None:
+            print(f"   🔣 {report['symbols']} shared definitions in {defs_file.name}")
+        if report['split_groups'] or report['straddling'] or report['unplaced']:
+            print(f"   ℹ️  {report['split_groups']} groups split across tiles, {report['straddling']} elements "
+                  f"straddling a cut, {report['unplaced']} without geometry")
+        return True
+
+    except Exception as processing_error:
+        print(f"❌ Error processing '{input_path}': {processing_error}")
+        return False
+
+# =============================================================================
+# COMMAND LINE INTERFACE
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Split an SVG score into per-system tiles with a viewport manifest',
+    )
+    parser.add_argument('input_file', help='Input SVG file')
+    parser.add_argument('output_dir', nargs='?', help='Output directory (default: <input>_tiles/)')
+    parser.add_argument('--systems-per-tile', type=int, default=1,
+                        help='Consecutive systems per tile (default: 1)')
+    args = parser.parse_args()
+
+    print("🚀 SVG System Tiling")
+    print("=" * 45)
+
+    return 0 if process_svg_file(args.input_file, args.output_dir, max(1, args.systems_per_tile)) else 1
+
+# =============================================================================
+# SCRIPT ENTRY POINT
+# =============================================================================
+
+if __name__ == '__main__':
+    startup_profile()
+    sys.exit(main())
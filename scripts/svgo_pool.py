@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+svgo_pool.py
+
+Persistent SVGO Worker Pool
+===========================
+
+Running `npx svgo` once per optimization pays npx package resolution and a
+fresh Node startup every time. This module keeps a small pool of long-lived
+Node processes (svgo_worker.cjs) that accept SVG content plus a plugin
+configuration over JSON lines and return the optimized SVG in memory.
+
+No temporary config files are written, and no output files are produced
+unless the caller writes the returned bytes itself.
+
+Usage:
+    from svgo_pool import SVGOPool
+
+    with SVGOPool(size=4) as pool:
+        optimized = pool.optimize(svg_bytes, plugins=["convertPathData"])
+        optimized = pool.optimize(svg_bytes, config_file="svgo.config.js")
+
+SVGO is resolved from a local node_modules or from the global npm root
+(`npm install -g svgo`).
+"""
+
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+WORKER_SCRIPT = Path(__file__).parent / "svgo_worker.cjs"
+
+# Seconds one request may take before its worker is considered hung (as the
+# former `npx svgo` call)
+REQUEST_TIMEOUT = 30
+
+
+class SVGOError(RuntimeError):
+    """Raised when a worker cannot be started or SVGO rejects an input."""
+
+
+class SVGOWorkerError(SVGOError):
+    """Raised when a worker fails rather than SVGO: the request may succeed on a retry."""
+
+
+def _node_path():
+    """Build NODE_PATH so the worker can find a globally installed SVGO."""
+    paths = [p for p in os.environ.get("NODE_PATH", "").split(os.pathsep) if p]
+    npm = shutil.which("npm")
+    if npm:
+        try:
+            result = subprocess.run([npm, "root", "-g"], capture_output=True, text=True, timeout=30)
+            global_root = result.stdout.strip()
+            if result.returncode == 0 and global_root and global_root not in paths:
+                paths.append(global_root)
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+    return os.pathsep.join(paths)
+
+
+class SVGOWorker:
+    """
+    One long-lived Node process answering SVGO requests in order.
+
+    A reader thread moves response lines into a queue, so a request can
+    wait with a deadline; a worker that misses it is killed.
+    """
+
+    def __init__(self, node_path=None, timeout=REQUEST_TIMEOUT):
+        node = shutil.which("node")
+        if node is None:
+            raise SVGOError("Node.js not available - required for the SVGO worker")
+
+        env = dict(os.environ)
+        env["NODE_PATH"] = node_path if node_path is not None else _node_path()
+
+        self.process = subprocess.Popen(
+            [node, str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self._next_id = 0
+        self.timeout = timeout
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, daemon=True).start()
+
+    def _read_lines(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put("")  # End of output
+
+    def request(self, payload):
+        """Send one request and wait for its response."""
+        if self.process.poll() is not None:
+            raise SVGOWorkerError(f"SVGO worker exited with code {self.process.returncode}")
+
+        self._next_id += 1
+        payload = dict(payload, id=self._next_id)
+
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise SVGOWorkerError(f"SVGO worker communication failed: {e}")
+
+        try:
+            line = self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            # The pool drops dead workers and starts a fresh one on demand
+            self.process.kill()
+            self.process.wait()
+            raise SVGOWorkerError(f"SVGO worker did not answer within {self.timeout}s")
+
+        if not line:
+            raise SVGOWorkerError("SVGO worker closed its output unexpectedly")
+
+        response = json.loads(line)
+        if response.get("id") != self._next_id:
+            raise SVGOWorkerError(f"SVGO worker answered request {response.get('id')}, expected {self._next_id}")
+        if "error" in response:
+            raise SVGOError(response["error"])
+        return response
+
+    def close(self):
+        """Stop the worker process."""
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+class SVGOPool:
+    """
+    Thread-safe pool of SVGO workers.
+
+    Workers are started lazily, so a pool that is never used never starts
+    Node. Each call borrows one idle worker for the duration of the request;
+    a worker that crashes or exceeds `timeout` is replaced.
+    """
+
+    def __init__(self, size=1, timeout=REQUEST_TIMEOUT):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._node_path = None
+
+    def _acquire(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                worker = None
+
+            if worker is None:
+                with self._lock:
+                    if len(self._workers) < self.size:
+                        if self._node_path is None:
+                            self._node_path = _node_path()
+                        worker = SVGOWorker(self._node_path, self.timeout)
+                        self._workers.append(worker)
+                        return worker
+                worker = self._idle.get()
+
+            if worker is not None:
+                return worker
+
+    def _release(self, worker):
+        if worker.process.poll() is None:
+            self._idle.put(worker)
+        else:
+            # Drop crashed workers and wake up a waiter so it can start a new one
+            with self._lock:
+                self._workers.remove(worker)
+            self._idle.put(None)
+
+    def _call(self, payload):
+        worker = self._acquire()
+        try:
+            return worker.request(payload)
+        finally:
+            self._release(worker)
+
+    def optimize(self, svg, plugins=None, config=None, config_file=None, path=None, multipass=True):
+        """
+        Optimize SVG content and return the result as bytes.
+
+        Args:
+            svg (bytes or str): SVG content
+            plugins (list, optional): Plugin list, shorthand for a config
+            config (dict, optional): Full SVGO configuration object
+            config_file (str or Path, optional): svgo.config.js to load instead
+            path (str, optional): File path reported to SVGO plugins
+            multipass (bool): Used with `plugins` only
+
+        Returns:
+            bytes: Optimized SVG content
+        """
+        if isinstance(svg, bytes):
+            svg = svg.decode("utf-8")
+
+        payload = {"svg": svg}
+        if plugins is not None:
+            payload["config"] = {"plugins": list(plugins), "multipass": multipass}
+        elif config is not None:
+            payload["config"] = config
+        elif config_file is not None:
+            payload["configFile"] = str(Path(config_file).resolve())
+        if path is not None:
+            payload["path"] = str(path)
+
+        return self._call(payload)["data"].encode("utf-8")
+
+    def version(self):
+        """Return the SVGO version string used by the workers."""
+        return self._call({"cmd": "version"})["version"]
+
+    def close(self):
+        """Stop all workers."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,120 @@
+#!/usr/bin/env node
+// svgo_worker.cjs - Long-lived SVGO worker speaking JSON lines over stdin/stdout
+//
+// Each request is one JSON object per line:
+//   {"id": 1, "svg": "<svg ...>", "config": {"plugins": [...], "multipass": true}}
+//   {"id": 2, "svg": "<svg ...>", "configFile": "/abs/path/svgo.config.js", "path": "input.svg"}
+//   {"id": 3, "cmd": "version"}
+//
+// Each response is one JSON object per line carrying the same id:
+//   {"id": 1, "data": "<svg ...>"}
+//   {"id": 3, "version": "3.3.2"}
+//   {"id": 2, "error": "message"}
+//
+// Managed from Python by scripts/svgo_pool.py - one Node startup per worker
+// instead of one `npx svgo` per optimization.
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const { pathToFileURL } = require('url');
+
+let svgoModule = null;
+
+async function loadSvgo() {
+  if (svgoModule) {
+    return svgoModule;
+  }
+  try {
+    svgoModule = require('svgo');
+  } catch (requireError) {
+    // SVGO 4 is ESM-only: import its node entry point from NODE_PATH directly
+    const searchPaths = (process.env.NODE_PATH || '').split(path.delimiter).filter(Boolean);
+    for (const dir of searchPaths) {
+      const entry = path.join(dir, 'svgo', 'lib', 'svgo-node.js');
+      if (fs.existsSync(entry)) {
+        svgoModule = await import(pathToFileURL(entry).href);
+        break;
+      }
+    }
+    if (!svgoModule) {
+      throw requireError;
+    }
+  }
+  return svgoModule;
+}
+
+function svgoVersion() {
+  try {
+    return require('svgo/package.json').version;
+  } catch (error) {
+    const searchPaths = (process.env.NODE_PATH || '').split(path.delimiter).filter(Boolean);
+    for (const dir of searchPaths) {
+      const manifest = path.join(dir, 'svgo', 'package.json');
+      if (fs.existsSync(manifest)) {
+        return JSON.parse(fs.readFileSync(manifest, 'utf8')).version;
+      }
+    }
+    return 'unknown';
+  }
+}
+
+// Config files are loaded once per (path, mtime) pair
+const configCache = new Map();
+
+async function resolveConfig(svgo, request) {
+  if (request.config) {
+    return request.config;
+  }
+  if (!request.configFile) {
+    return {};
+  }
+  const mtime = fs.statSync(request.configFile).mtimeMs;
+  const cached = configCache.get(request.configFile);
+  if (cached && cached.mtime === mtime) {
+    return cached.config;
+  }
+  const config = await svgo.loadConfig(request.configFile);
+  configCache.set(request.configFile, { mtime, config });
+  return config;
+}
+
+async function handle(request) {
+  const svgo = await loadSvgo();
+  if (request.cmd === 'version') {
+    return { id: request.id, version: svgoVersion() };
+  }
+  const config = await resolveConfig(svgo, request);
+  const options = Object.assign({}, config);
+  if (request.path) {
+    options.path = request.path;
+  }
+  const result = svgo.optimize(request.svg, options);
+  return { id: request.id, data: result.data };
+}
+
+const input = readline.createInterface({ input: process.stdin, terminal: false });
+let queue = Promise.resolve();
+
+input.on('line', (line) => {
+  if (!line.trim()) {
+    return;
+  }
+  // Requests are answered strictly in order - the Python side expects one
+  // response per request on a given worker
+  queue = queue.then(async () => {
+    let request = {};
+    let response;
+    try {
+      request = JSON.parse(line);
+      response = await handle(request);
+    } catch (error) {
+      response = { id: request.id, error: String(error && error.message ? error.message : error) };
+    }
+    process.stdout.write(JSON.stringify(response) + '\n');
+  });
+});
+
+input.on('close', () => {
+  queue.then(() => process.exit(0));
+});